@@ -16,85 +16,233 @@
 IPC Bus messaging service
 """
 
+import errno
 import logging
+import os
+import select
+import socket
+import struct
 import time
 import ujson as json
+from collections import deque
 from multiprocessing.connection import Listener
 from threading import Thread
 from signal import signal, SIGTERM
 
+if False:  # MYPY
+    from typing import Dict
+
 logger = logging.getLogger('openmotics')
 
 
+class _ClientConnection(object):
+    """
+    A single client connection on the bus. After the multiprocessing authentication handshake, the
+    underlying socket is driven non-blocking by the `MessageService` select loop. Messages use the same
+    framing as `multiprocessing.connection` (4 byte big-endian length + payload) so clients are unaffected.
+    """
+
+    HEADER = struct.Struct('!i')
+    RECV_SIZE = 65536
+
+    def __init__(self, sock, max_send_buffer):
+        self.sock = sock
+        self.sock.setblocking(0)
+        self.name = None
+        self.closed = False
+        self._max_send_buffer = max_send_buffer
+        self._receive_buffer = bytearray()
+        self._send_queue = deque()
+        self._send_offset = 0
+        self._pending = 0
+        self._dropped = 0
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    @property
+    def wants_write(self):
+        return len(self._send_queue) > 0
+
+    def read_messages(self):
+        """ Reads all available data and returns the complete payloads. Raises EOFError on disconnect. """
+        data = self.sock.recv(_ClientConnection.RECV_SIZE)
+        if not data:
+            raise EOFError('Connection closed by client')
+        buffer = self._receive_buffer
+        buffer.extend(data)
+        payloads = []
+        header_size = _ClientConnection.HEADER.size
+        while len(buffer) >= header_size:
+            length = _ClientConnection.HEADER.unpack_from(buffer)[0]
+            end = header_size + length
+            if len(buffer) < end:
+                break
+            payloads.append(str(buffer[header_size:end]))
+            del buffer[:end]
+        return payloads
+
+    def queue(self, frame):
+        """ Queues an already framed message. Messages are dropped when the send buffer is full. """
+        if self._pending + len(frame) > self._max_send_buffer:
+            if self._dropped == 0:
+                logger.warning('Send buffer full for client {0}, dropping messages'.format(self.name))
+            self._dropped += 1
+            return
+        if self._dropped > 0:
+            logger.warning('Dropped {0} message(s) for client {1}'.format(self._dropped, self.name))
+            self._dropped = 0
+        self._send_queue.append(frame)
+        self._pending += len(frame)
+
+    def flush(self):
+        """ Writes as much of the queued data as the socket accepts without blocking. """
+        while self._send_queue:
+            frame = self._send_queue[0]
+            try:
+                sent = self.sock.send(buffer(frame, self._send_offset))
+            except socket.error as ex:
+                if ex.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return
+                raise
+            self._send_offset += sent
+            self._pending -= sent
+            if self._send_offset < len(frame):
+                return
+            self._send_queue.popleft()
+            self._send_offset = 0
+
+    def close(self):
+        self.closed = True
+        self._send_queue.clear()
+        self._pending = 0
+        self.sock.close()
+
+
 class MessageService(object):
 
-    def __init__(self, ip='localhost', port=10000, authkey='openmotics'):
-        self.connections = {}
+    def __init__(self, ip='localhost', port=10000, authkey='openmotics', max_send_buffer=1024 * 1024):
+        self.connections = {}  # type: Dict[int, _ClientConnection]
+        self.clients = {}  # type: Dict[str, _ClientConnection]
         self.address = (ip, port)  # family is deduced to be 'AF_INET'
         self.authkey = authkey
         self.listener = Listener(self.address, authkey=self.authkey)
+        self._max_send_buffer = max_send_buffer
+        self._accepted = deque()
+        self._wakeup_read, self._wakeup_write = os.pipe()
         self._stop = False
 
-    def _multicast(self, source, msg):
-        for connection, client_name in self.connections.iteritems():
-            if client_name != source and connection is not None:
-                self._send(connection, msg)
+    @staticmethod
+    def _frame(payload):
+        return _ClientConnection.HEADER.pack(len(payload)) + payload
 
-    def _unicast(self, destination, msg):
-        for connection, client_name in self.connections.iteritems():
-            if client_name == destination and connection is not None:
-                self._send(connection, msg)
-                break
+    def _multicast(self, source, frame):
+        for connection in self.connections.itervalues():
+            if connection.name != source:
+                connection.queue(frame)
 
-    def _send(self, conn, msg):
-        payload = json.dumps(msg)
-        conn.send_bytes(payload)
+    def _unicast(self, destination, frame):
+        connection = self.clients.get(destination)
+        if connection is not None:
+            connection.queue(frame)
 
-    def _verify_client(self, conn, msg):
-        should_be = self.connections.get(conn, None)
-        if should_be is None:
-            self.connections[conn] = msg['source']
-            should_be = msg['source']
-            logger.info('Detected new client name {0}'.format(msg['source']))
+    def _verify_client(self, connection, msg):
         pretends_to_be = msg['source']
-        if pretends_to_be != should_be:
-            raise EOFError('Client cannot use name {0} on connection for {1}'.format(pretends_to_be, should_be))
+        if connection.name is None:
+            connection.name = pretends_to_be
+            self.clients[pretends_to_be] = connection
+            logger.info('Detected new client name {0}'.format(pretends_to_be))
+        elif pretends_to_be != connection.name:
+            raise EOFError('Client cannot use name {0} on connection for {1}'.format(pretends_to_be, connection.name))
+
+    def _process_message(self, connection, payload):
+        msg = json.loads(payload)
 
-    def _process_message(self, conn, msg):
         # 1. update client name for connection
-        self._verify_client(conn, msg)
+        self._verify_client(connection, msg)
 
-        # 2. route message based on destination
+        # 2. route message based on destination. The payload is forwarded as is, so it's only framed once.
+        frame = MessageService._frame(payload)
         destination = msg.get('destination', None)
         if destination is None:
-            source = msg.get('source', None)
-            self._multicast(source, msg)
+            self._multicast(msg.get('source', None), frame)
         else:
-            self._unicast(destination, msg)
+            self._unicast(destination, frame)
 
-    def _receiver(self, conn):
-        while not conn.closed:
+    def _receive(self, connection):
+        try:
+            payloads = connection.read_messages()
+        except socket.error as ex:
+            if ex.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                return
+            logger.error('Error receiving message from client {0}: {1}'.format(connection.name, ex))
+            self._close(connection)
+            return
+        except EOFError:
+            self._close(connection)
+            return
+        for payload in payloads:
             try:
-                payload = conn.recv_bytes()
-                msg = json.loads(payload)
-                self._process_message(conn, msg)
-            except IOError as io_error:
-                logger.exception('Error receiving message from client {0}: {1}'.format(self.connections.get(conn, None), io_error))
-                self._close(conn)
+                self._process_message(connection, payload)
             except ValueError:
-                logger.exception('Error decoding payload from client {0}'.format(self.connections.get(conn, None)))
-            except EOFError as e:
-                self._close(conn)
+                logger.exception('Error decoding payload from client {0}'.format(connection.name))
+            except EOFError:
+                self._close(connection)
+                return
             except Exception:
                 logger.exception('Unknown error in receiver')
-                self._close(conn)
+                self._close(connection)
+                return
+
+    def _flush(self, connection):
+        try:
+            connection.flush()
+        except socket.error as ex:
+            logger.error('Error sending message to client {0}: {1}'.format(connection.name, ex))
+            self._close(connection)
+
+    def _close(self, connection):
+        if connection.closed:
+            return
+        self.connections.pop(connection.fileno(), None)
+        if connection.name is not None and self.clients.get(connection.name) is connection:
+            del self.clients[connection.name]
+        connection.close()
+        logger.info('Connection closed from {0}'.format(connection.name or 'unknown'))
 
-    def _close(self, conn):
-        client_name = self.connections.get(conn, 'unknown')
-        conn.close()
-        if conn in self.connections:
-            del self.connections[conn]
-        logger.info('Connection closed from {0}'.format(client_name))
+    def _register_accepted(self):
+        os.read(self._wakeup_read, 4096)
+        while self._accepted:
+            conn = self._accepted.popleft()
+            sock = socket.fromfd(conn.fileno(), socket.AF_INET, socket.SOCK_STREAM)
+            conn.close()  # The socket holds a duplicate of the file descriptor
+            connection = _ClientConnection(sock, self._max_send_buffer)
+            self.connections[connection.fileno()] = connection
+
+    def _loop(self):
+        while not self._stop:
+            try:
+                readers = [self._wakeup_read] + self.connections.keys()
+                writers = [fd for fd, connection in self.connections.iteritems() if connection.wants_write]
+                readable, _, _ = select.select(readers, writers, [], 1.0)
+                for fd in readable:
+                    if fd == self._wakeup_read:
+                        self._register_accepted()
+                        continue
+                    connection = self.connections.get(fd)
+                    if connection is not None:
+                        self._receive(connection)
+                # Data queued during this iteration is flushed right away, as the socket is most likely writable
+                for connection in self.connections.values():
+                    if connection.wants_write:
+                        self._flush(connection)
+            except select.error as ex:
+                if ex.args[0] != errno.EINTR:
+                    logger.exception('Error in message service loop')
+                    time.sleep(1)
+            except Exception:
+                logger.exception('Unexpected error in message service loop')
+                time.sleep(1)
 
     def _server(self):
         logger.info('Starting OM messaging service...')
@@ -103,9 +251,8 @@ class MessageService(object):
             try:
                 conn = self.listener.accept()
                 logger.info('connection accepted from {0}'.format(self.listener.last_accepted))
-                receiver = Thread(target=self._receiver, args=(conn,))
-                receiver.daemon = True
-                receiver.start()
+                self._accepted.append(conn)
+                os.write(self._wakeup_write, 'x')
             except IOError as io_error:
                 logger.error('IOError in accepting connection: {0}'.format(io_error))
             except Exception as e:
@@ -123,6 +270,10 @@ class MessageService(object):
             logger.info('Stopping OM messaging service... Done')
         signal(SIGTERM, stop)
 
-        server = Thread(target=self._server)
+        loop = Thread(target=self._loop, name='OM messaging service loop')
+        loop.daemon = True
+        loop.start()
+
+        server = Thread(target=self._server, name='OM messaging service listener')
         server.daemon = True
         server.start()
@@ -0,0 +1,78 @@
+# Copyright (C) 2020 OpenMotics BV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Keeps latency statistics of the API endpoints
+"""
+
+from threading import Lock
+from ioc import Injectable, Singleton
+from toolbox import Histogram
+
+if False:  # MYPY
+    from typing import Dict, Any
+
+
+@Injectable.named('api_statistics')
+@Singleton
+class ApiStatistics(object):
+    """
+    Latency histograms and call/error counters per endpoint. Every endpoint has a histogram for the
+    processing, and where applicable for the authentication and serialization of the call.
+    """
+
+    PROCESS = 'process'
+    AUTHENTICATION = 'authentication'
+    SERIALIZATION = 'serialization'
+
+    def __init__(self):
+        self._lock = Lock()
+        self._endpoints = {}  # type: Dict[str, Dict[str, Any]]
+
+    def _get_endpoint(self, endpoint):
+        statistics = self._endpoints.get(endpoint)
+        if statistics is None:
+            statistics = {'calls': 0,
+                          'errors': 0,
+                          'timings': {}}
+            self._endpoints[endpoint] = statistics
+        return statistics
+
+    def add_timing(self, endpoint, section, duration):
+        # type: (str, str, float) -> None
+        with self._lock:
+            timings = self._get_endpoint(endpoint)['timings']
+            histogram = timings.get(section)
+            if histogram is None:
+                histogram = timings[section] = Histogram()
+            histogram.add(duration)
+
+    def add_call(self, endpoint, duration, error=False):
+        # type: (str, float, bool) -> None
+        """ Registers a processed call to the endpoint """
+        self.add_timing(endpoint, ApiStatistics.PROCESS, duration)
+        with self._lock:
+            statistics = self._get_endpoint(endpoint)
+            statistics['calls'] += 1
+            if error:
+                statistics['errors'] += 1
+
+    def get_statistics(self):
+        # type: () -> Dict[str, Dict[str, Any]]
+        with self._lock:
+            return dict((endpoint, {'calls': statistics['calls'],
+                                    'errors': statistics['errors'],
+                                    'timings': dict((section, histogram.as_dict())
+                                                    for section, histogram in statistics['timings'].iteritems())})
+                        for endpoint, statistics in self._endpoints.iteritems())
@@ -0,0 +1,58 @@
+# Copyright (C) 2020 OpenMotics BV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Keeps version counters of the configuration, used to validate cached configuration responses
+"""
+
+import time
+from threading import Lock
+
+if False:  # MYPY
+    from typing import Dict, Optional
+
+
+class ConfigurationVersions(object):
+    """
+    Version counters per configuration domain. A domain version is bumped on every write in that
+    domain, while the global version is bumped whenever the underlying memory (EEPROM, FRAM) is
+    written or its cache invalidated, since it can't be known which domains are affected.
+    """
+
+    OUTPUTS = 'outputs'
+    INPUTS = 'inputs'
+    THERMOSTATS = 'thermostats'
+
+    def __init__(self):
+        self._lock = Lock()
+        self._epoch = '{0:x}'.format(int(time.time() * 1000))  # Versions don't survive a restart
+        self._global_version = 0
+        self._versions = {}  # type: Dict[str, int]
+
+    def bump(self, domain=None):
+        # type: (Optional[str]) -> None
+        """ Bumps the version of the given domain, or of all domains if no domain is given """
+        with self._lock:
+            if domain is None:
+                self._global_version += 1
+            else:
+                self._versions[domain] = self._versions.get(domain, 0) + 1
+
+    def get_version(self, domain):
+        # type: (str) -> str
+        with self._lock:
+            return '{0}.{1}.{2}'.format(self._epoch, self._global_version, self._versions.get(domain, 0))
+
+
+configuration_versions = ConfigurationVersions()
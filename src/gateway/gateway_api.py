@@ -24,9 +24,11 @@ import math
 import os
 import shutil
 import sqlite3
-import subprocess
+import tarfile
 import tempfile
 import threading
+import time
+from contextlib import closing
 
 import constants
 from bus.om_bus_events import OMBusEvents
@@ -38,11 +40,26 @@ from power import power_api
 from serial_utils import CommunicationTimedOutException
 
 if False:  # MYPY:
-    from typing import Any, Dict, List
+    from typing import Any, Dict, List, Tuple
 
 logger = logging.getLogger('openmotics')
 
 
+class BackupStream(object):
+    """ Iterable over the chunks of a backup, removing its temporary files when it's closed. """
+
+    def __init__(self, chunks, tmp_dir):
+        self._chunks = chunks
+        self._tmp_dir = tmp_dir
+
+    def __iter__(self):
+        return self._chunks
+
+    def close(self):
+        self._chunks.close()
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+
 def convert_nan(number):
     """ Convert nan to 0. """
     if math.isnan(number):
@@ -65,7 +82,8 @@ class GatewayApi(object):
     def __init__(self,
                  master_controller=INJECTED, power_communicator=INJECTED,
                  power_controller=INJECTED, pulse_controller=INJECTED,
-                 message_client=INJECTED, observer=INJECTED, configuration_controller=INJECTED, shutter_controller=INJECTED):
+                 message_client=INJECTED, observer=INJECTED, configuration_controller=INJECTED, shutter_controller=INJECTED,
+                 health_monitor=INJECTED):
         """
         :param master_communicator: Master communicator
         :type master_communicator: master.master_communicator.MasterCommunicator
@@ -87,6 +105,8 @@ class GatewayApi(object):
         :type configuration_controller: gateway.config.ConfigurationController
         :param shutter_controller: Shutter Controller
         :type shutter_controller: gateway.shutters.ShutterController
+        :param health_monitor: Health monitor
+        :type health_monitor: gateway.health_monitor.HealthMonitor
         """
         self.__master_controller = master_controller  # type: MasterController
         self.__config_controller = configuration_controller
@@ -96,8 +116,10 @@ class GatewayApi(object):
         self.__message_client = message_client
         self.__observer = observer
         self.__shutter_controller = shutter_controller
+        self.__health_monitor = health_monitor
 
         self.__previous_on_outputs = set()
+        self.__energy_module_firmwares = {}  # type: Dict[Tuple[int, int], str]
 
     def set_plugin_controller(self, plugin_controller):
         """ Set the plugin controller. """
@@ -136,6 +158,7 @@ class GatewayApi(object):
         # type: () -> None
         """ Called when maintenance mode is stopped """
         self.__master_controller.invalidate_caches()
+        self.__energy_module_firmwares = {}  # Modules might be bootloaded
         self.__observer.invalidate_cache()
         self.__message_client.send_event(OMBusEvents.DIRTY_EEPROM, None)
 
@@ -221,9 +244,12 @@ class GatewayApi(object):
             for module in modules:
                 module_address = module['address']
                 module_version = module['version']
-                raw_version = self.__power_communicator.do_command(module_address, power_api.get_version(module_version))[0]
-                version_info = raw_version.split('\x00', 1)[0].split('_')
-                firmware_version = '{0}.{1}.{2}'.format(version_info[1], version_info[2], version_info[3])
+                firmware_version = self.__energy_module_firmwares.get((module_address, module_version))
+                if firmware_version is None:
+                    raw_version = self.__power_communicator.do_command(module_address, power_api.get_version(module_version))[0]
+                    version_info = raw_version.split('\x00', 1)[0].split('_')
+                    firmware_version = '{0}.{1}.{2}'.format(version_info[1], version_info[2], version_info[3])
+                    self.__energy_module_firmwares[(module_address, module_version)] = firmware_version
                 information[module_address] = {'type': get_energy_module_type(module['version']),
                                                'firmware': firmware_version,
                                                'address': module_address}
@@ -255,6 +281,22 @@ class GatewayApi(object):
                  'dimmer': output['dimmer']}
                 for output in outputs]
 
+    def get_outputs_status_changes(self, since_version):
+        """
+        Get the Output status changes since a given version, to be used for incremental synchronisation.
+
+        :returns: A dict containing the current version and the changes since the given version as
+        a list of [id, status, dimmer] lists. If the changes are no longer available, the changes
+        are None and the full status is returned instead.
+        """
+        version, changes = self.__observer.get_output_changes(since_version)
+        if changes is None:
+            return {'version': version,
+                    'changes': None,
+                    'status': self.get_outputs_status()}
+        return {'version': version,
+                'changes': [[output_id, status, dimmer] for _, output_id, status, dimmer in changes]}
+
     def get_output_status(self, output_id):
         """
         Get a list containing the status of the Outputs.
@@ -548,33 +590,18 @@ class GatewayApi(object):
 
     def get_full_backup(self):
         """
-        Get a backup (tar) of the master eeprom, the sqlite databases and the plugins
+        Get a backup (tar) of the master eeprom, the sqlite databases and the plugins. The master
+        eeprom and the databases are snapshotted up front, the tar itself is generated while it is
+        being consumed.
 
-        :returns: Tar containing multiple files: master.eep, config.db, scheduled.db, power.db,
-        eeprom_extensions.db, metrics.db and plugins as a string of bytes.
+        :returns: BackupStream of string chunks forming a tar containing multiple files: master.eep,
+        config.db, scheduled.db, power.db, eeprom_extensions.db, metrics.db and plugins. The stream
+        needs to be closed when it's not (fully) consumed, to remove the snapshots.
         """
-        _ = self  # Not static for consistency
-
-        def backup_sqlite_db(input_db_path, backup_db_path):
-            """ Backup an sqlite db provided the path to the db to backup and the backup db. """
-            # Connect to database
-            connection = sqlite3.connect(input_db_path)
-            cursor = connection.cursor()
-
-            # Lock database before making a backup
-            cursor.execute('begin immediate')
-
-            # Make new backup file
-            shutil.copyfile(input_db_path, backup_db_path)
-
-            # Unlock database
-            connection.rollback()
-
         tmp_dir = tempfile.mkdtemp()
-        tmp_sqlite_dir = '{0}/sqlite'.format(tmp_dir)
-        os.mkdir(tmp_sqlite_dir)
-
         try:
+            tmp_sqlite_dir = '{0}/sqlite'.format(tmp_dir)
+            os.mkdir(tmp_sqlite_dir)
             with open('{0}/master.eep'.format(tmp_sqlite_dir), 'w') as eeprom_file:
                 eeprom_file.write(self.get_master_backup())
 
@@ -584,59 +611,105 @@ class GatewayApi(object):
                                      'eeprom_extensions.db': constants.get_eeprom_extension_database_file(),
                                      'metrics.db': constants.get_metrics_database_file(),
                                      'pulse.db': constants.get_pulse_counter_database_file()}.iteritems():
-                target = '{0}/{1}'.format(tmp_sqlite_dir, filename)
-                backup_sqlite_db(source, target)
-
-            # Backup plugins
-            tmp_plugin_dir = '{0}/{1}'.format(tmp_dir, 'plugins')
-            tmp_plugin_content_dir = '{0}/{1}'.format(tmp_plugin_dir, 'content')
-            tmp_plugin_config_dir = '{0}/{1}'.format(tmp_plugin_dir, 'config')
-            os.mkdir(tmp_plugin_dir)
-            os.mkdir(tmp_plugin_content_dir)
-            os.mkdir(tmp_plugin_config_dir)
-
-            plugin_dir = constants.get_plugin_dir()
-            plugins = [name for name in os.listdir(plugin_dir) if os.path.isdir(os.path.join(plugin_dir, name))]
-            for plugin in plugins:
-                shutil.copytree(plugin_dir + plugin, '{0}/{1}/'.format(tmp_plugin_content_dir, plugin))
-
-            config_files = constants.get_plugin_configfiles()
-            for config_file in glob.glob(config_files):
-                shutil.copy(config_file, '{0}/'.format(tmp_plugin_config_dir))
-
-            retcode = subprocess.call('cd {0}; tar cf backup.tar *'.format(tmp_dir), shell=True)
-            if retcode != 0:
-                raise Exception('The backup tar could not be created.')
-
-            with open('{0}/backup.tar'.format(tmp_dir), 'r') as backup_file:
-                return backup_file.read()
-
-        finally:
+                GatewayApi._snapshot_sqlite_db(source, '{0}/{1}'.format(tmp_sqlite_dir, filename))
+        except Exception:
             shutil.rmtree(tmp_dir)
+            raise
 
-    def restore_full_backup(self, data):
+        def generate():
+            try:
+                entries = [('sqlite', tmp_sqlite_dir)]
+                entries += [('sqlite/{0}'.format(filename), '{0}/{1}'.format(tmp_sqlite_dir, filename))
+                            for filename in sorted(os.listdir(tmp_sqlite_dir))]
+                entries += [('plugins', None), ('plugins/content', None), ('plugins/config', None)]
+                plugin_dir = constants.get_plugin_dir()
+                for plugin in sorted(os.listdir(plugin_dir)):
+                    plugin_path = os.path.join(plugin_dir, plugin)
+                    if os.path.isdir(plugin_path):
+                        for path, _, filenames in os.walk(plugin_path, followlinks=True):
+                            arcname = 'plugins/content/{0}'.format(os.path.relpath(path, plugin_dir))
+                            entries.append((arcname, path))
+                            entries += [('{0}/{1}'.format(arcname, filename), os.path.join(path, filename))
+                                        for filename in sorted(filenames)]
+                for config_file in sorted(glob.glob(constants.get_plugin_configfiles())):
+                    entries.append(('plugins/config/{0}'.format(os.path.basename(config_file)), config_file))
+                for chunk in GatewayApi._generate_tar(entries):
+                    yield chunk
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        return BackupStream(generate(), tmp_dir)
+
+    @staticmethod
+    def _snapshot_sqlite_db(input_db_path, backup_db_path):
+        """ Makes a consistent copy of an sqlite db, by holding a reserved lock while copying it. """
+        connection = sqlite3.connect(input_db_path)
+        try:
+            connection.execute('begin immediate')
+            shutil.copyfile(input_db_path, backup_db_path)
+            connection.rollback()
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _generate_tar(entries, chunk_size=65536):
+        """
+        Generates a tar in chunks, without buffering any of the files in memory.
+
+        :param entries: List of (name in the archive, path) tuples. A path of None or a path to a
+        directory adds a directory.
+        """
+        for arcname, path in entries:
+            tarinfo = tarfile.TarInfo(arcname)
+            if path is None or os.path.isdir(path):
+                tarinfo.type = tarfile.DIRTYPE
+                tarinfo.mode = 0o755
+                tarinfo.mtime = time.time() if path is None else os.stat(path).st_mtime
+                yield tarinfo.tobuf(format=tarfile.GNU_FORMAT)
+                continue
+            stat = os.stat(path)
+            tarinfo.mode = stat.st_mode & 0o7777
+            tarinfo.mtime = stat.st_mtime
+            with open(path, 'rb') as source:
+                # The size is taken from the opened file, as the file could change while reading it
+                source.seek(0, os.SEEK_END)
+                tarinfo.size = source.tell()
+                source.seek(0)
+                yield tarinfo.tobuf(format=tarfile.GNU_FORMAT)
+                remaining = tarinfo.size
+                while remaining > 0:
+                    chunk = source.read(min(chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    yield chunk
+                if remaining > 0:
+                    yield '\0' * remaining  # The file shrunk while reading it
+            if tarinfo.size % tarfile.BLOCKSIZE:
+                yield '\0' * (tarfile.BLOCKSIZE - tarinfo.size % tarfile.BLOCKSIZE)
+        yield '\0' * (2 * tarfile.BLOCKSIZE)
+
+    def restore_full_backup(self, backup_file):
         """
         Restore a full backup containing the master eeprom and the sqlite databases.
 
-        :param data: The backup to restore.
-        :type data: Tar containing multiple files: master.eep, config.db, scheduled.db, power.db,
-        eeprom_extensions.db, metrics.db and plugins as a string of bytes.
+        :param backup_file: The backup to restore, read as a stream.
+        :type backup_file: File-like object containing a tar containing multiple files: master.eep,
+        config.db, scheduled.db, power.db, eeprom_extensions.db, metrics.db and plugins.
         :returns: dict with 'output' key.
         """
-        import glob
-        import shutil
-        import tempfile
-        import subprocess
-
         tmp_dir = tempfile.mkdtemp()
         tmp_sqlite_dir = '{0}/sqlite'.format(tmp_dir)
         try:
-            with open('{0}/backup.tar'.format(tmp_dir), 'wb') as backup_file:
-                backup_file.write(data)
-
-            retcode = subprocess.call('cd {0}; tar xf backup.tar'.format(tmp_dir), shell=True)
-            if retcode != 0:
-                raise Exception('The backup tar could not be extracted.')
+            try:
+                with closing(tarfile.open(fileobj=backup_file, mode='r|*')) as backup_tar:
+                    for member in backup_tar:
+                        target = os.path.normpath(os.path.join(tmp_dir, member.name))
+                        if not (target + os.sep).startswith(tmp_dir + os.sep) or not (member.isfile() or member.isdir()):
+                            raise ValueError('Invalid backup member {0}'.format(member.name))
+                        backup_tar.extract(member, tmp_dir)
+            except (tarfile.TarError, ValueError) as ex:
+                raise Exception('The backup tar could not be extracted: {0}'.format(ex))
 
             # Check if the sqlite db's are in a folder or not for backwards compatibility
             src_dir = tmp_sqlite_dir if os.path.isdir(tmp_sqlite_dir) else tmp_dir
@@ -736,7 +809,7 @@ class GatewayApi(object):
 
         :returns: dict with 'errors' key, it contains list of tuples (module, nr_errors).
         """
-        return self.__master_controller.error_list()
+        return self.__health_monitor.get_errors()
 
     def master_last_success(self):
         """ Get the number of seconds since the last successful communication with the master.
@@ -744,7 +817,8 @@ class GatewayApi(object):
         return self.__master_controller.last_success()
 
     def master_clear_error_list(self):
-        return self.__master_controller.clear_error_list()
+        self.__health_monitor.clear_errors()
+        return {}
 
     def power_last_success(self):
         """ Get the number of seconds since the last successful communication with the power
@@ -754,6 +828,17 @@ class GatewayApi(object):
             return 0
         return self.__power_communicator.get_seconds_since_last_success()
 
+    def get_serial_statistics(self):
+        """ Get the traffic statistics of the master and power bus, with per command the latency histogram
+        and timeout/retry rates.
+        """
+        statistics = {'master': dict(self.__master_controller.get_communication_statistics(),
+                                     commands=self.__master_controller.get_command_statistics())}
+        if self.__power_communicator is not None:
+            statistics['power'] = dict(self.__power_communicator.get_communication_statistics(),
+                                       commands=self.__power_communicator.get_command_statistics())
+        return statistics
+
     # Status led functions
 
     def set_master_status_leds(self, status):
@@ -1410,6 +1495,7 @@ class GatewayApi(object):
         """
         if self.__power_communicator is not None:
             self.__power_communicator.stop_address_mode()
+        self.__energy_module_firmwares = {}
         return dict()
 
     def in_power_address_mode(self):
@@ -98,6 +98,9 @@ class MasterController(object):
     def get_communication_statistics(self):
         return self._master_communicator.get_communication_statistics()
 
+    def get_command_statistics(self):
+        return self._master_communicator.get_command_statistics()
+
     def get_debug_buffer(self):
         return self._master_communicator.get_debug_buffer()
 
@@ -162,6 +165,9 @@ class MasterController(object):
     def get_output_statuses(self):
         raise NotImplementedError()
 
+    def get_output_status_changes(self, since_version):
+        raise NotImplementedError()
+
     # Shutters
 
     def shutter_up(self, shutter_id):
@@ -73,6 +73,9 @@ class MasterClassicController(MasterController):
 
         self._discover_mode_timer = None  # type: Optional[Timer]
         self._module_log = []  # type: List[Tuple[str,str]]
+        self._modules = None  # type: Optional[Dict[str,List[str]]]
+        self._modules_information = None  # type: Optional[Dict[str,Dict[str,Any]]]
+        self._modules_timed_out = {}  # type: Dict[str,str]
 
         self._master_communicator.register_consumer(
             BackgroundConsumer(master_api.output_list(), 0, self._on_master_output_change, True)
@@ -94,6 +97,8 @@ class MasterClassicController(MasterController):
             try:
                 now = time.time()
                 self._get_master_version()
+                if self._modules_information is None:
+                    self.get_modules_information()  # Collect the module inventory once
                 # Validate communicator checks
                 if self._time_last_updated < now - 300:
                     self._check_master_time()
@@ -278,8 +283,11 @@ class MasterClassicController(MasterController):
         self._eeprom_controller.dirty = True
         self._input_last_updated = 0
         self._output_last_updated = 0
+        self._invalidate_modules()
 
     def get_firmware_version(self):
+        if self._master_version is not None:
+            return self._master_version  # The firmware can't change without a restart of the services
         out_dict = self._master_communicator.do_command(master_api.status())
         return int(out_dict['f1']), int(out_dict['f2']), int(out_dict['f3'])
 
@@ -436,6 +444,9 @@ class MasterClassicController(MasterController):
     def get_output_status(self, output_id):
         return self._output_status.get_output(output_id)
 
+    def get_output_status_changes(self, since_version):
+        return self._output_status.get_changes(since_version)
+
     def _input_changed(self, input_id, status):
         # type: (int, str) -> None
         """ Executed by the Input Status tracker when an input changed state """
@@ -627,6 +638,11 @@ class MasterClassicController(MasterController):
         * 'inputs' (list of input module types: I,T,L,C)
         * 'shutters' (List of modules types: S).
         """
+        if self._modules is None:
+            self._modules = self._load_modules()
+        return self._modules
+
+    def _load_modules(self):
         mods = self._master_communicator.do_command(master_api.number_of_io_modules())
 
         inputs = []
@@ -666,6 +682,42 @@ class MasterClassicController(MasterController):
 
     def get_modules_information(self):
         """ Gets module information """
+        if self._modules_information is None:
+            self._modules_timed_out = {}
+            self._modules_information = self._load_modules_information()
+        elif self._modules_timed_out:
+            self._reload_module_versions()
+        return self._modules_information
+
+    def _invalidate_modules(self):
+        # type: () -> None
+        """ The modules are collected again after a module discovery or maintenance (e.g. bootloading) """
+        self._modules = None
+        self._modules_information = None
+        self._modules_timed_out = {}
+
+    def _read_module_version(self, module_address):
+        # type: (str) -> Tuple[int, str]
+        module_version = self._master_communicator.do_command(master_api.get_module_version(),
+                                                              {'addr': module_address},
+                                                              extended_crc=True,
+                                                              timeout=1)
+        firmware_version = '{0}.{1}.{2}'.format(module_version['f1'], module_version['f2'], module_version['f3'])
+        return module_version['hw_version'], firmware_version
+
+    def _reload_module_versions(self):
+        # type: () -> None
+        """ Reads the versions of the modules that didn't respond while loading the module information """
+        for formatted_address, module_address in self._modules_timed_out.items():
+            try:
+                hardware_version, firmware_version = self._read_module_version(module_address)
+            except CommunicationTimedOutException:
+                continue
+            self._modules_information[formatted_address].update({'hardware': hardware_version,
+                                                                 'firmware': firmware_version})
+            del self._modules_timed_out[formatted_address]
+
+    def _load_modules_information(self):
 
         def get_master_version(eeprom_address, _is_can=False):
             _module_address = self._eeprom_controller.read_address(eeprom_address)
@@ -676,13 +728,10 @@ class MasterClassicController(MasterController):
             try:
                 if _is_can or _module_address.bytes[0].lower() == _module_address.bytes[0]:
                     return formatted_address, None, None
-                _module_version = self._master_communicator.do_command(master_api.get_module_version(),
-                                                                       {'addr': _module_address.bytes},
-                                                                       extended_crc=True,
-                                                                       timeout=1)
-                _firmware_version = '{0}.{1}.{2}'.format(_module_version['f1'], _module_version['f2'], _module_version['f3'])
-                return formatted_address, _module_version['hw_version'], _firmware_version
+                _hardware_version, _firmware_version = self._read_module_version(_module_address.bytes)
+                return formatted_address, _hardware_version, _firmware_version
             except CommunicationTimedOutException:
+                self._modules_timed_out[formatted_address] = _module_address.bytes  # Retried on the next call
                 return formatted_address, None, None
 
         information = {}
@@ -738,22 +787,24 @@ class MasterClassicController(MasterController):
         :returns: String of bytes (size = 64kb).
         """
         retry = None
-        output = ""
+        banks = []
         bank = 0
         while bank < 256:
             try:
-                output += self._master_communicator.do_command(
+                banks.append(self._master_communicator.do_command(
                     master_api.eeprom_list(),
                     {'bank': bank}
-                )['data']
+                )['data'])
                 bank += 1
+                if bank % 64 == 0:
+                    logger.info('Reading eeprom backup: {0}%'.format(bank * 100 / 256))
             except CommunicationTimedOutException:
                 if retry == bank:
                     raise
                 retry = bank
                 logger.warning('Got timeout reading bank {0}. Retrying...'.format(bank))
                 time.sleep(2)  # Doing heavy reads on eeprom can exhaust the master. Give it a bit room to breathe.
-        return output
+        return ''.join(banks)
 
     def factory_reset(self):
         # Wipe master EEPROM
@@ -819,6 +870,8 @@ class MasterClassicController(MasterController):
                         master_api.write_eeprom(),
                         {'bank': bank, 'address': addr, 'data': new}
                     )
+            if (bank + 1) % 64 == 0:
+                logger.info('Restoring eeprom backup: {0}%'.format((bank + 1) * 100 / num_banks))
 
         self._master_communicator.do_command(master_api.activate_eeprom(), {'eep': 0})
         ret.append('Activated eeprom')
@@ -890,6 +943,7 @@ class MasterClassicController(MasterController):
         self._eeprom_controller.invalidate_cache()
         self._eeprom_controller.dirty = True
         ret = self._master_communicator.do_command(master_api.module_discover_stop())
+        self._invalidate_modules()
         self._module_log = []
         return {'status': ret['resp']}
 
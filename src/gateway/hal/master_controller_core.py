@@ -22,6 +22,8 @@ from threading import Thread
 from gateway.hal.master_controller import MasterController, MasterEvent
 from gateway.maintenance_communicator import InMaintenanceModeException
 from ioc import INJECTED, Inject, Injectable, Singleton
+from master.inputs import RecentInputs
+from master.outputs import OutputStatus
 from master_core.core_api import CoreAPI
 from master_core.core_communicator import BackgroundConsumer
 from master_core.errors import Error
@@ -56,7 +58,7 @@ class MasterCoreController(MasterController):
         self._input_state = MasterInputState()
         self._output_interval = 600
         self._output_last_updated = 0
-        self._output_states = {}
+        self._output_status = OutputStatus()
         self._sensor_interval = 300
         self._sensor_last_updated = 0
         self._sensor_states = {}
@@ -78,19 +80,23 @@ class MasterCoreController(MasterController):
     def _handle_event(self, data):
         # type: (Dict[str,Any]) -> None
         core_event = MasterCoreEvent(data)
-        logger.info('Got master event: {0}'.format(core_event))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Got master event: {0}'.format(core_event))
         if core_event.type == MasterCoreEvent.Types.OUTPUT:
+            event_data = core_event.data
+            output_id = event_data['output']
+            status = event_data['status']
+            dimmer_value = event_data['dimmer_value']
             # Update internal state cache
-            output_id = core_event.data['output']
-            self._output_states[output_id] = {'id': output_id,
-                                              'status': 1 if core_event.data['status'] else 0,
-                                              'ctimer': core_event.data['timer_value'],
-                                              'dimmer': core_event.data['dimmer_value']}
+            self._output_status.update_output({'id': output_id,
+                                               'status': 1 if status else 0,
+                                               'ctimer': event_data['timer_value'],
+                                               'dimmer': dimmer_value})
             # Generate generic event
             event = MasterEvent(event_type=MasterEvent.Types.OUTPUT_CHANGE,
-                                data={'id': core_event.data['output'],
-                                      'status': {'on': core_event.data['status'],
-                                                 'value': core_event.data['dimmer_value']},
+                                data={'id': output_id,
+                                      'status': {'on': status,
+                                                 'value': dimmer_value},
                                       'location': {'room_id': 255}})  # TODO: Missing room
             for callback in self._event_callbacks:
                 callback(event)
@@ -99,10 +105,11 @@ class MasterCoreController(MasterController):
             for callback in self._event_callbacks:
                 callback(event)
         elif core_event.type == MasterCoreEvent.Types.SENSOR:
-            sensor_id = core_event.data['sensor']
+            event_data = core_event.data
+            sensor_id = event_data['sensor']
             if sensor_id not in self._sensor_states:
                 return
-            self._sensor_states[sensor_id][core_event.data['type']] = core_event.data['value']
+            self._sensor_states[sensor_id][event_data['type']] = event_data['value']
 
     def _synchronize(self):
         # type: () -> None
@@ -314,20 +321,25 @@ class MasterCoreController(MasterController):
             output.save()  # TODO: Batch saving - postpone eeprom activate if relevant for the Core
 
     def get_output_status(self, output_id):
-        return self._output_states.get(output_id)
+        return self._output_status.get_output(output_id)
 
     def get_output_statuses(self):
-        return self._output_states.values()
+        return self._output_status.get_outputs()
+
+    def get_output_status_changes(self, since_version):
+        return self._output_status.get_changes(since_version)
 
     def _refresh_output_states(self):
         amount_output_modules = self._master_communicator.do_command(CoreAPI.general_configuration_number_of_modules(), {})['output']
+        outputs = []
         for i in xrange(amount_output_modules * 8):
             state = self._master_communicator.do_command(CoreAPI.output_detail(), {'device_nr': i})
             # TODO: also trigger callback when status changed without an event.
-            self._output_states[i] = {'id': i,
-                                      'status': state['status'],  # 1 or 0
-                                      'ctimer': state['timer'],
-                                      'dimmer': state['dimmer']}
+            outputs.append({'id': i,
+                            'status': state['status'],  # 1 or 0
+                            'ctimer': state['timer'],
+                            'dimmer': state['dimmer']})
+        self._output_status.full_update(outputs)
         self._output_last_updated = time.time()
 
     # Shutters
@@ -517,6 +529,7 @@ class MasterInputState(object):
         self._interval = interval
         self._last_updated = 0  # type: float
         self._values = {}  # type: Dict[int,MasterInputValue]
+        self._recent_inputs = RecentInputs()
 
     def get_inputs(self):
         # type: () -> List[Dict[str,Any]]
@@ -524,17 +537,16 @@ class MasterInputState(object):
 
     def get_recent(self):
         # type: () -> List[int]
-        sorted_inputs = sorted(self._values.values(), key=lambda x: x.changed_at)
-        recent_events = [x.input_id for x in sorted_inputs
-                         if x.changed_at > time.time() - 10]
-        return recent_events[-5:]
+        return self._recent_inputs.get()
 
     def handle_event(self, core_event):
         # type: (MasterCoreEvent) -> MasterEvent
         value = MasterInputValue.from_core_event(core_event)
         if value.input_id not in self._values:
             self._values[value.input_id] = value
-        self._values[value.input_id].update(value)
+            self._recent_inputs.add(value.input_id, value.changed_at)
+        elif self._values[value.input_id].update(value):
+            self._recent_inputs.add(value.input_id, self._values[value.input_id].changed_at)
         return value.master_event()
 
     def should_refresh(self):
@@ -552,6 +564,7 @@ class MasterInputState(object):
                     self._values[input_id] = MasterInputValue(input_id, current_status)
                 state = self._values[input_id]
                 if state.update_status(current_status):
+                    self._recent_inputs.add(input_id, state.changed_at)
                     events.append(state.master_event())
         self._last_updated = time.time()
         return events
@@ -567,17 +580,18 @@ class MasterInputValue(object):
     @classmethod
     def from_core_event(cls, event):
         # type: (MasterCoreEvent) -> MasterInputValue
-        status = 1 if event.data['status'] else 0
+        event_data = event.data
+        status = 1 if event_data['status'] else 0
         changed_at = time.time()
-        return cls(event.data['input'], status, changed_at=changed_at)
+        return cls(event_data['input'], status, changed_at=changed_at)
 
     def serialize(self):
         # type: () -> Dict[str,Any]
         return {'id': self.input_id, 'status': self.status}  # TODO: output?
 
     def update(self, other_value):
-        # type: (MasterInputValue) -> None
-        self.update_status(other_value.status)
+        # type: (MasterInputValue) -> bool
+        return self.update_status(other_value.status)
 
     def update_status(self, current_status):
         # type: (int) -> bool
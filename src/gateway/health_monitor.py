@@ -0,0 +1,135 @@
+# Copyright (C) 2020 OpenMotics BV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Keeps track of the master module errors and the health of the services
+"""
+
+import logging
+import time
+from threading import Event, Lock, Thread
+from ioc import Injectable, Inject, INJECTED, Singleton
+from gateway.maintenance_communicator import InMaintenanceModeException
+from serial_utils import CommunicationTimedOutException
+
+if False:  # MYPY
+    from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("openmotics")
+
+
+@Injectable.named('health_monitor')
+@Singleton
+class HealthMonitor(object):
+    """
+    Polls the master module errors and the state of the other services in the background, at a
+    low rate, so the errors and the health can be served from memory.
+    """
+
+    SERVICE_CHECKS = {'vpn_service': (['last_cycle'], 300),
+                      'led_service': (['run_gpio', 'run_i2c', 'run_buttons', 'run_state_check'], 5)}
+
+    @Inject
+    def __init__(self, master_controller=INJECTED, message_client=INJECTED, error_interval=300, state_interval=5):
+        """
+        :type master_controller: gateway.hal.master_controller.MasterController
+        :type message_client: bus.om_bus_client.MessageClient
+        """
+        self._master_controller = master_controller
+        self._message_client = message_client
+        self._error_interval = error_interval
+        self._state_interval = state_interval
+
+        self._lock = Lock()
+        self._errors = None  # type: Optional[List[Tuple[str, int]]]
+        self._errors_updated = 0.0
+        self._service_health = {}  # type: Dict[str, Tuple[bool, float]]
+        self._refresh_errors = Event()
+        self._stopped = True
+        self._thread = None  # type: Optional[Thread]
+
+    def start(self):
+        self._stopped = False
+        self._thread = Thread(target=self._run, name='HealthMonitor thread')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stopped = True
+        self._refresh_errors.set()
+
+    def _run(self):
+        while not self._stopped:
+            for service in HealthMonitor.SERVICE_CHECKS:
+                self._load_service_state(service)
+            if self._refresh_errors.is_set() or self._errors_updated + self._error_interval < time.time():
+                self._refresh_errors.clear()
+                self._load_errors()
+            self._refresh_errors.wait(self._state_interval)
+
+    def _load_errors(self):
+        # type: () -> None
+        try:
+            errors = self._master_controller.error_list()
+        except NotImplementedError:
+            errors = []  # Not supported by this master
+        except CommunicationTimedOutException:
+            logger.error('Error loading module errors: CommunicationTimedOutException')
+            return
+        except InMaintenanceModeException:
+            return
+        except Exception as ex:
+            logger.error('Error loading module errors: {0}'.format(ex))
+            return
+        with self._lock:
+            self._errors = errors
+            self._errors_updated = time.time()
+
+    def _load_service_state(self, service):
+        # type: (str) -> None
+        keys, max_age = HealthMonitor.SERVICE_CHECKS[service]
+        try:
+            state = self._message_client.get_state(service, {})
+        except Exception as ex:
+            logger.error('Error loading {0} state: {1}'.format(service, ex))
+            state = {}
+        now = time.time()
+        healthy = all(state.get(key, 0) > now - max_age for key in keys)
+        with self._lock:
+            self._service_health[service] = (healthy, now)
+
+    def get_errors(self):
+        # type: () -> List[Tuple[str, int]]
+        """ Get the error list per module, as last loaded from the master """
+        with self._lock:
+            return list(self._errors or [])
+
+    def clear_errors(self):
+        # type: () -> None
+        self._master_controller.clear_error_list()
+        with self._lock:
+            self._errors = None
+        self._refresh_errors.set()
+
+    def get_service_health(self):
+        # type: () -> Dict[str, Dict[str, bool]]
+        """ Get the health of the services, based on the last states they reported """
+        max_age = max(60, self._state_interval * 3)  # Don't trust a health that wasn't recently refreshed
+        now = time.time()
+        health = {}
+        with self._lock:
+            for service in HealthMonitor.SERVICE_CHECKS:
+                healthy, updated = self._service_health.get(service, (False, 0))
+                health[service] = {'state': healthy and updated > now - max_age}
+        return health
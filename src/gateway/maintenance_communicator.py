@@ -17,6 +17,9 @@ The maintenance module contains the MaintenanceService class.
 """
 from exceptions import NotImplementedError
 
+if False:  # MYPY
+    from typing import List
+
 
 # TODO: This needs to be moved to a general `master` folder with `classic` and `core` subfolders
 
@@ -49,3 +52,29 @@ class MaintenanceCommunicator(object):
 
     def write(self, message):
         raise NotImplementedError()
+
+
+class LineBuffer(object):
+    """
+    Frames the data received in maintenance mode into lines. The data is buffered in a bytearray
+    and only the newly received data is searched for line endings.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        # type: (str) -> List[str]
+        """ Adds data to the buffer and returns the completed lines """
+        start = len(self._buffer)  # The buffered data doesn't contain a line ending
+        self._buffer.extend(data)
+        lines = []
+        line_start = 0
+        index = self._buffer.find('\n', start)
+        while index != -1:
+            lines.append(str(self._buffer[line_start:index]).rstrip())
+            line_start = index + 1
+            index = self._buffer.find('\n', line_start)
+        if line_start > 0:
+            del self._buffer[:line_start]
+        return lines
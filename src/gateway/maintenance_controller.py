@@ -19,6 +19,7 @@ import logging
 import socket
 import random
 from threading import Thread
+from Queue import Queue, Empty, Full
 from ioc import Injectable, Inject, INJECTED, Singleton
 from gateway.maintenance_communicator import InMaintenanceModeException
 from platform_utils import System
@@ -31,6 +32,8 @@ logger = logging.getLogger("openmotics")
 class MaintenanceController(object):
 
     SOCKET_TIMEOUT = 60
+    QUEUE_SIZE = 10000
+    BATCH_SIZE = 100
 
     @Inject
     def __init__(self, maintenance_communicator=INJECTED, ssl_private_key=INJECTED, ssl_certificate=INJECTED):
@@ -46,28 +49,62 @@ class MaintenanceController(object):
         self._maintenance_stopped_callback = None
         self._connection = None
         self._server_thread = None
+        self._messages = Queue(MaintenanceController.QUEUE_SIZE)
+        self._messages_dropped = 0
+        self._dispatch_thread = None
+        self._stopped = True
 
     #######################
     # Internal management #
     #######################
 
     def start(self):
+        self._stopped = False
+        self._dispatch_thread = Thread(target=self._dispatch, name='Maintenance dispatch thread')
+        self._dispatch_thread.daemon = True
+        self._dispatch_thread.start()
         self._maintenance_communicator.start()
 
     def stop(self):
         self._maintenance_communicator.stop()
+        self._stopped = True
 
     def _received_data(self, message):
+        """ Queues the received data, so the maintenance read thread is never blocked by slow consumers """
+        try:
+            self._messages.put(message, block=False)
+        except Full:
+            self._messages_dropped += 1
+
+    def _dispatch(self):
+        while not self._stopped:
+            try:
+                messages = [self._messages.get(block=True, timeout=1)]
+            except Empty:
+                continue
+            try:
+                # During bulk dumps, forward the queued messages at once
+                while len(messages) < MaintenanceController.BATCH_SIZE:
+                    messages.append(self._messages.get(block=False))
+            except Empty:
+                pass
+            if self._messages_dropped > 0:
+                logger.warning('Maintenance queue full, dropped %s messages', self._messages_dropped)
+                self._messages_dropped = 0
+            self._broadcast(messages)
+
+    def _broadcast(self, messages):
         try:
             if self._connection is not None:
-                self._connection.sendall('{0}\n'.format(message.rstrip()))
+                self._connection.sendall(''.join('{0}\n'.format(message) for message in messages))
         except Exception:
             logger.exception('Exception forwarding maintenance data to socket connection.')
         for consumer_id, callback in self._consumers.items():
-            try:
-                callback(message.rstrip())
-            except Exception:
-                logger.exception('Exception forwarding maintenance data to consumer %s', str(consumer_id))
+            for message in messages:
+                try:
+                    callback(message)
+                except Exception:
+                    logger.exception('Exception forwarding maintenance data to consumer %s', str(consumer_id))
 
     def _activate(self):
         if not self._maintenance_communicator.is_active():
@@ -0,0 +1,82 @@
+# Copyright (C) 2020 OpenMotics BV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Compact metric record as used inside the metrics pipeline
+"""
+
+if False:  # MYPY
+    from typing import Dict, Any, Optional, Tuple
+
+
+class Metric(object):
+    """
+    A single metric. Metrics flow through the pipeline as Metric instances and are only converted
+    to dicts when they leave the gateway (cloud, websockets and plugins).
+
+    The tags dict is interned and thus shared between metrics with the same tags: it should be
+    treated as read-only.
+    """
+
+    __slots__ = ['source', 'type', 'timestamp', 'tags', 'values', 'definition']
+
+    _TAGS_CACHE_SIZE = 10000
+    _tags_cache = {}  # type: Dict[Tuple, Dict[str, Any]]
+
+    def __init__(self, source, metric_type, timestamp, tags, values, definition=None):
+        # type: (str, str, float, Dict[str, Any], Dict[str, Any], Optional[Dict[str, Any]]) -> None
+        self.source = Metric._intern(source)
+        self.type = Metric._intern(metric_type)
+        self.timestamp = timestamp
+        self.tags = Metric._intern_tags(tags)
+        self.values = values
+        self.definition = definition
+
+    @staticmethod
+    def _intern(value):
+        return intern(value) if type(value) is str else value
+
+    @staticmethod
+    def _intern_tags(tags):
+        try:
+            key = tuple(sorted(tags.iteritems()))
+            interned_tags = Metric._tags_cache.get(key)
+        except TypeError:
+            return tags  # Unhashable tag values can't be interned
+        if interned_tags is None:
+            if len(Metric._tags_cache) >= Metric._TAGS_CACHE_SIZE:
+                Metric._tags_cache.clear()
+            interned_tags = Metric._tags_cache[key] = tags
+        return interned_tags
+
+    @staticmethod
+    def from_dict(metric, definition=None):
+        # type: (Dict[str, Any], Optional[Dict[str, Any]]) -> Metric
+        return Metric(source=metric['source'],
+                      metric_type=metric['type'],
+                      timestamp=metric['timestamp'],
+                      tags=metric['tags'],
+                      values=metric['values'],
+                      definition=definition)
+
+    def as_dict(self):
+        # type: () -> Dict[str, Any]
+        return {'source': self.source,
+                'type': self.type,
+                'timestamp': self.timestamp,
+                'tags': self.tags,
+                'values': self.values}
+
+    def __repr__(self):
+        return '<Metric {0}.{1} {2} {3} {4}>'.format(self.source, self.type, self.timestamp, self.tags, self.values)
@@ -24,6 +24,8 @@ from collections import deque
 from ioc import Injectable, Inject, INJECTED, Singleton
 from models import Database
 from serial_utils import CommunicationTimedOutException
+from gateway.api_statistics import ApiStatistics
+from gateway.metric import Metric
 from gateway.observer import Event as ObserverEvent
 from gateway.maintenance_communicator import InMaintenanceModeException
 from power import power_api
@@ -39,7 +41,7 @@ class MetricsCollector(object):
     """
 
     @Inject
-    def __init__(self, gateway_api=INJECTED, pulse_controller=INJECTED, thermostat_controller=INJECTED):
+    def __init__(self, gateway_api=INJECTED, pulse_controller=INJECTED, thermostat_controller=INJECTED, api_statistics=INJECTED):
         """
         :param gateway_api: Gateway API
         :type gateway_api: gateway.gateway_api.GatewayApi
@@ -47,6 +49,8 @@ class MetricsCollector(object):
         :type pulse_controller: gateway.pulses.PulseCounterController
         :param thermostat_controller: Thermostat Controller
         :type thermostat_controller: gateway.thermostat.thermostat_controller.ThermostatController
+        :param api_statistics: API statistics
+        :type api_statistics: gateway.api_statistics.ApiStatistics
         """
         self._start = time.time()
         self._last_service_uptime = 0
@@ -64,7 +68,9 @@ class MetricsCollector(object):
                                'error': 120,
                                'counter': 30,
                                'energy': 5,
-                               'energy_analytics': 300}
+                               'energy_analytics': 300,
+                               'api': 60,
+                               'serial': 60}
         self.intervals = {metric_type: 900 for metric_type in self._min_intervals}
         self._plugin_intervals = {metric_type: [] for metric_type in self._min_intervals}
         self._websocket_intervals = {metric_type: {} for metric_type in self._min_intervals}
@@ -74,6 +80,7 @@ class MetricsCollector(object):
                                         'end': 0} for metric_type in self._min_intervals}
 
         self._gateway_api = gateway_api
+        self._api_statistics = api_statistics
         self._thermostat_controller = thermostat_controller
         self._pulse_controller = pulse_controller
         self._metrics_queue = deque()
@@ -90,6 +97,8 @@ class MetricsCollector(object):
         MetricsCollector._start_thread(self._run_pulsecounters, 'counter')
         MetricsCollector._start_thread(self._run_power_openmotics, 'energy')
         MetricsCollector._start_thread(self._run_power_openmotics_analytics, 'energy_analytics')
+        MetricsCollector._start_thread(self._run_api, 'api')
+        MetricsCollector._start_thread(self._run_serial, 'serial')
         thread = Thread(target=self._sleep_manager)
         thread.setName('Metric collector - Sleep manager')
         thread.daemon = True
@@ -159,11 +168,11 @@ class MetricsCollector(object):
         tags = {'name': 'gateway'}
         timestamp = 12346789
         """
-        self._metrics_queue.appendleft({'source': 'OpenMotics',
-                                        'type': metric_type,
-                                        'timestamp': timestamp,
-                                        'tags': tags,
-                                        'values': values})
+        self._metrics_queue.appendleft(Metric(source='OpenMotics',
+                                              metric_type=metric_type,
+                                              timestamp=timestamp,
+                                              tags=tags,
+                                              values=values))
 
     def maybe_wake_earlier(self, metric_type, duration):
         if metric_type in self._sleepers:
@@ -697,6 +706,66 @@ class MetricsCollector(object):
                 return
             self._pause(start, metric_type)
 
+    def _run_api(self, metric_type):
+        while not self._stopped:
+            start = time.time()
+            try:
+                now = time.time()
+                for endpoint, statistics in self._api_statistics.get_statistics().iteritems():
+                    values = {'calls': statistics['calls'],
+                              'errors': statistics['errors']}
+                    for section in [ApiStatistics.PROCESS, ApiStatistics.AUTHENTICATION, ApiStatistics.SERIALIZATION]:
+                        timings = statistics['timings'].get(section)
+                        if timings is None:
+                            continue
+                        values['{0}_avg'.format(section)] = float(timings['avg'])
+                        if section == ApiStatistics.PROCESS:
+                            for percentile in ['p50', 'p90', 'p99']:
+                                values['{0}_{1}'.format(section, percentile)] = float(timings[percentile])
+                    self._enqueue_metrics(metric_type=metric_type,
+                                          values=values,
+                                          tags={'name': 'gateway',
+                                                'endpoint': endpoint},
+                                          timestamp=now)
+            except Exception as ex:
+                logger.exception('Error processing api statistics: {0}'.format(ex))
+            if self._stopped:
+                return
+            self._pause(start, metric_type)
+
+    def _run_serial(self, metric_type):
+        while not self._stopped:
+            start = time.time()
+            try:
+                now = time.time()
+                for bus, statistics in self._gateway_api.get_serial_statistics().iteritems():
+                    self._enqueue_metrics(metric_type=metric_type,
+                                          values={'bytes_read': statistics['bytes_read'],
+                                                  'bytes_written': statistics['bytes_written']},
+                                          tags={'name': 'gateway',
+                                                'bus': bus,
+                                                'command': 'all'},
+                                          timestamp=now)
+                    for command, command_statistics in statistics['commands'].iteritems():
+                        values = {'calls': command_statistics['calls'],
+                                  'timeouts': command_statistics['timeouts'],
+                                  'retries': command_statistics['retries']}
+                        latency = command_statistics['latency']
+                        if latency['count'] > 0:
+                            for key in ['avg', 'p50', 'p90', 'p99']:
+                                values['latency_{0}'.format(key)] = float(latency[key])
+                        self._enqueue_metrics(metric_type=metric_type,
+                                              values=values,
+                                              tags={'name': 'gateway',
+                                                    'bus': bus,
+                                                    'command': command},
+                                              timestamp=now)
+            except Exception as ex:
+                logger.exception('Error processing serial statistics: {0}'.format(ex))
+            if self._stopped:
+                return
+            self._pause(start, metric_type)
+
     def _load_environment_configurations(self, name, interval):
         while not self._stopped:
             start = time.time()
@@ -1099,5 +1168,79 @@ class MetricsCollector(object):
                          {'name': 'voltage_phase',
                           'description': 'Voltage phase',
                           'type': 'gauge',
-                          'unit': ''}]}
+                          'unit': ''}]},
+            # api
+            {'type': 'api',
+             'tags': ['name', 'endpoint'],
+             'metrics': [{'name': 'calls',
+                          'description': 'Number of calls',
+                          'type': 'counter',
+                          'unit': ''},
+                         {'name': 'errors',
+                          'description': 'Number of failed calls',
+                          'type': 'counter',
+                          'unit': ''},
+                         {'name': 'process_avg',
+                          'description': 'Average processing time',
+                          'type': 'gauge',
+                          'unit': 'ms'},
+                         {'name': 'process_p50',
+                          'description': 'Median processing time',
+                          'type': 'gauge',
+                          'unit': 'ms'},
+                         {'name': 'process_p90',
+                          'description': '90th percentile of the processing time',
+                          'type': 'gauge',
+                          'unit': 'ms'},
+                         {'name': 'process_p99',
+                          'description': '99th percentile of the processing time',
+                          'type': 'gauge',
+                          'unit': 'ms'},
+                         {'name': 'authentication_avg',
+                          'description': 'Average authentication time',
+                          'type': 'gauge',
+                          'unit': 'ms'},
+                         {'name': 'serialization_avg',
+                          'description': 'Average serialization time',
+                          'type': 'gauge',
+                          'unit': 'ms'}]},
+            # serial
+            {'type': 'serial',
+             'tags': ['name', 'bus', 'command'],
+             'metrics': [{'name': 'bytes_read',
+                          'description': 'Number of bytes read from the bus',
+                          'type': 'counter',
+                          'unit': 'bytes'},
+                         {'name': 'bytes_written',
+                          'description': 'Number of bytes written to the bus',
+                          'type': 'counter',
+                          'unit': 'bytes'},
+                         {'name': 'calls',
+                          'description': 'Number of calls',
+                          'type': 'counter',
+                          'unit': ''},
+                         {'name': 'timeouts',
+                          'description': 'Number of timed out calls',
+                          'type': 'counter',
+                          'unit': ''},
+                         {'name': 'retries',
+                          'description': 'Number of retried calls',
+                          'type': 'counter',
+                          'unit': ''},
+                         {'name': 'latency_avg',
+                          'description': 'Average call latency',
+                          'type': 'gauge',
+                          'unit': 'ms'},
+                         {'name': 'latency_p50',
+                          'description': 'Median call latency',
+                          'type': 'gauge',
+                          'unit': 'ms'},
+                         {'name': 'latency_p90',
+                          'description': '90th percentile of the call latency',
+                          'type': 'gauge',
+                          'unit': 'ms'},
+                         {'name': 'latency_p99',
+                          'description': '99th percentile of the call latency',
+                          'type': 'gauge',
+                          'unit': 'ms'}]}
         ]
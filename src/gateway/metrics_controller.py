@@ -25,6 +25,7 @@ from threading import Thread
 from collections import deque
 from ioc import Injectable, Inject, INJECTED, Singleton
 from bus.om_bus_events import OMBusEvents
+from gateway.metric import Metric
 
 logger = logging.getLogger("openmotics")
 
@@ -68,6 +69,7 @@ class MetricsController(object):
         self._distributor_openmotics = None
         self.metrics_queue_plugins = deque()
         self.metrics_queue_openmotics = deque()
+        self._rate_keys = {}
         self.inbound_rates = {'total': 0}
         self.outbound_rates = {'total': 0}
         self._openmotics_receivers = []
@@ -246,8 +248,8 @@ class MetricsController(object):
         return settings
 
     def _needs_upload_to_cloud(self, metric):
-        metric_type = metric['type']
-        metric_source = metric['source']
+        metric_type = metric.type
+        metric_source = metric.source
 
         # get definition for metric source and type, getting the definitions for a metric_source is case sensitive!
         definition = self.definitions.get(metric_source, {}).get(metric_type)
@@ -285,15 +287,15 @@ class MetricsController(object):
         >                                    "description": "Total energy consumed (in kWh)",
         >                                    "type": "counter",
         >                                    "unit": "kWh"}]}
-        > example_metric = {"source": "OpenMotics",
-        >                   "type": "energy",
-        >                   "timestamp": 1497677091,
-        >                   "tags": {"device": "OpenMotics energy ID1",
-        >                            "id": "E7.3"},
-        >                   "values": {"power": 1234}}
+        > example_metric = Metric(source='OpenMotics',
+        >                         metric_type='energy',
+        >                         timestamp=1497677091,
+        >                         tags={'device': 'OpenMotics energy ID1',
+        >                               'id': 'E7.3'},
+        >                         values={'power': 1234})
         """
-        metric_type = metric['type']
-        metric_source = metric['source']
+        metric_type = metric.type
+        metric_source = metric.source
 
         if not self._needs_upload_to_cloud(metric):
             return
@@ -301,9 +303,9 @@ class MetricsController(object):
         if metric_source == 'OpenMotics':
             # round off timestamps for openmotics metrics
             modulo_interval = self._config_controller.get('cloud_metrics_interval|{0}'.format(metric_type), 900)
-            timestamp = int(metric['timestamp'] - metric['timestamp'] % modulo_interval)
+            timestamp = int(metric.timestamp - metric.timestamp % modulo_interval)
         else:
-            timestamp = int(metric['timestamp'])
+            timestamp = int(metric.timestamp)
 
         cloud_batch_size = self._config_controller.get('cloud_metrics_batch_size')
         cloud_min_interval = self._config_controller.get('cloud_metrics_min_interval')
@@ -317,8 +319,10 @@ class MetricsController(object):
         )
 
         counters_to_buffer = self._buffer_counters.get(metric_source, {}).get(metric_type, {})
-        definition = self.definitions.get(metric_source, {}).get(metric_type)
-        identifier = '|'.join(['{0}={1}'.format(tag, metric['tags'][tag]) for tag in sorted(definition['tags'])])
+        definition = metric.definition
+        if definition is None:
+            definition = self.definitions.get(metric_source, {}).get(metric_type)
+        identifier = '|'.join(['{0}={1}'.format(tag, metric.tags[tag]) for tag in sorted(definition['tags'])])
 
         # Check if the metric needs to be send
         entry = self._cloud_cache.setdefault(metric_source, {}).setdefault(metric_type, {}).setdefault(identifier, {})
@@ -333,7 +337,7 @@ class MetricsController(object):
         # Add metrics to the send queue if they need to be send
         if include_this_metric is True:
             entry['timestamp'] = timestamp
-            self._cloud_queue.append([metric])
+            self._cloud_queue.append([metric.as_dict()])
             self._cloud_queue = self._cloud_queue[-5000:]  # 5k metrics buffer
 
         # Check timings/rates
@@ -361,7 +365,7 @@ class MetricsController(object):
                 if return_data.get('success', False) is False:
                     raise RuntimeError('{0}'.format(return_data.get('error')))
                 # If successful; clear buffers
-                if self._metrics_cache_controller.clear_buffer(metric['timestamp']) > 0:
+                if self._metrics_cache_controller.clear_buffer(metric.timestamp) > 0:
                     self._load_cloud_buffer()
                 self._cloud_queue = []
                 self._cloud_last_send = now
@@ -394,42 +398,51 @@ class MetricsController(object):
             cache_data = {}
             for counter, match_setting in counters_to_buffer.iteritems():
                 if match_setting is not True:
-                    if metric['tags'][match_setting['key']] not in match_setting['matches']:
+                    if metric.tags[match_setting['key']] not in match_setting['matches']:
                         continue
-                cache_data[counter] = metric['values'][counter]
-            if self._metrics_cache_controller.buffer_counter(metric_source, metric_type, metric['tags'], cache_data, metric['timestamp']):
+                cache_data[counter] = metric.values[counter]
+            if self._metrics_cache_controller.buffer_counter(metric_source, metric_type, metric.tags, cache_data, metric.timestamp):
                 self._cloud_buffer_length += 1
             if self._metrics_cache_controller.clear_buffer(time.time() - 365 * 24 * 60 * 60) > 0:
                 self._load_cloud_buffer()
 
+    def _get_rate_key(self, metric):
+        rate_key = self._rate_keys.get((metric.source, metric.type))
+        if rate_key is None:
+            rate_key = '{0}.{1}'.format(metric.source.lower(), metric.type.lower())
+            self._rate_keys[(metric.source, metric.type)] = rate_key
+        return rate_key
+
     def _put(self, metric):
-        rate_key = '{0}.{1}'.format(metric['source'].lower(), metric['type'].lower())
+        rate_key = self._get_rate_key(metric)
         if rate_key not in self.inbound_rates:
             self.inbound_rates[rate_key] = 0
         self.inbound_rates[rate_key] += 1
         self.inbound_rates['total'] += 1
+        if metric.definition is None:
+            metric.definition = self.definitions.get(metric.source, {}).get(metric.type)
         self._transform_counters(metric)  # Convert counters to "ever increasing counters"
-        # No need to make a deep copy; openmotics doesn't alter the object, and for the plugins the metric gets (de)serialized
+        # No need to make a copy; openmotics doesn't alter the object, and for the plugins the metric gets (de)serialized
         self.metrics_queue_plugins.appendleft(metric)
         self.metrics_queue_openmotics.appendleft(metric)
 
     def _transform_counters(self, metric):
-        source = metric['source']
-        mtype = metric['type']
+        source = metric.source
+        mtype = metric.type
         for counter, match_setting in self._persist_counters.get(source, {}).get(mtype, {}).iteritems():
-            if counter not in metric['values']:
+            if counter not in metric.values:
                 continue
             if match_setting is not True:
-                if metric['tags'][match_setting['key']] not in match_setting['matches']:
+                if metric.tags[match_setting['key']] not in match_setting['matches']:
                     continue
-            counter_type = type(metric['values'][counter])
+            counter_type = type(metric.values[counter])
             counter_value = self._metrics_cache_controller.process_counter(source=source,
                                                                            mtype=mtype,
-                                                                           tags=metric['tags'],
+                                                                           tags=metric.tags,
                                                                            name=counter,
-                                                                           value=metric['values'][counter],
-                                                                           timestamp=metric['timestamp'])
-            metric['values'][counter] = counter_type(counter_value)
+                                                                           value=metric.values[counter],
+                                                                           timestamp=metric.timestamp)
+            metric.values[counter] = counter_type(counter_value)
 
     def _collect_plugins(self):
         """
@@ -487,7 +500,7 @@ class MetricsController(object):
                     metric_ok = False
                 if metric_ok is False:
                     continue
-                self._put(metric)
+                self._put(Metric.from_dict(metric, definition))
             if not self._stopped:
                 time.sleep(max(0.1, 1 - (time.time() - start)))
 
@@ -528,7 +541,7 @@ class MetricsController(object):
                         receiver(metric)
                     except Exception as ex:
                         logger.exception('Error distributing metrics to internal receivers: {0}'.format(ex))
-                    rate_key = '{0}.{1}'.format(metric['source'].lower(), metric['type'].lower())
+                    rate_key = self._get_rate_key(metric)
                     if rate_key not in self.outbound_rates:
                         self.outbound_rates[rate_key] = 0
                     self.outbound_rates[rate_key] += 1
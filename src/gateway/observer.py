@@ -28,7 +28,7 @@ from master import master_api
 from bus.om_bus_events import OMBusEvents
 
 if False:  # MYPY
-    from typing import Any, Dict, List
+    from typing import Any, Dict, List, Optional
 
 if Platform.get_platform() == Platform.Type.CLASSIC:
     from master.master_communicator import CommunicationTimedOutException
@@ -117,6 +117,8 @@ class Observer(object):
 
         self._shutters_interval = 600
         self._shutters_last_updated = 0
+        self._shutter_modules = None  # type: Optional[int]
+        self._shutter_modules_updated = {}  # type: Dict[int, float]
         self._master_online = False
         self._background_consumers_registered = False
         self._master_version = None
@@ -160,6 +162,8 @@ class Observer(object):
         """
         if object_type is None or object_type == Observer.Types.SHUTTERS:
             self._shutters_last_updated = 0
+            self._shutter_modules = None
+            self._shutter_modules_updated = {}
         self._master_controller.invalidate_caches()
 
     def _monitor(self):
@@ -214,6 +218,7 @@ class Observer(object):
     def _on_shutter_update(self, data):
         """ Triggers when the master informs us of an Shutter state change """
         # Update status tracker
+        self._shutter_modules_updated[data['module_nr']] = time.time()
         self._shutter_controller.update_from_master_state(data)
         # Notify subscribers
         for callback in self._master_subscriptions[Observer.LegacyMasterEvents.ON_SHUTTER_UPDATE]:
@@ -245,6 +250,10 @@ class Observer(object):
         # TODO: also address other outputs (e.g. from plugins)
         return self._master_controller.get_output_status(output_id)
 
+    def get_output_changes(self, since_version):
+        # TODO: also include other outputs (e.g. from plugins)
+        return self._master_controller.get_output_status_changes(since_version)
+
     # Inputs
 
     def get_inputs(self):
@@ -271,15 +280,23 @@ class Observer(object):
                                  'location': {'room_id': shutter_data['room']}}))
 
     def _refresh_shutters(self):
-        """ Refreshes the Shutter status tracker """
-        number_of_shutter_modules = self._master_communicator.do_command(master_api.number_of_io_modules())['shutter']
+        """
+        Refreshes the Shutter status tracker. The shutter states are tracked using the master events, so this
+        is a consistency check which only reads the modules that didn't report an event since the last refresh.
+        """
+        now = time.time()
+        if self._shutter_modules is None:
+            self._shutter_modules = self._master_communicator.do_command(master_api.number_of_io_modules())['shutter']
         self._shutter_controller.update_config(self._gateway_api.get_shutter_configurations())
-        for module_id in xrange(number_of_shutter_modules):
+        for module_id in xrange(self._shutter_modules):
+            if self._shutter_modules_updated.get(module_id, 0) + self._shutters_interval > now:
+                continue  # The state was received through an event
             self._shutter_controller.update_from_master_state(
                 {'module_nr': module_id,
                  'status': self._master_communicator.do_command(master_api.shutter_status(self._master_version),
                                                                 {'module_nr': module_id})['status']}
             )
-        self._shutters_last_updated = time.time()
+            self._shutter_modules_updated[module_id] = now
+        self._shutters_last_updated = now
 
 
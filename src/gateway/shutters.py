@@ -33,6 +33,8 @@ class ShutterController(object):
     * A shutter can go UP and go DOWN
     * A shutter that is UP is considered open and has a position of 0
     * A shutter that is DOWN is considered closed and has a position of `steps`
+    * A shutter with both positions and timers configured moves at a constant speed, so its
+      position can be integrated from the timestamped state changes received through the master events
 
     # TODO: The states OPEN and CLOSED make more sense but is a reasonable heavy change at this moment. To be updated if/when a new Gateway API is introduced
     """
@@ -70,6 +72,7 @@ class ShutterController(object):
 
         self._shutters = {}
         self._actual_positions = {}
+        self._position_timestamps = {}
         self._desired_positions = {}
         self._directions = {}
         self._states = {}
@@ -102,6 +105,7 @@ class ShutterController(object):
                 self._shutters[shutter_id] = shutter_config
                 self._states[shutter_id] = [0, ShutterController.State.STOPPED]
                 self._actual_positions[shutter_id] = None
+                self._position_timestamps[shutter_id] = None
                 self._desired_positions[shutter_id] = None
                 self._directions[shutter_id] = ShutterController.Direction.STOP
 
@@ -110,6 +114,7 @@ class ShutterController(object):
                 del self._shutters[shutter_id]
                 del self._states[shutter_id]
                 del self._actual_positions[shutter_id]
+                del self._position_timestamps[shutter_id]
                 del self._desired_positions[shutter_id]
                 del self._directions[shutter_id]
 
@@ -124,6 +129,7 @@ class ShutterController(object):
 
         # Store new position
         self._actual_positions[shutter_id] = position
+        self._position_timestamps[shutter_id] = time.time()
 
         # Update the direction and report if changed
         expected_direction = self._directions[shutter_id]
@@ -246,6 +252,13 @@ class ShutterController(object):
             return ShutterController.Direction.UP
         return ShutterController.Direction.DOWN
 
+    @staticmethod
+    def _get_timer(shutter, direction):
+        timer = shutter.get('timer_{0}'.format(direction.lower()))
+        if timer in [None, 0, 65535]:
+            return None
+        return timer
+
     @staticmethod
     def _get_steps(shutter):
         steps = shutter['steps']
@@ -288,6 +301,14 @@ class ShutterController(object):
             self._log('Shutter {0} new state {1} ignored since it equals {2}'.format(shutter_id, new_state, current_state))
             return  # State didn't change, nothing to do
 
+        # Integrate the motion up to this state change
+        now = time.time()
+        position = self._estimate_position(shutter_id, now)
+        if position != self._actual_positions[shutter_id]:
+            self._log('Shutter {0} estimated position {1}'.format(shutter_id, position))
+            self._actual_positions[shutter_id] = position
+            self._position_timestamps[shutter_id] = now
+
         if new_state != ShutterController.State.STOPPED:
             # Shutter started moving
             self._states[shutter_id] = [time.time(), new_state]
@@ -318,6 +339,34 @@ class ShutterController(object):
 
         self._report_change(shutter_id, shutter, self._states[shutter_id])
 
+    def _estimate_position(self, shutter_id, now):
+        """
+        Estimates the position of a moving shutter, based on the last known position and the time
+        the shutter is moving since then. A shutter with unknown position that moved for the whole
+        `timer` is at its limit.
+        """
+        actual_position = self._actual_positions[shutter_id]
+        state_timestamp, state = self._states[shutter_id]
+        direction = ShutterController.STATE_DIRECTION_MAP.get(state)
+        if direction not in [ShutterController.Direction.UP, ShutterController.Direction.DOWN]:
+            return actual_position
+        shutter = self._shutters[shutter_id]
+        steps = ShutterController._get_steps(shutter)
+        timer = ShutterController._get_timer(shutter, direction)
+        if steps is None or timer is None:
+            return actual_position
+        limit_position = ShutterController._get_limit(direction, steps)
+        position_timestamp = self._position_timestamps[shutter_id]
+        if actual_position is None or position_timestamp is None:
+            if now - state_timestamp >= timer:
+                return limit_position
+            return actual_position
+        elapsed_time = now - max(state_timestamp, position_timestamp)
+        travelled = int(elapsed_time / float(timer) * (steps - 1))
+        if limit_position < actual_position:
+            return max(limit_position, actual_position - travelled)
+        return min(limit_position, actual_position + travelled)
+
     def _interprete_output_states(self, module_id, output_states):
         states = []
         for i in xrange(4):
@@ -345,9 +394,10 @@ class ShutterController(object):
         all_states = []
         for i in sorted(self._states.keys()):
             all_states.append(self._states[i][1])
+        now = time.time()
         return {'status': all_states,
                 'detail': {shutter_id: {'state': self._states[shutter_id][1],
-                                        'actual_position': self._actual_positions[shutter_id],
+                                        'actual_position': self._estimate_position(shutter_id, now),
                                         'desired_position': self._desired_positions[shutter_id]}
                            for shutter_id in self._shutters}}
 
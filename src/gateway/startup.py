@@ -0,0 +1,120 @@
+# Copyright (C) 2020 OpenMotics BV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Starts the service components concurrently, respecting their dependencies
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from threading import Event, Thread
+
+if False:  # MYPY
+    from typing import Any, Dict, List, Optional, Set
+
+logger = logging.getLogger("openmotics")
+
+
+class StartupOrchestrator(object):
+    """
+    Starts a set of components, each one as soon as the components it needs at runtime are started.
+    These requirements are declared explicitly: the IOC graph can't be used, as it also contains
+    (circular) wiring that is only used while running (e.g. the metrics controller injects the plugin
+    controller, which in turn uses the metrics controller).
+    """
+
+    def __init__(self):
+        self._components = OrderedDict()  # type: Dict[str, Any]
+        self._requires = {}  # type: Dict[str, Set[str]]
+        self._unavailable = set()  # type: Set[str]
+        self._started = {}  # type: Dict[str, Event]
+        self._failed = set()  # type: Set[str]
+        self._timings = {}  # type: Dict[str, float]
+
+    def add(self, name, component, requires=None):
+        # type: (str, Any, Optional[List[str]]) -> None
+        """
+        Adds a component, together with the names of the components that need to be started first.
+        Components that are `None` are not available: they're not started and not waited for.
+        """
+        if component is None:
+            self._unavailable.add(name)
+            return
+        self._components[name] = component
+        self._requires[name] = set(requires or [])
+
+    def get_dependencies(self, name):
+        # type: (str) -> Set[str]
+        """ Returns the names of the components the given component has to wait for """
+        unknown = self._requires[name] - self._unavailable - set(self._components.keys())
+        if unknown:
+            raise ValueError('Component {0} requires unknown components {1}'.format(name, ', '.join(sorted(unknown))))
+        return self._requires[name] - self._unavailable
+
+    def start(self):
+        # type: () -> Dict[str, float]
+        """ Starts all components and returns the startup duration of each component """
+        dependencies = dict((name, self.get_dependencies(name)) for name in self._components)
+        StartupOrchestrator._check_cycles(dependencies)
+
+        self._started = dict((name, Event()) for name in self._components)
+        self._failed = set()
+        self._timings = {}
+        threads = []
+        for name in self._components:
+            thread = Thread(target=self._start_component, args=(name, dependencies[name]), name='startup {0}'.format(name))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        if self._failed:
+            raise RuntimeError('Could not start {0}'.format(', '.join(sorted(self._failed))))
+        return self._timings
+
+    def _start_component(self, name, dependencies):
+        # type: (str, Set[str]) -> None
+        try:
+            for dependency in dependencies:
+                self._started[dependency].wait()
+            failed_dependencies = dependencies & self._failed
+            if failed_dependencies:
+                logger.error('Not starting {0}, dependencies {1} failed'.format(name, ', '.join(sorted(failed_dependencies))))
+                self._failed.add(name)
+                return
+            start = time.time()
+            try:
+                self._components[name].start()
+            except Exception:
+                logger.exception('Could not start {0}'.format(name))
+                self._failed.add(name)
+                return
+            self._timings[name] = time.time() - start
+            logger.info('Started {0} in {1:.2f}s'.format(name, self._timings[name]))
+        finally:
+            self._started[name].set()
+
+    @staticmethod
+    def _check_cycles(dependencies):
+        # type: (Dict[str, Set[str]]) -> None
+        remaining = dict((name, set(names)) for name, names in dependencies.items())
+        while remaining:
+            ready = [name for name, names in remaining.items() if not names]
+            if not ready:
+                raise ValueError('Circular startup dependencies between {0}'.format(', '.join(sorted(remaining.keys()))))
+            for name in ready:
+                del remaining[name]
+            for names in remaining.values():
+                names.difference_update(ready)
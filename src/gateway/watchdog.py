@@ -16,12 +16,12 @@
 Contains a watchdog that monitors internal service threads
 """
 
+import glob
 import os
 import time
 import logging
 import ujson as json
 from threading import Thread
-from subprocess import check_output
 from ioc import Injectable, Inject, INJECTED, Singleton
 
 logger = logging.getLogger("openmotics")
@@ -81,12 +81,20 @@ class Watchdog(object):
                     return
                 time.sleep(1)
 
+    @staticmethod
+    def _cleanup_debug_files(name, keep=9):
+        """ Removes all but the most recent debug files """
+        debug_files = sorted(glob.glob('/tmp/debug_{0}_*.json'.format(name)), key=os.path.getmtime, reverse=True)
+        for debug_file in debug_files[keep:]:
+            os.remove(debug_file)
+
     def _controller_check(self, name, controller):
         recovery_data_key = 'communication_recovery_{0}'.format(name)
         recovery_data = self._config_controller.get(recovery_data_key, {})
 
-        calls_timedout = controller.get_communication_statistics()['calls_timedout']
-        calls_succeeded = controller.get_communication_statistics()['calls_succeeded']
+        statistics = controller.get_communication_statistics()
+        calls_timedout = statistics['calls_timedout']
+        calls_succeeded = statistics['calls_succeeded']
         all_calls = sorted(calls_timedout + calls_succeeded)
 
         if len(calls_timedout) == 0:
@@ -140,10 +148,7 @@ class Watchdog(object):
                                        'action': 'service_restart' if service_restart is not None else 'device_reset'}}
                 with open('/tmp/debug_{0}_{1}.json'.format(name, int(time.time())), 'w') as recovery_file:
                     recovery_file.write(json.dumps(debug_data, indent=4, sort_keys=True))
-                check_output(
-                    "ls -tp /tmp/ | grep 'debug_{0}_.*json' | tail -n +10 | while read file; do rm -r /tmp/$file; done".format(name),
-                    shell=True
-                )
+                Watchdog._cleanup_debug_files(name)
             except Exception as ex:
                 logger.exception('Could not store debug file: {0}'.format(ex))
 
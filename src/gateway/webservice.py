@@ -34,6 +34,8 @@ from decorator import decorator
 import constants
 import gateway
 from bus.om_bus_events import OMBusEvents
+from gateway.api_statistics import ApiStatistics
+from gateway.config_versions import ConfigurationVersions, configuration_versions
 from gateway.maintenance_communicator import InMaintenanceModeException
 from gateway.shutters import ShutterController
 from gateway.websockets import EventsSocket, MaintenanceSocket, \
@@ -44,6 +46,9 @@ from platform_utils import System
 from power.power_communicator import InAddressModeException
 from serial_utils import CommunicationTimedOutException
 
+if False:  # MYPY
+    from typing import Dict, Tuple
+
 logger = logging.getLogger("openmotics")
 
 
@@ -141,10 +146,32 @@ def cors_handler():
     cherrypy.response.headers['Access-Control-Allow-Methods'] = 'GET'
 
 
+@Inject
+def _add_api_timing(endpoint, section, duration, api_statistics=INJECTED):
+    # type: (str, str, float, ApiStatistics) -> None
+    api_statistics.add_timing(endpoint, section, duration)
+
+
+@Inject
+def _add_api_call(endpoint, duration, error=False, api_statistics=INJECTED):
+    # type: (str, float, bool, ApiStatistics) -> None
+    api_statistics.add_call(endpoint, duration, error=error)
+
+
+def _get_endpoint(request):
+    """ Returns the name under which the statistics of the handler of a request are kept """
+    handler = request.handler.callable
+    runner = getattr(getattr(handler, '__self__', None), 'runner', None)
+    if runner is not None:  # A plugin endpoint, see PluginRunner.get_webservice
+        return 'plugins/{0}/{1}'.format(runner.name, request.params.get('method'))
+    return handler.__name__
+
+
 def authentication_handler(pass_token=False):
     request = cherrypy.request
     if request.method == 'OPTIONS':
         return
+    start = time.time()
     try:
         token = None
         if 'token' in request.params:
@@ -174,6 +201,8 @@ def authentication_handler(pass_token=False):
         cherrypy.response.status = 401  # Unauthorized
         cherrypy.response.body = '"invalid_token"'
         request.handler = None
+        return
+    _add_api_timing(_get_endpoint(request), ApiStatistics.AUTHENTICATION, time.time() - start)
 
 
 cherrypy.tools.timestamp_filter = cherrypy.Tool('before_handler', timestamp_handler)
@@ -182,11 +211,39 @@ cherrypy.tools.authenticated = cherrypy.Tool('before_handler', authentication_ha
 cherrypy.tools.params = cherrypy.Tool('before_handler', params_handler)
 
 
+_versioned_responses = {}  # type: Dict[Tuple[str, str], Tuple[str, str]]
+
+
+def _get_versioned_response(f, args, kwargs):
+    """
+    Returns the ETag of a call to a versioned API and the cached serialized response if it is still
+    valid. An empty response is returned if the client's copy is still valid.
+    """
+    cache_key = (f.__name__, repr(args[1:]) + repr(sorted(kwargs.items())))
+    etag = '"{0}.{1:x}"'.format(configuration_versions.get_version(f.versioned), hash(cache_key) & 0xffffffff)
+    if etag in [tag.strip() for tag in cherrypy.request.headers.get('If-None-Match', '').split(',')]:
+        return cache_key, etag, ''
+    cached = _versioned_responses.get(cache_key)
+    if cached is not None and cached[0] == etag:
+        return cache_key, etag, cached[1]
+    return cache_key, etag, None
+
+
 @decorator
 def _openmotics_api(f, *args, **kwargs):
     start = time.time()
     timings = {}
     status = 200  # OK
+    etag = None
+    if f.versioned is not None:
+        cache_key, etag, contents = _get_versioned_response(f, args, kwargs)
+        if contents is not None:
+            timings['process'] = ('Processing', time.time() - start)
+            _add_api_call(f.__name__, timings['process'][1])
+            cherrypy.response.headers['Content-Type'] = 'application/json'
+            cherrypy.response.headers['ETag'] = etag
+            cherrypy.response.status = 304 if contents == '' else 200  # Not Modified
+            return contents
     try:
         return_data = f(*args, **kwargs)
         data = limit_floats(dict({'success': True}.items() + return_data.items()))
@@ -204,22 +261,38 @@ def _openmotics_api(f, *args, **kwargs):
         logger.exception('Unexpected error during API call %s', f.__name__)
         status = 200  # OK
         data = {'success': False, 'msg': str(ex)}
+    finally:
+        if f.invalidates is not None:
+            configuration_versions.bump(f.invalidates)
     timings['process'] = ('Processing', time.time() - start)
     serialization_start = time.time()
     contents = json.dumps(data)
     timings['serialization'] = 'Serialization', time.time() - serialization_start
+    _add_api_call(f.__name__, timings['process'][1], error=status != 200 or data['success'] is False)
+    _add_api_timing(f.__name__, ApiStatistics.SERIALIZATION, timings['serialization'][1])
     cherrypy.response.headers['Content-Type'] = 'application/json'
     cherrypy.response.headers['Server-Timing'] = ','.join(['{0}={1}; "{2}"'.format(key, value[1] * 1000, value[0])
                                                            for key, value in timings.iteritems()])
     if hasattr(f, 'deprecated') and f.deprecated is not None:
         cherrypy.response.headers['Warning'] = 'Warning: 299 - "Deprecated, replaced by: {0}"'.format(f.deprecated)
+    if etag is not None and status == 200 and data['success'] is True:
+        if len(_versioned_responses) >= 100:
+            _versioned_responses.clear()
+        _versioned_responses[cache_key] = (etag, contents)
+        cherrypy.response.headers['ETag'] = etag
     cherrypy.response.status = status
     return contents
 
 
-def openmotics_api(auth=False, check=None, pass_token=False, plugin_exposed=True, deprecated=None):
+def openmotics_api(auth=False, check=None, pass_token=False, plugin_exposed=True, deprecated=None, versioned=None, invalidates=None):
+    """
+    :param versioned: The configuration domain of which the response is cached and served with an ETag
+    :param invalidates: The configuration domain that is changed by the call
+    """
     def wrapper(func):
         func.deprecated = deprecated
+        func.versioned = versioned
+        func.invalidates = invalidates
         func = _openmotics_api(func)
         if auth is True:
             func = cherrypy.tools.authenticated(pass_token=pass_token)(func)
@@ -244,7 +317,7 @@ class WebInterface(object):
     @Inject
     def __init__(self, user_controller=INJECTED, gateway_api=INJECTED, maintenance_controller=INJECTED,
                  message_client=INJECTED, configuration_controller=INJECTED, scheduling_controller=INJECTED,
-                 thermostat_controller=INJECTED):
+                 thermostat_controller=INJECTED, health_monitor=INJECTED, api_statistics=INJECTED):
         """
         Constructor for the WebInterface.
 
@@ -255,6 +328,8 @@ class WebInterface(object):
         :type configuration_controller: gateway.config.ConfigController
         :type scheduling_controller: gateway.scheduling.SchedulingController
         :type thermostat_controller: gateway.thermostat.thermostat_controller.ThermostatController
+        :type health_monitor: gateway.health_monitor.HealthMonitor
+        :type api_statistics: gateway.api_statistics.ApiStatistics
         """
         self._user_controller = user_controller
         self._config_controller = configuration_controller
@@ -265,6 +340,8 @@ class WebInterface(object):
         self._gateway_api = gateway_api
         self._maintenance_controller = maintenance_controller
         self._message_client = message_client
+        self._health_monitor = health_monitor
+        self._api_statistics = api_statistics
         self._plugin_controller = None
         self._metrics_collector = None
         self._metrics_controller = None
@@ -281,6 +358,7 @@ class WebInterface(object):
             if not answers:
                 return
             receivers = answers.pop()
+            data = None
             for client_id in receivers.keys():
                 receiver_info = receivers.get(client_id)
                 if receiver_info is None:
@@ -290,8 +368,10 @@ class WebInterface(object):
                         raise cherrypy.HTTPError(401, 'invalid_token')
                     sources = self._metrics_controller.get_filter('source', receiver_info['source'])
                     metric_types = self._metrics_controller.get_filter('metric_type', receiver_info['metric_type'])
-                    if metric['source'] in sources and metric['type'] in metric_types:
-                        receiver_info['socket'].send(msgpack.dumps(metric), binary=True)
+                    if metric.source in sources and metric.type in metric_types:
+                        if data is None:
+                            data = msgpack.dumps(metric.as_dict())
+                        receiver_info['socket'].send(data, binary=True)
                 except cherrypy.HTTPError as ex:  # As might be caught from the `check_token` function
                     receiver_info['socket'].close(ex.code, ex.message)
                 except Exception as ex:
@@ -578,6 +658,19 @@ class WebInterface(object):
         """
         return {'status': self._gateway_api.get_outputs_status()}
 
+    @openmotics_api(auth=True, check=types(since=int))
+    def get_output_status_changes(self, since=0):
+        """
+        Get the changes of the output status since a given version.
+
+        :param since: The version returned by a previous call, 0 to get the full output status.
+        :type since: int
+        :returns: 'version': the current version, 'changes': list of [id, status, dimmer] lists or None if
+        the changes since the given version are no longer available (or the version is unknown, e.g. after
+        a restart), in which case 'status' contains the full output status.
+        """
+        return self._gateway_api.get_outputs_status_changes(since)
+
     @openmotics_api(auth=True, check=types(id=int, is_on=bool, dimmer=int, timer=int))
     def set_output(self, id, is_on, dimmer=None, timer=None):
         """
@@ -764,7 +857,7 @@ class WebInterface(object):
         """
         return self._thermostat_controller.v0_get_thermostat_status()
 
-    @openmotics_api(auth=True, check=types(thermostat=int, temperature=float))
+    @openmotics_api(auth=True, check=types(thermostat=int, temperature=float), invalidates=ConfigurationVersions.THERMOSTATS)
     def set_current_setpoint(self, thermostat, temperature):
         """
         Set the current setpoint of a thermostat.
@@ -778,7 +871,7 @@ class WebInterface(object):
         """
         return self._thermostat_controller.v0_set_current_setpoint(thermostat, temperature)
 
-    @openmotics_api(auth=True, check=types(thermostat_on=bool, automatic=bool, setpoint=int, cooling_mode=bool, cooling_on=bool))
+    @openmotics_api(auth=True, check=types(thermostat_on=bool, automatic=bool, setpoint=int, cooling_mode=bool, cooling_on=bool), invalidates=ConfigurationVersions.THERMOSTATS)
     def set_thermostat_mode(self, thermostat_on, automatic=None, setpoint=None, cooling_mode=False, cooling_on=False):
         """
         Set the global mode of the thermostats. Thermostats can be on or off (thermostat_on),
@@ -806,7 +899,7 @@ class WebInterface(object):
 
         return {'status': 'OK'}
 
-    @openmotics_api(auth=True, check=types(thermostat_id=int, automatic=bool, setpoint=int))
+    @openmotics_api(auth=True, check=types(thermostat_id=int, automatic=bool, setpoint=int), invalidates=ConfigurationVersions.THERMOSTATS)
     def set_per_thermostat_mode(self, thermostat_id, automatic, setpoint):
         """
         Set the thermostat mode of a given thermostat. Thermostats can be set to automatic or
@@ -831,7 +924,7 @@ class WebInterface(object):
         """
         return self._thermostat_controller.v0_get_airco_status()
 
-    @openmotics_api(auth=True, check=types(thermostat_id=int, airco_on=bool))
+    @openmotics_api(auth=True, check=types(thermostat_id=int, airco_on=bool), invalidates=ConfigurationVersions.THERMOSTATS)
     def set_airco_status(self, thermostat_id, airco_on):
         """
         Set the mode of the airco attached to a given thermostat.
@@ -927,16 +1020,19 @@ class WebInterface(object):
 
     @cherrypy.expose
     @cherrypy.tools.authenticated()
+    @cherrypy.config(**{'response.stream': True})
     def get_full_backup(self):
         """
-        Get a backup (tar) of the master eeprom and the sqlite databases.
+        Get a backup (tar) of the master eeprom, the sqlite databases and the plugins. The backup is streamed.
 
-        :returns: Tar containing 4 files: master.eep, config.db, scheduled.db, power.db and
-            eeprom_extensions.db as a string of bytes.
-        :rtype: dict
+        :returns: Tar containing master.eep, config.db, scheduled.db, power.db, eeprom_extensions.db,
+            metrics.db, pulse.db and the plugins as a stream of bytes.
+        :rtype: str
         """
         cherrypy.response.headers['Content-Type'] = 'application/octet-stream'
-        return self._gateway_api.get_full_backup()
+        backup = self._gateway_api.get_full_backup()
+        cherrypy.request.hooks.attach('on_end_request', backup.close)  # Also when the backup isn't (fully) sent
+        return backup
 
     @openmotics_api(auth=True, plugin_exposed=False)
     def restore_full_backup(self, backup_data):
@@ -949,10 +1045,12 @@ class WebInterface(object):
         :returns: dict with 'output' key.
         :rtype: dict
         """
-        data = backup_data.file.read()
-        if not data:
+        backup_file = backup_data.file
+        backup_file.seek(0, os.SEEK_END)
+        if backup_file.tell() == 0:
             raise RuntimeError('backup_data is empty')
-        return self._gateway_api.restore_full_backup(data)
+        backup_file.seek(0)
+        return self._gateway_api.restore_full_backup(backup_file)
 
     @cherrypy.expose
     @cherrypy.tools.authenticated()
@@ -992,6 +1090,9 @@ class WebInterface(object):
             timestamp of the last successful power communication.
         :rtype: dict
         """
+        return self._get_errors()
+
+    def _get_errors(self):
         try:
             errors = self._gateway_api.master_error_list()
         except Exception:
@@ -1005,14 +1106,38 @@ class WebInterface(object):
                 'master_last_success': master_last,
                 'power_last_success': power_last}
 
+    @openmotics_api(auth=True)
+    def get_api_statistics(self):
+        """
+        Get the latency statistics of the API endpoints (including the plugin endpoints) since the
+        start of the service. All durations are in milliseconds.
+
+        :returns: 'statistics': dict with per endpoint the number of calls and errors and the \
+            latency histograms of the processing, authentication and serialization.
+        :rtype: dict
+        """
+        return {'statistics': self._api_statistics.get_statistics()}
+
+    @openmotics_api(auth=True)
+    def get_serial_statistics(self):
+        """
+        Get the traffic statistics of the master and power bus since the start of the service. All
+        durations are in milliseconds.
+
+        :returns: 'statistics': dict with per bus the bytes read/written and per command the number of \
+            calls, the timeout and retry rates and the latency histogram.
+        :rtype: dict
+        """
+        return {'statistics': self._gateway_api.get_serial_statistics()}
+
     @openmotics_api(auth=True)
     def master_clear_error_list(self):
         """
         Clear the number of errors.
         """
-        return self._gateway_api.master_clear_error_list
+        return self._gateway_api.master_clear_error_list()
 
-    @openmotics_api(auth=True, check=types(id=int, fields='json'))
+    @openmotics_api(auth=True, check=types(id=int, fields='json'), versioned=ConfigurationVersions.OUTPUTS)
     def get_output_configuration(self, id, fields=None):
         """
         Get a specific output_configuration defined by its id.
@@ -1026,7 +1151,7 @@ class WebInterface(object):
         """
         return {'config': self._gateway_api.get_output_configuration(id, fields)}
 
-    @openmotics_api(auth=True, check=types(fields='json'))
+    @openmotics_api(auth=True, check=types(fields='json'), versioned=ConfigurationVersions.OUTPUTS)
     def get_output_configurations(self, fields=None):
         """
         Get all output_configurations.
@@ -1038,7 +1163,7 @@ class WebInterface(object):
         """
         return {'config': self._gateway_api.get_output_configurations(fields)}
 
-    @openmotics_api(auth=True, check=types(config='json'))
+    @openmotics_api(auth=True, check=types(config='json'), invalidates=ConfigurationVersions.OUTPUTS)
     def set_output_configuration(self, config):
         """
         Set one output_configuration.
@@ -1049,7 +1174,7 @@ class WebInterface(object):
         self._gateway_api.set_output_configuration(config)
         return {}
 
-    @openmotics_api(auth=True, check=types(config='json'))
+    @openmotics_api(auth=True, check=types(config='json'), invalidates=ConfigurationVersions.OUTPUTS)
     def set_output_configurations(self, config):
         """
         Set multiple output_configurations.
@@ -1156,7 +1281,7 @@ class WebInterface(object):
         self._gateway_api.set_shutter_group_configurations(config)
         return {}
 
-    @openmotics_api(auth=True, check=types(id=int, fields='json'))
+    @openmotics_api(auth=True, check=types(id=int, fields='json'), versioned=ConfigurationVersions.INPUTS)
     def get_input_configuration(self, id, fields=None):
         """
         Get a specific input_configuration defined by its id.
@@ -1170,7 +1295,7 @@ class WebInterface(object):
         """
         return {'config': self._gateway_api.get_input_configuration(id, fields)}
 
-    @openmotics_api(auth=True, check=types(fields='json'))
+    @openmotics_api(auth=True, check=types(fields='json'), versioned=ConfigurationVersions.INPUTS)
     def get_input_configurations(self, fields=None):
         """
         Get all input_configurations.
@@ -1182,7 +1307,7 @@ class WebInterface(object):
         """
         return {'config': self._gateway_api.get_input_configurations(fields)}
 
-    @openmotics_api(auth=True, check=types(config='json'))
+    @openmotics_api(auth=True, check=types(config='json'), invalidates=ConfigurationVersions.INPUTS)
     def set_input_configuration(self, config):
         """
         Set one input_configuration.
@@ -1193,7 +1318,7 @@ class WebInterface(object):
         self._gateway_api.set_input_configuration(config)
         return {}
 
-    @openmotics_api(auth=True, check=types(config='json'))
+    @openmotics_api(auth=True, check=types(config='json'), invalidates=ConfigurationVersions.INPUTS)
     def set_input_configurations(self, config):
         """
         Set multiple input_configurations.
@@ -1204,7 +1329,7 @@ class WebInterface(object):
         self._gateway_api.set_input_configurations(config)
         return {}
 
-    @openmotics_api(auth=True, check=types(id=int, fields='json'))
+    @openmotics_api(auth=True, check=types(id=int, fields='json'), versioned=ConfigurationVersions.THERMOSTATS)
     def get_thermostat_configuration(self, id, fields=None):
         """
         Get a specific thermostat_configuration defined by its id.
@@ -1218,7 +1343,7 @@ class WebInterface(object):
         """
         return {'config': self._thermostat_controller.v0_get_thermostat_configuration(id, fields)}
 
-    @openmotics_api(auth=True, check=types(fields='json'))
+    @openmotics_api(auth=True, check=types(fields='json'), versioned=ConfigurationVersions.THERMOSTATS)
     def get_thermostat_configurations(self, fields=None):
         """
         Get all thermostat_configurations.
@@ -1230,7 +1355,7 @@ class WebInterface(object):
         """
         return {'config': self._thermostat_controller.v0_get_thermostat_configurations(fields)}
 
-    @openmotics_api(auth=True, check=types(config='json'))
+    @openmotics_api(auth=True, check=types(config='json'), invalidates=ConfigurationVersions.THERMOSTATS)
     def set_thermostat_configuration(self, config):
         """
         Set one thermostat_configuration.
@@ -1241,7 +1366,7 @@ class WebInterface(object):
         self._thermostat_controller.v0_set_thermostat_configuration(config)
         return {}
 
-    @openmotics_api(auth=True, check=types(config='json'))
+    @openmotics_api(auth=True, check=types(config='json'), invalidates=ConfigurationVersions.THERMOSTATS)
     def set_thermostat_configurations(self, config):
         """
         Set multiple thermostat_configurations.
@@ -1765,7 +1890,7 @@ class WebInterface(object):
         """
         return {'config': self._thermostat_controller.v0_get_global_thermostat_configuration(fields)}
 
-    @openmotics_api(auth=True, check=types(config='json'))
+    @openmotics_api(auth=True, check=types(config='json'), invalidates=ConfigurationVersions.THERMOSTATS)
     def set_global_thermostat_configuration(self, config):
         """
         Set the global_thermostat_configuration.
@@ -2216,15 +2341,16 @@ class WebInterface(object):
         """
         Get the installed plugins.
 
-        :returns: 'plugins': dict with name, version and interfaces where name and version \
-            are strings and interfaces is a list of tuples (interface, version) which are both strings.
+        :returns: 'plugins': dict with name, version, interfaces and status where name and version \
+            are strings and interfaces is a list of tuples (interface, version) which are both strings. The \
+            status is one of STOPPED, STARTING, RUNNING or FAILED.
         :rtype: dict
         """
         plugins = self._plugin_controller.get_plugins()
         ret = [{'name': p.name,
                 'version': p.version,
                 'interfaces': p.interfaces,
-                'status': 'RUNNING' if p.is_running() else 'STOPPED'} for p in plugins]
+                'status': p.get_state()} for p in plugins]
         return {'plugins': ret}
 
     @openmotics_api(auth=True, plugin_exposed=False)
@@ -2333,25 +2459,45 @@ class WebInterface(object):
         self._gateway_api.factory_reset()
         return {}
 
+    @openmotics_api(auth=True, check=types(datasets='json'))
+    def get_status_snapshot(self, datasets=None):
+        """
+        Returns the status of several subsystems at once. Each dataset contains the same information as
+        its dedicated API call, but without the 'success' flag. A dataset that can't be loaded is omitted.
+
+        :param datasets: List of datasets to load, all datasets when not specified. Available datasets:
+            'power' (get_realtime_power), 'pulse_counters' (get_pulse_counter_status), 'outputs'
+            (get_output_status), 'inputs' (get_input_status), 'shutters' (get_shutter_status),
+            'thermostats' (get_thermostat_status) and 'errors' (get_errors).
+        :type datasets: list
+        :returns: 'snapshot': dict with the requested dataset names as keys.
+        :rtype: dict
+        """
+        loaders = {'power': self._gateway_api.get_realtime_power,
+                   'pulse_counters': lambda: {'counters': self._gateway_api.get_pulse_counter_status()},
+                   'outputs': lambda: {'status': self._gateway_api.get_outputs_status()},
+                   'inputs': lambda: {'status': self._gateway_api.get_input_status()},
+                   'shutters': self._gateway_api.get_shutter_status,
+                   'thermostats': self._thermostat_controller.v0_get_thermostat_status,
+                   'errors': self._get_errors}
+        if datasets is None:
+            datasets = loaders.keys()
+        snapshot = {}
+        for dataset in datasets:
+            loader = loaders.get(dataset)
+            if loader is None:
+                raise ValueError('Unknown dataset {0}'.format(dataset))
+            try:
+                snapshot[dataset] = loader()
+            except Exception as ex:
+                logger.error('Could not load dataset %s for status snapshot: %s', dataset, ex)
+        return {'snapshot': snapshot}
+
     @openmotics_api(auth=False)
     def health_check(self):
-        """ Requests the state of the various services and checks the returned value for the global state """
+        """ Serves the state of the various services, as last checked by the health monitor """
         health = {'openmotics': {'state': True}}
-        try:
-            state = self._message_client.get_state('vpn_service', {})
-            health['vpn_service'] = {'state': state.get('last_cycle', 0) > time.time() - 300}
-        except Exception as ex:
-            logger.error('Error loading vpn_service health: %s', ex)
-            health['vpn_service'] = {'state': False}
-        try:
-            state = self._message_client.get_state('led_service', {})
-            state_ok = True
-            for run in ['run_gpio', 'run_i2c', 'run_buttons', 'run_state_check']:
-                state_ok = state_ok and (state.get(run, 0) > time.time() - 5)
-            health['led_service'] = {'state': state_ok}
-        except Exception as ex:
-            logger.error('Error loading led_service health: %s', ex)
-            health['led_service'] = {'state': False}
+        health.update(self._health_monitor.get_service_health())
         return {'health': health,
                 'health_version': 1.0}
 
@@ -2389,6 +2535,28 @@ class WebInterface(object):
                                                 'interface': self}
 
 
+class PluginDispatcher(object):
+    """
+    Routes `/plugins/<name>/...` requests to the plugin web services. The routing table is consulted
+    on every request, so plugins can be (un)mounted without restarting the HTTP servers.
+    """
+
+    SCRIPT_NAME = '/plugins'
+
+    def __init__(self):
+        self._routes = {}
+
+    def set_routes(self, routes):
+        """ Replaces the routing table (plugin name -> plugin web service root) """
+        self._routes = routes  # Replaced as a whole, so requests in flight see either the old or the new table
+
+    def _cp_dispatch(self, vpath):
+        root = self._routes.get(vpath[0])
+        if root is not None:
+            vpath.pop(0)
+        return root
+
+
 @Injectable.named('web_service')
 @Singleton
 class WebService(object):
@@ -2402,6 +2570,7 @@ class WebService(object):
         self._config_controller = configuration_controller
         self._https_server = None
         self._http_server = None
+        self._plugin_dispatcher = PluginDispatcher()
         self._running = False
         if not verbose:
             logging.getLogger("cherrypy").propagate = False
@@ -2429,6 +2598,10 @@ class WebService(object):
 
             cherrypy.tree.mount(root=self._webinterface,
                                 config=config)
+            cherrypy.tree.mount(root=self._plugin_dispatcher,
+                                script_name=PluginDispatcher.SCRIPT_NAME,
+                                config={'/': {'tools.sessions.on': False,
+                                              'tools.trailing_slash.on': False}})
 
             cherrypy.config.update({'engine.autoreload.on': False})
             cherrypy.server.unsubscribe()
@@ -2494,26 +2667,20 @@ class WebService(object):
         logger.info('Stopping webserver... Done')
 
     def update_tree(self, mounts):
-        try:
-            self._http_server.stop()
-        except Exception as ex:
-            logger.error('Could not stop non-secure webserver: {0}'.format(ex))
-        try:
-            self._https_server.stop()
-        except Exception as ex:
-            logger.error('Could not stop secure webserver: {0}'.format(ex))
-        try:
-            for mount in mounts:
-                cherrypy.tree.mount(**mount)
-        except Exception as ex:
-            logger.error('Could not mount updated tree: {0}'.format(ex))
-        try:
-            self._http_server.start()
-            self._http_server.httpserver.error_log = WebService._http_server_logger
-        except Exception as ex:
-            logger.error('Could not restart non-secure webserver: {0}'.format(ex))
-        try:
-            self._https_server.start()
-            self._https_server.httpserver.error_log = WebService._http_server_logger
-        except Exception as ex:
-            logger.error('Could not restart secure webserver: {0}'.format(ex))
+        """
+        Updates the mounted applications. Plugin mounts are routed through the plugin dispatcher, other
+        mounts are added to the CherryPy tree. Neither requires the HTTP servers to be restarted.
+        """
+        routes = {}
+        for mount in mounts:
+            script_name = mount.get('script_name', '')
+            root = mount['root']
+            if script_name.startswith(PluginDispatcher.SCRIPT_NAME + '/'):
+                root._cp_config = mount.get('config', {}).get('/', {})
+                routes[script_name[len(PluginDispatcher.SCRIPT_NAME) + 1:]] = root
+            else:
+                try:
+                    cherrypy.tree.mount(**mount)
+                except Exception as ex:
+                    logger.error('Could not mount {0}: {1}'.format(script_name, ex))
+        self._plugin_dispatcher.set_routes(routes)
@@ -22,6 +22,9 @@ from platform_utils import System, Platform
 System.import_libs()
 
 import fcntl
+import os
+import select
+import socket
 import time
 import constants
 import logging
@@ -51,20 +54,30 @@ def setup_logger():
 
 class LedController(object):
     """
-    The LEDController contains all logic to control the leds, and read out the physical buttons
+    The LEDController contains all logic to control the leds, and read out the physical buttons.
+
+    A single loop drives the leds, checks the network and reads the button. The loop runs every
+    TICK seconds while leds are blinking, and otherwise every IDLE_TICK seconds. Network link changes
+    (netlink), button presses (GPIO edges) and bus events wake up the loop, if available.
     """
 
+    TICK = 0.25
+    IDLE_TICK = 1.0
+    NETLINK_ROUTE = 0
+    RTMGRP_LINK = 1
+
     def __init__(self, i2c_device, i2c_address, input_button):
         self._i2c_device = i2c_device
         self._i2c_address = i2c_address
         self._input_button = input_button
         self._input_button_pressed_since = None
         self._input_button_released = True
-        self._ticks = 0
+        self._button_pressed = False
 
         self._network_enabled = False
         self._network_activity = False
         self._network_bytes = 0
+        self._network_changed = True
 
         self._serial_activity = {4: False, 5: False}
         self._enabled_leds = {}
@@ -78,9 +91,10 @@ class LedController(object):
         self._authorized_mode = False
         self._authorized_timeout = 0
 
-        self._check_states_thread = None
-        self._leds_thread = None
-        self._button_thread = None
+        self._thread = None
+        self._netlink = None
+        self._button_file = None
+        self._wakeup_pipe = os.pipe()
 
         self._last_run_i2c = 0
         self._last_run_gpio = 0
@@ -101,20 +115,15 @@ class LedController(object):
     def start(self):
         """ Start the leds and buttons thread. """
         self._running = True
-        self._check_states_thread = Thread(target=self._check_states)
-        self._check_states_thread.daemon = True
-        self._check_states_thread.start()
-
-        self._leds_thread = Thread(target=self.drive_leds)
-        self._leds_thread.daemon = True
-        self._leds_thread.start()
-
-        self._button_thread = Thread(target=self.check_button)
-        self._button_thread.daemon = True
-        self._button_thread.start()
+        self._netlink = LedController._open_netlink()
+        self._button_file = LedController._open_button(self._input_button)
+        self._thread = Thread(target=self._run, name='LedController loop')
+        self._thread.daemon = True
+        self._thread.start()
 
     def stop(self):
         self._running = False
+        self._wakeup()
 
     def set_led(self, led_name, enable):
         """ Set the state of a LED, enabled means LED on in this context. """
@@ -129,12 +138,82 @@ class LedController(object):
         self._serial_activity[port] = True
 
     @staticmethod
-    def _is_button_pressed(gpio_pin):
+    def _open_netlink():
+        """ Opens a netlink socket receiving the network link changes, if supported """
+        try:
+            netlink = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, LedController.NETLINK_ROUTE)
+            netlink.bind((0, LedController.RTMGRP_LINK))
+            netlink.setblocking(False)
+            return netlink
+        except Exception as exception:
+            logger.warning('Network link changes not available, falling back to polling: {0}'.format(exception))
+            return None
+
+    @staticmethod
+    def _open_button(gpio_pin):
+        """ Opens the input button with edge notifications, if supported """
+        try:
+            with open('/sys/class/gpio/gpio{0}/edge'.format(gpio_pin), 'w') as fh_edge:
+                fh_edge.write('both')
+            button_file = open('/sys/class/gpio/gpio{0}/value'.format(gpio_pin), 'r')
+            button_file.read()  # Clears the pending notification
+            return button_file
+        except Exception as exception:
+            logger.warning('Button edges not available, falling back to polling: {0}'.format(exception))
+            return None
+
+    def _is_button_pressed(self):
         """ Read the input button: returns True if the button is pressed, False if not. """
-        with open('/sys/class/gpio/gpio{0}/value'.format(gpio_pin), 'r') as fh_inp:
-            line = fh_inp.read()
+        if self._button_file is not None:
+            self._button_file.seek(0)
+            line = self._button_file.read()
+        else:
+            with open('/sys/class/gpio/gpio{0}/value'.format(self._input_button), 'r') as fh_inp:
+                line = fh_inp.read()
         return int(line) == 0
 
+    def _wakeup(self):
+        """ Wakes up the loop, e.g. to handle a bus event immediately """
+        os.write(self._wakeup_pipe[1], 'x')
+
+    def _wait(self, timeout):
+        """ Waits for the timeout to pass, or a notification to arrive """
+        read_list = [self._wakeup_pipe[0]]
+        if self._netlink is not None:
+            read_list.append(self._netlink)
+        exception_list = [self._button_file] if self._button_file is not None else []
+        readable, _, _ = select.select(read_list, [], exception_list, timeout)
+        if self._wakeup_pipe[0] in readable:
+            os.read(self._wakeup_pipe[0], 1024)
+        if self._netlink is not None and self._netlink in readable:
+            try:
+                while self._netlink.recv(65536):
+                    pass
+            except socket.error:
+                pass  # All messages are read
+            self._network_changed = True
+
+    def _is_blinking(self):
+        """ Returns whether any led needs to be updated on the next tick """
+        now = time.time()
+        return (self._network_activity or
+                self._button_pressed or
+                self._button_file is None or
+                now - 30 < self._indicate_started < now or
+                any(self._serial_activity.values()) or
+                any(self._enabled_leds.get(led, False) for led in [Hardware.Led.ALIVE, Hardware.Led.COMM_1, Hardware.Led.COMM_2]))
+
+    def _run(self):
+        """ Drives the leds, checks the network and the button """
+        while self._running:
+            try:
+                self._check_states()
+                self._check_button()
+                self._drive_leds()
+            except Exception as exception:
+                logger.error('Error in led loop: {0}'.format(exception))
+            self._wait(LedController.TICK if self._is_blinking() else LedController.IDLE_TICK)
+
     def _write_leds(self):
         """ Set the LEDs using the current status. """
         try:
@@ -177,102 +256,88 @@ class LedController(object):
 
     def _check_states(self):
         """ Checks various states of the system (network) """
-        while self._running:
-            try:
+        try:
+            if self._network_changed or self._netlink is None:
+                self._network_changed = False
                 with open('/sys/class/net/eth0/carrier', 'r') as fh_up:
                     line = fh_up.read()
                 self._network_enabled = int(line) == 1
 
-                with open('/proc/net/dev', 'r') as fh_stat:
-                    for line in fh_stat.readlines():
-                        if 'eth0' in line:
-                            received, transmitted = 0, 0
-                            parts = line.split()
-                            if len(parts) == 17:
-                                received = parts[1]
-                                transmitted = parts[9]
-                            elif len(parts) == 16:
-                                (_, received) = tuple(parts[0].split(':'))
-                                transmitted = parts[8]
-                            new_bytes = received + transmitted
-                            if self._network_bytes != new_bytes:
-                                self._network_bytes = new_bytes
-                                self._network_activity = True
-                            else:
-                                self._network_activity = False
-            except Exception as exception:
-                logger.error('Error while checking states: {0}'.format(exception))
-            self._last_state_check = time.time()
-            time.sleep(0.5)
+            new_bytes = 0
+            for counter in ['rx_bytes', 'tx_bytes']:
+                with open('/sys/class/net/eth0/statistics/{0}'.format(counter), 'r') as fh_stat:
+                    new_bytes += int(fh_stat.read())
+            self._network_activity = self._network_bytes != new_bytes
+            self._network_bytes = new_bytes
+        except Exception as exception:
+            logger.error('Error while checking states: {0}'.format(exception))
+        self._last_state_check = time.time()
 
-    def drive_leds(self):
+    def _drive_leds(self):
         """ This drives different leds (status, alive and serial) """
-        while self._running:
-            start = time.time()
-            try:
-                now = time.time()
-                if now - 30 < self._indicate_started < now:
-                    self.set_led(Hardware.Led.STATUS, self._indicate_sequence[self._indicate_pointer])
-                    self._indicate_pointer = self._indicate_pointer + 1 if self._indicate_pointer < len(self._indicate_sequence) - 1 else 0
-                else:
-                    self.set_led(Hardware.Led.STATUS, not self._network_enabled)
-                if self._network_activity:
-                    self.toggle_led(Hardware.Led.ALIVE)
+        try:
+            now = time.time()
+            if now - 30 < self._indicate_started < now:
+                self.set_led(Hardware.Led.STATUS, self._indicate_sequence[self._indicate_pointer])
+                self._indicate_pointer = self._indicate_pointer + 1 if self._indicate_pointer < len(self._indicate_sequence) - 1 else 0
+            else:
+                self.set_led(Hardware.Led.STATUS, not self._network_enabled)
+            if self._network_activity:
+                self.toggle_led(Hardware.Led.ALIVE)
+            else:
+                self.set_led(Hardware.Led.ALIVE, False)
+            # Calculate serial led states
+            comm_map = {4: Hardware.Led.COMM_1,
+                        5: Hardware.Led.COMM_2}
+            for uart in [4, 5]:
+                if self._serial_activity[uart]:
+                    self.toggle_led(comm_map[uart])
                 else:
-                    self.set_led(Hardware.Led.ALIVE, False)
-                # Calculate serial led states
-                comm_map = {4: Hardware.Led.COMM_1,
-                            5: Hardware.Led.COMM_2}
-                for uart in [4, 5]:
-                    if self._serial_activity[uart]:
-                        self.toggle_led(comm_map[uart])
-                    else:
-                        self.set_led(comm_map[uart], False)
-                    self._serial_activity[uart] = False
-                # Update all leds
-                self._write_leds()
-            except Exception as exception:
-                logger.error('Error while driving leds: {0}'.format(exception))
-            duration = time.time() - start
-            time.sleep(max(0.05, 0.25 - duration))
+                    self.set_led(comm_map[uart], False)
+                self._serial_activity[uart] = False
+            # Update all leds, only changed leds are written
+            self._write_leds()
+        except Exception as exception:
+            logger.error('Error while driving leds: {0}'.format(exception))
 
-    def check_button(self):
+    def _check_button(self):
         """ Handles input button presses """
-        while self._running:
-            try:
-                button_pressed = LedController._is_button_pressed(self._input_button)
-                if button_pressed is False:
-                    self._input_button_released = True
-                if self._authorized_mode:
-                    if time.time() > self._authorized_timeout or (button_pressed and self._input_button_released):
-                        self._authorized_mode = False
-                else:
-                    if button_pressed:
-                        self._ticks += 0.25
-                        self._input_button_released = False
-                        if self._input_button_pressed_since is None:
-                            self._input_button_pressed_since = time.time()
-                        if self._ticks > 5.75:  # After 5.75 seconds + time to execute the code it should be pressed between 5.8 and 6.5 seconds.
-                            self._authorized_mode = True
-                            self._authorized_timeout = time.time() + 60
-                            self._input_button_pressed_since = None
-                            self._ticks = 0
-                    else:
+        try:
+            now = time.time()
+            button_pressed = self._is_button_pressed()
+            self._button_pressed = button_pressed
+            if button_pressed is False:
+                self._input_button_released = True
+            if self._authorized_mode:
+                if now > self._authorized_timeout or (button_pressed and self._input_button_released):
+                    self._authorized_mode = False
+            else:
+                if button_pressed:
+                    self._input_button_released = False
+                    if self._input_button_pressed_since is None:
+                        self._input_button_pressed_since = now
+                    if now - self._input_button_pressed_since > 5.75:  # It should be pressed between 5.8 and 6.5 seconds.
+                        self._authorized_mode = True
+                        self._authorized_timeout = now + 60
                         self._input_button_pressed_since = None
-            except Exception as exception:
-                logger.error('Error while checking button: {0}'.format(exception))
-            self._last_button_check = time.time()
-            time.sleep(0.25)
+                else:
+                    self._input_button_pressed_since = None
+        except Exception as exception:
+            logger.error('Error while checking button: {0}'.format(exception))
+        self._last_button_check = time.time()
 
     def event_receiver(self, event, payload):
         if event == OMBusEvents.CLOUD_REACHABLE:
             self.set_led(Hardware.Led.CLOUD, payload)
+            self._wakeup()
         elif event == OMBusEvents.VPN_OPEN:
             self.set_led(Hardware.Led.VPN, payload)
+            self._wakeup()
         elif event == OMBusEvents.SERIAL_ACTIVITY:
-            self.serial_activity(payload)
+            self.serial_activity(payload)  # Picked up on the next tick, to keep the blinking rhythm
         elif event == OMBusEvents.INDICATE_GATEWAY:
             self._indicate_started = time.time()
+            self._wakeup()
 
     def get_state(self):
         authorized_mode = self._authorized_mode
@@ -22,6 +22,7 @@ import logging
 from threading import Lock
 from ioc import Injectable, Inject, INJECTED, Singleton
 from master_api import eeprom_list, write_eeprom, activate_eeprom
+from gateway.config_versions import configuration_versions
 
 logger = logging.getLogger("openmotics")
 
@@ -119,6 +120,7 @@ class EepromController(object):
             if self._eeprom_file.write(eeprom_data):
                 self._eeprom_file.activate()
                 self.dirty = True
+                configuration_versions.bump()
         # Write the extensions
         eext_data = []
         for eeprom_model in eeprom_models:
@@ -126,6 +128,7 @@ class EepromController(object):
         if len(eext_data) > 0:
             self._eeprom_extension.write_data(eext_data)
             self.dirty = True
+            configuration_versions.bump()
 
 
 @Injectable.named('eeprom_file')
@@ -149,6 +152,7 @@ class EepromFile(object):
     def invalidate_cache(self):
         """ Invalidate the cache, this should happen when maintenance mode was used. """
         self._bank_cache = {}
+        configuration_versions.bump()
 
     def activate(self):
         """
@@ -18,6 +18,7 @@ Input status keeps track of the last X pressed inputs, pressed in the last X sec
 
 import time
 import logging
+from collections import OrderedDict
 from threading import Lock
 
 if False:  # MYPY
@@ -26,6 +27,40 @@ if False:  # MYPY
 logger = logging.getLogger("openmotics")
 
 
+class RecentInputs(object):
+    """
+    Keeps the last changed inputs in order of their last change, limited to a fixed number of
+    inputs. Recording a change and getting the recent inputs don't depend on the number of inputs.
+    """
+
+    def __init__(self, num_inputs=5, seconds=10):
+        self._num_inputs = num_inputs
+        self._seconds = seconds
+        self._changes = OrderedDict()  # type: OrderedDict
+        self._lock = Lock()
+
+    def add(self, input_id, changed_at):
+        # type: (int, float) -> None
+        with self._lock:
+            self._changes.pop(input_id, None)
+            self._changes[input_id] = changed_at
+            if len(self._changes) > self._num_inputs:
+                self._changes.popitem(last=False)
+
+    def remove(self, input_id):
+        # type: (int) -> None
+        with self._lock:
+            self._changes.pop(input_id, None)
+
+    def get(self):
+        # type: () -> List[int]
+        """ Get the inputs changed in the last `seconds`, the most recent change last. """
+        threshold = time.time() - self._seconds
+        with self._lock:
+            return [input_id for input_id, changed_at in self._changes.iteritems()
+                    if changed_at > threshold]
+
+
 class InputStatus(object):
     """ Contains the last Y inputs pressed the last Y seconds. """
 
@@ -34,27 +69,15 @@ class InputStatus(object):
         Create an InputStatus, specifying the number of inputs to track and
         the number of seconds to keep the data.
         """
-        self._num_inputs = num_inputs
-        self._seconds = seconds
+        self._recent_inputs = RecentInputs(num_inputs, seconds)
         self._inputs_status = {}
         self._state_change_lock = Lock()
         self._on_input_change = on_input_change
 
-    def _sorted_inputs(self):
-        return sorted(self._inputs_status.itervalues(),
-                      key=lambda x: x.get('last_status_change'))
-
     def get_recent(self):
         # type: () -> List[int]
         """ Get the last n triggered inputs. """
-        last_inputs = []
-        threshold = time.time() - self._seconds
-        for current_state in self._sorted_inputs():
-            last_status_change = current_state.get('last_status_change')
-            if last_status_change > threshold:
-                last_inputs.append(current_state['id'])
-        # limit result size
-        return last_inputs[-self._num_inputs:]
+        return self._recent_inputs.get()
 
     def set_input(self, data):
         """ Set the input status. """
@@ -79,6 +102,7 @@ class InputStatus(object):
                 current_state['status'] = None
             if state_changed:
                 current_state['last_status_change'] = now
+                self._recent_inputs.add(input_id, now)
                 self._report_change(input_id, new_status)
             # store in memory
             self._inputs_status[input_id] = current_state
@@ -105,6 +129,7 @@ class InputStatus(object):
             self.set_input(input)
         for input_id in obsolete_ids:
             del self._inputs_status[input_id]
+            self._recent_inputs.remove(input_id)
 
     def _report_change(self, input_id, status):
         if self._on_input_change is not None:
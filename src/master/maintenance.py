@@ -20,7 +20,7 @@ import time
 import logging
 from threading import Timer, Thread
 from ioc import Injectable, Inject, INJECTED, Singleton
-from gateway.maintenance_communicator import MaintenanceCommunicator
+from gateway.maintenance_communicator import LineBuffer, MaintenanceCommunicator
 
 logger = logging.getLogger('openmotics')
 
@@ -122,18 +122,16 @@ class MaintenanceClassicCommunicator(MaintenanceCommunicator):
 
     def _read_data(self):
         """ Reads from the serial port and writes to the socket. """
-        buffer = ''
+        line_buffer = LineBuffer()
         while not self._stopped:
             try:
-                data = self._master_communicator.get_maintenance_data()
+                data = self._master_communicator.get_maintenance_data()  # Blocks until data is available
                 if data is None:
                     continue
-                buffer += data
-                while '\n' in buffer:
-                    message, buffer = buffer.split('\n', 1)
+                for message in line_buffer.feed(data):
                     if self._receiver_callback is not None:
                         try:
-                            self._receiver_callback(message.rstrip())
+                            self._receiver_callback(message)
                         except Exception:
                             logger.exception('Unexpected exception during maintenance callback')
             except Exception:
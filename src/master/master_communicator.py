@@ -24,7 +24,7 @@ from ioc import Injectable, Inject, INJECTED, Singleton
 from gateway.maintenance_communicator import InMaintenanceModeException
 from master import master_api
 from master_command import Field, printable
-from serial_utils import CommunicationTimedOutException
+from serial_utils import CommunicationTimedOutException, CommunicationStatistics, DebugBuffer
 
 logger = logging.getLogger("openmotics")
 
@@ -76,13 +76,8 @@ class MasterCommunicator(object):
         self.__read_thread = Thread(target=self.__read, name="MasterCommunicator read thread")
         self.__read_thread.daemon = True
 
-        self.__communication_stats = {'calls_succeeded': [],
-                                      'calls_timedout': [],
-                                      'bytes_written': 0,
-                                      'bytes_read': 0}
-        self.__debug_buffer = {'read': {},
-                               'write': {}}
-        self.__debug_buffer_duration = 300
+        self.__communication_stats = CommunicationStatistics()
+        self.__debug_buffer = DebugBuffer()
 
     def start(self):
         """ Start the MasterComunicator, this starts the background read thread. """
@@ -116,10 +111,13 @@ class MasterCommunicator(object):
         self.__passthrough_enabled = True
 
     def get_communication_statistics(self):
-        return self.__communication_stats
+        return self.__communication_stats.get()
+
+    def get_command_statistics(self):
+        return self.__communication_stats.get_commands()
 
     def get_debug_buffer(self):
-        return self.__debug_buffer
+        return self.__debug_buffer.get()
 
     def get_seconds_since_last_success(self):
         """ Get the number of seconds since the last successful communication. """
@@ -143,14 +141,10 @@ class MasterCommunicator(object):
             if self.__verbose:
                 logger.info('Writing to Master serial:   {0}'.format(printable(data)))
 
-            threshold = time.time() - self.__debug_buffer_duration
-            self.__debug_buffer['write'][time.time()] = printable(data)
-            for t in self.__debug_buffer['write'].keys():
-                if t < threshold:
-                    del self.__debug_buffer['write'][t]
+            self.__debug_buffer.capture('write', data)
 
             self.__serial.write(data)
-            self.__communication_stats['bytes_written'] += len(data)
+            self.__communication_stats.bytes_written += len(data)
 
     def register_consumer(self, consumer):
         """ Register a customer consumer with the communicator. An instance of :class`Consumer`
@@ -206,6 +200,7 @@ class MasterCommunicator(object):
         inp = cmd.create_input(cid, fields, extended_crc)
 
         with self.__command_lock:
+            start = time.time()
             self.__consumers.append(consumer)
             self.__write_to_serial(inp)
             try:
@@ -214,12 +209,10 @@ class MasterCommunicator(object):
                     raise CrcCheckFailedException()
                 else:
                     self.__last_success = time.time()
-                    self.__communication_stats['calls_succeeded'].append(time.time())
-                    self.__communication_stats['calls_succeeded'] = self.__communication_stats['calls_succeeded'][-50:]
+                    self.__communication_stats.record_success(cmd.action, self.__last_success - start)
                     return result
             except CommunicationTimedOutException:
-                self.__communication_stats['calls_timedout'].append(time.time())
-                self.__communication_stats['calls_timedout'] = self.__communication_stats['calls_timedout'][-50:]
+                self.__communication_stats.record_timeout(cmd.action)
                 raise
 
     @staticmethod
@@ -404,13 +397,9 @@ class MasterCommunicator(object):
             if num_bytes > 0:
                 data += self.__serial.read(num_bytes)
             if data is not None and len(data) > 0:
-                self.__communication_stats['bytes_read'] += (1 + num_bytes)
+                self.__communication_stats.bytes_read += (1 + num_bytes)
 
-                threshold = time.time() - self.__debug_buffer_duration
-                self.__debug_buffer['read'][time.time()] = printable(data)
-                for t in self.__debug_buffer['read'].keys():
-                    if t < threshold:
-                        del self.__debug_buffer['read'][t]
+                self.__debug_buffer.capture('read', data)
 
                 if self.__verbose:
                     logger.info('Reading from Master serial: {0}'.format(printable(data)))
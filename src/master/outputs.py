@@ -17,50 +17,77 @@ The outputs module contains classes to track the current state of the outputs on
 the master.
 """
 
+import time
+from collections import deque
 from threading import Lock
 
+if False:  # MYPY
+    from typing import Any, Dict, List, Optional, Tuple
+
 
 class OutputStatus(object):
     """ Contains a cached version of the current output of the controller. """
 
-    def __init__(self, on_output_change=None):
+    def __init__(self, on_output_change=None, history=256):
         """
         Create a status object using a list of outputs (can be None),
         and a refresh period: the refresh has to be invoked explicitly.
+        Every change is recorded as a compact (version, id, status, dimmer) tuple, of which the
+        last `history` are kept for incremental synchronisation. The versions start from the
+        current time in milliseconds, so versions handed out before a restart are always older.
         """
-        self._outputs = {}
+        self._outputs = {}  # type: Dict[int, Dict[str, Any]]
+        self._on_outputs = set()  # type: set
         self._on_output_change = on_output_change
         self._merge_lock = Lock()
+        self._first_version = int(time.time() * 1000)
+        self._version = self._first_version
+        self._changes = deque(maxlen=history)  # type: deque
 
     def partial_update(self, on_outputs):
         """
         Update the status of the outputs using a list of tuples containing the
-        light id an the dimmer value of the lights that are on.
+        light id an the dimmer value of the lights that are on. Only the outputs that
+        are on, or were on before, need to be checked.
         """
         on_dict = {}
         for on_output in on_outputs:
             on_dict[on_output[0]] = on_output[1]
 
         with self._merge_lock:
-            for output_id, output in self._outputs.iteritems():
-                self._update_maybe_report_change(output, {'status': output_id in on_dict,
-                                                          'dimmer': on_dict.get(output_id)})
+            for output_id in self._on_outputs.union(on_dict):
+                output = self._outputs.get(output_id)
+                if output is not None:
+                    self._update_maybe_report_change(output, {'status': output_id in on_dict,
+                                                              'dimmer': on_dict.get(output_id)})
 
     def full_update(self, outputs):
         """ Update the status of the outputs using a list of Outputs. """
         with self._merge_lock:
-            obsolete_ids = self._outputs.keys()
+            obsolete_ids = set(self._outputs)
             for output in outputs:
-                output_id = output['id']
-                if output_id in obsolete_ids:
-                    obsolete_ids.remove(output_id)
-                if output_id in self._outputs:
-                    self._update_maybe_report_change(self._outputs[output_id], output)
-                else:
-                    self._report_change(output_id, status=output['status'], dimmer=output['dimmer'])
-                self._outputs[output_id] = output
+                obsolete_ids.discard(output['id'])
+                self._update_output(output)
             for output_id in obsolete_ids:
                 del self._outputs[output_id]
+                self._on_outputs.discard(output_id)
+
+    def update_output(self, output):
+        """ Update the status of a single Output, e.g. when an output event is received. """
+        with self._merge_lock:
+            self._update_output(output)
+
+    def _update_output(self, output):
+        output_id = output['id']
+        if output_id in self._outputs:
+            self._update_maybe_report_change(self._outputs[output_id], output)
+        else:
+            self._report_change(output_id, status=output['status'], dimmer=output['dimmer'])
+        self._outputs[output_id] = output
+        if output['status']:
+            self._on_outputs.add(output_id)
+        else:
+            self._on_outputs.discard(output_id)
 
     def get_outputs(self):
         """ Return the list of Outputs. """
@@ -70,6 +97,29 @@ class OutputStatus(object):
         """ Return the list of Outputs. """
         return self._outputs.get(output_id)
 
+    def get_version(self):
+        # type: () -> int
+        """ Returns the version of the output status, which is incremented on every change """
+        return self._version
+
+    def get_changes(self, since_version):
+        # type: (int) -> Tuple[int, Optional[List[Tuple[int, int, int, Optional[int]]]]]
+        """
+        Returns the current version and the changes after the given version as a list of
+        (version, id, status, dimmer) tuples. The changes are None if they are no longer
+        available, or if the given version wasn't handed out by this instance (e.g. before
+        a restart), in which case the consumer needs to resynchronise using `get_outputs`.
+        """
+        with self._merge_lock:
+            version = self._version
+            if since_version == version:
+                return version, []
+            if not self._first_version <= since_version < version:
+                return version, None
+            if not self._changes or self._changes[0][0] > since_version + 1:
+                return version, None
+            return version, [change for change in self._changes if change[0] > since_version]
+
     def _update_maybe_report_change(self, output, new_output):
         report = False
         status = new_output['status']  # Something boolean-ish
@@ -79,13 +129,17 @@ class OutputStatus(object):
                 output['status'] = 1
                 output['dimmer'] = dimmer
                 report = True
+            self._on_outputs.add(output['id'])
         else:
             if output.get('status') != 0:
                 output['status'] = 0
                 report = True
+            self._on_outputs.discard(output['id'])
         if report:
             self._report_change(output['id'], status=output['status'], dimmer=output['dimmer'])
 
     def _report_change(self, output_id, status, dimmer):
+        self._version += 1
+        self._changes.append((self._version, output_id, 1 if status else 0, dimmer))
         if self._on_output_change is not None:
             self._on_output_change(output_id, {'on': bool(status), 'value': dimmer})
@@ -24,7 +24,7 @@ from Queue import Queue, Empty
 from ioc import Injectable, Inject, INJECTED, Singleton
 from master_core.core_api import CoreAPI
 from master_core.fields import WordField
-from serial_utils import CommunicationTimedOutException, printable
+from serial_utils import CommunicationTimedOutException, CommunicationStatistics, DebugBuffer, printable
 
 logger = logging.getLogger('openmotics')
 
@@ -67,13 +67,8 @@ class CoreCommunicator(object):
         self._read_thread = Thread(target=self._read, name='CoreCommunicator read thread')
         self._read_thread.setDaemon(True)
 
-        self._communication_stats = {'calls_succeeded': [],
-                                     'calls_timedout': [],
-                                     'bytes_written': 0,
-                                     'bytes_read': 0}
-        self._debug_buffer = {'read': {},
-                              'write': {}}
-        self._debug_buffer_duration = 300
+        self._communication_stats = CommunicationStatistics()
+        self._debug_buffer = DebugBuffer()
 
     def start(self):
         """ Start the CoreComunicator, this starts the background read thread. """
@@ -81,10 +76,13 @@ class CoreCommunicator(object):
         self._read_thread.start()
 
     def get_communication_statistics(self):
-        return self._communication_stats
+        return self._communication_stats.get()
+
+    def get_command_statistics(self):
+        return self._communication_stats.get_commands()
 
     def get_debug_buffer(self):
-        return self._debug_buffer
+        return self._debug_buffer.get()
 
     def get_seconds_since_last_success(self):
         """ Get the number of seconds since the last successful communication. """
@@ -129,15 +127,11 @@ class CoreCommunicator(object):
             if self._verbose:
                 logger.info('Writing to Core serial:   {0}'.format(printable(data)))
 
-            threshold = time.time() - self._debug_buffer_duration
-            self._debug_buffer['write'][time.time()] = printable(data)
-            for t in self._debug_buffer['write'].keys():
-                if t < threshold:
-                    del self._debug_buffer['write'][t]
+            self._debug_buffer.capture('write', data)
 
             self._serial.write(data)
             self._serial_bytes_written += len(data)
-            self._communication_stats['bytes_written'] += len(data)
+            self._communication_stats.bytes_written += len(data)
 
     def register_consumer(self, consumer):
         """
@@ -202,6 +196,7 @@ class CoreCommunicator(object):
         :raises: serial_utils.CommunicationTimedOutException
         :returns: dict containing the output fields of the command
         """
+        start = time.time()
         cid = self._get_cid()
         consumer = Consumer(command, cid)
         command = consumer.command
@@ -218,12 +213,10 @@ class CoreCommunicator(object):
             if isinstance(consumer, Consumer) and timeout is not None:
                 result = consumer.get(timeout)
             self._last_success = time.time()
-            self._communication_stats['calls_succeeded'].append(time.time())
-            self._communication_stats['calls_succeeded'] = self._communication_stats['calls_succeeded'][-50:]
+            self._communication_stats.record_success(command.instruction, self._last_success - start)
             return result
         except CommunicationTimedOutException:
-            self._communication_stats['calls_timedout'].append(time.time())
-            self._communication_stats['calls_timedout'] = self._communication_stats['calls_timedout'][-50:]
+            self._communication_stats.record_timeout(command.instruction)
             raise
 
     def _send_command(self, cid, command, fields):
@@ -293,7 +286,7 @@ class CoreCommunicator(object):
 
                 # Update counters
                 self._serial_bytes_read += num_bytes
-                self._communication_stats['bytes_read'] += num_bytes
+                self._communication_stats.bytes_read += num_bytes
 
                 # Wait for a speicific number of bytes, or the header length
                 if (wait_for_length is None and len(data) < header_length) or len(data) < wait_for_length:
@@ -323,11 +316,7 @@ class CoreCommunicator(object):
                 # A possible message is received, log where appropriate
                 if self._verbose:
                     logger.info('Reading from Core serial: {0}'.format(printable(message)))
-                threshold = time.time() - self._debug_buffer_duration
-                self._debug_buffer['read'][time.time()] = printable(message)
-                for t in self._debug_buffer['read'].keys():
-                    if t < threshold:
-                        del self._debug_buffer['read'][t]
+                self._debug_buffer.capture('read', message)
 
                 # Validate message boundaries
                 correct_boundaries = message.startswith(CoreCommunicator.START_OF_REPLY) and message.endswith(CoreCommunicator.END_OF_REPLY)
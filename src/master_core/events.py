@@ -17,7 +17,6 @@ Module to handle Events from the Core
 """
 
 import logging
-from master_core.fields import WordField
 
 logger = logging.getLogger('openmotics')
 
@@ -47,23 +46,35 @@ class Event(object):
         MASTER = 'MASTER'
         UNKNOWN = 'UNKNOWN'
 
+    _TYPE_MAP = {0: Types.OUTPUT,
+                 1: Types.INPUT,
+                 2: Types.SENSOR,
+                 20: Types.THERMOSTAT,
+                 254: Types.SYSTEM}
+    _SENSOR_TYPE_MAP = {0: SensorType.TEMPERATURE,
+                        1: SensorType.HUMIDITY,
+                        2: SensorType.BRIGHTNESS}
+    _THERMOSTAT_ORIGIN_MAP = {0: ThermostatOrigins.SLAVE,
+                              1: ThermostatOrigins.MASTER}
+    _SYSTEM_EVENT_TYPE_MAP = {0: SystemEventTypes.EEPROM_ACTIVATE,
+                              1: SystemEventTypes.ONBOARD_TEMP_CHANGED}
+
+    __slots__ = ('type', '_action', '_device_nr', '_data', '_decoded_data')
+
     def __init__(self, data):
-        self._type = data['type']
+        self.type = Event._TYPE_MAP.get(data['type'], Event.Types.UNKNOWN)
         self._action = data['action']
         self._device_nr = data['device_nr']
         self._data = data['data']
-
-    @property
-    def type(self):
-        type_map = {0: Event.Types.OUTPUT,
-                    1: Event.Types.INPUT,
-                    2: Event.Types.SENSOR,
-                    20: Event.Types.THERMOSTAT,
-                    254: Event.Types.SYSTEM}
-        return type_map.get(self._type, Event.Types.UNKNOWN)
+        self._decoded_data = None  # Decoded on first use, only once
 
     @property
     def data(self):
+        if self._decoded_data is None:
+            self._decoded_data = self._decode()
+        return self._decoded_data
+
+    def _decode(self):
         if self.type == Event.Types.OUTPUT:
             timer_type = 'NO_TIMER'
             timer_factor = None
@@ -81,36 +92,27 @@ class Event(object):
                     'dimmer_value': self._data[0],
                     'timer_type': timer_type,
                     'timer_factor': timer_factor,
-                    'timer_value': Event._word_decode(self._data[2:])}
+                    'timer_value': Event._word_decode(self._data, 2)}
         if self.type == Event.Types.INPUT:
             return {'input': self._device_nr,
                     'status': self._action == 1}
         if self.type == Event.Types.SENSOR:
-            sensor_type = Event.SensorType.UNKNOWN
+            sensor_type = Event._SENSOR_TYPE_MAP.get(self._action, Event.SensorType.UNKNOWN)
             sensor_value = None
-            if self._action == 0:
-                sensor_type = Event.SensorType.TEMPERATURE
-                sensor_value = self._data[1]
-            elif self._action == 1:
-                sensor_type = Event.SensorType.HUMIDITY
+            if sensor_type == Event.SensorType.BRIGHTNESS:
+                sensor_value = Event._word_decode(self._data, 0)
+            elif sensor_type != Event.SensorType.UNKNOWN:
                 sensor_value = self._data[1]
-            elif self._action == 2:
-                sensor_type = Event.SensorType.BRIGHTNESS
-                sensor_value = Event._word_decode(self._data[0:2])
             return {'sensor': self._device_nr,
                     'type': sensor_type,
                     'value': sensor_value}
         if self.type == Event.Types.THERMOSTAT:
-            origin_map = {0: Event.ThermostatOrigins.SLAVE,
-                          1: Event.ThermostatOrigins.MASTER}
-            return {'origin': origin_map.get(self._action, Event.ThermostatOrigins.UNKNOWN),
+            return {'origin': Event._THERMOSTAT_ORIGIN_MAP.get(self._action, Event.ThermostatOrigins.UNKNOWN),
                     'thermostat': self._device_nr,
                     'mode': self._data[0],
                     'setpoint': self._data[1]}
         if self.type == Event.Types.SYSTEM:
-            type_map = {0: Event.SystemEventTypes.EEPROM_ACTIVATE,
-                        1: Event.SystemEventTypes.ONBOARD_TEMP_CHANGED}
-            event_type = type_map.get(self._action, Event.SystemEventTypes.UNKNOWN)
+            event_type = Event._SYSTEM_EVENT_TYPE_MAP.get(self._action, Event.SystemEventTypes.UNKNOWN)
             event_data = {'type': event_type}
             if event_type == Event.SystemEventTypes.ONBOARD_TEMP_CHANGED:
                 event_data['temperature'] = self._data[0]
@@ -118,8 +120,8 @@ class Event(object):
         return None
 
     @staticmethod
-    def _word_decode(data):
-        return WordField.decode(str(chr(data[0])) + str(chr(data[1])))
+    def _word_decode(data, offset):
+        return data[offset] * 256 + data[offset + 1]
 
     def __str__(self):
         return '{0} ({1})'.format(self.type, self.data)
@@ -16,11 +16,10 @@
 The maintenance module contains the MaintenanceService class.
 """
 
-import time
 import logging
 from threading import Thread, Lock
 from ioc import Injectable, Inject, INJECTED, Singleton
-from gateway.maintenance_communicator import MaintenanceCommunicator
+from gateway.maintenance_communicator import LineBuffer, MaintenanceCommunicator
 
 logger = logging.getLogger('openmotics')
 
@@ -29,6 +28,8 @@ logger = logging.getLogger('openmotics')
 @Singleton
 class MaintenanceCoreCommunicator(MaintenanceCommunicator):
 
+    READ_TIMEOUT = 0.1
+
     @Inject
     def __init__(self, cli_serial=INJECTED):
         """
@@ -47,12 +48,16 @@ class MaintenanceCoreCommunicator(MaintenanceCommunicator):
 
     def start(self):
         self._stopped = False
+        self._serial.timeout = MaintenanceCoreCommunicator.READ_TIMEOUT  # The read thread needs to notice when it's stopped
         self._read_data_thread = Thread(target=self._read_data, name='Core maintenance read thread')
         self._read_data_thread.daemon = True
         self._read_data_thread.start()
 
     def stop(self):
         self._stopped = True
+        if self._read_data_thread is not None:
+            self._read_data_thread.join()  # The port is used by others (e.g. the core updater) right after stopping
+            self._read_data_thread = None
 
     def is_active(self):
         return self._active
@@ -73,29 +78,22 @@ class MaintenanceCoreCommunicator(MaintenanceCommunicator):
         self._deactivated_callback = callback
 
     def _read_data(self):
-        data = ''
-        previous_length = 0
+        line_buffer = LineBuffer()
         while not self._stopped:
-            # Read what's now on the buffer
+            # Block until data is available (or the read times out), then read what's now on the buffer
+            data = self._serial.read(1)
+            if not data:
+                continue
             num_bytes = self._serial.inWaiting()
             if num_bytes > 0:
                 data += self._serial.read(num_bytes)
 
-            if len(data) == previous_length:
-                time.sleep(0.1)
-                continue
-            previous_length = len(data)
-
-            if '\n' not in data:
-                continue
-
-            message, data = data.split('\n', 1)
-
-            if self._receiver_callback is not None:
-                try:
-                    self._receiver_callback(message.rstrip())
-                except Exception:
-                    logger.exception('Unexpected exception during maintenance callback')
+            for message in line_buffer.feed(data):
+                if self._receiver_callback is not None:
+                    try:
+                        self._receiver_callback(message)
+                    except Exception:
+                        logger.exception('Unexpected exception during maintenance callback')
 
     def write(self, message):
         if message is None:
@@ -18,6 +18,7 @@ Contains a memory representation
 import logging
 from ioc import Inject, INJECTED
 from master_core.core_api import CoreAPI
+from gateway.config_versions import configuration_versions
 
 logger = logging.getLogger("openmotics")
 
@@ -82,6 +83,7 @@ class MemoryFile(object):
 
     def write_page(self, page, data):
         self._cache[page] = data
+        configuration_versions.bump()
         length = 32
         for i in xrange(self._page_length / length):
             start = i * length
@@ -96,3 +98,4 @@ class MemoryFile(object):
             pages = range(self._pages)
         for page in pages:
             self._cache.pop(page, None)
+        configuration_versions.bump()
@@ -263,22 +263,33 @@ class UCANPalletCommandSpec(UCANCommandSpec):
         """
         Calculates the CRC of data. The algorithm is designed to make sure flowing statement is True:
         > crc(data + crc(data)) == 0
+        The calculation can be continued over multiple chunks by passing the previous result as remainder.
 
         :param data: Data for which to calculate the CRC
         :param remainder: Optional initial remainder of CRC calculation
         :returns: CRC
         """
+        table = UCANPalletCommandSpec._CRC_TABLE
+        for data_item in data:
+            remainder = ((remainder << 8) & 0xFFFFFFFF) ^ table[((remainder >> 24) ^ data_item) & 0xFF]
+        return remainder
+
+    @staticmethod
+    def _build_crc_table():
+        """ Builds a lookup table holding the CRC of each byte value, so the CRC can be calculated per byte instead of per bit """
         width = 32
         topbit = 1 << (width - 1)
         polynomial = 0x04C11DB7
-        for data_item in data:
-            remainder ^= data_item << (width - 8)
-            remainder &= 0xFFFFFFFF
-            for _ in xrange(7, -1, -1):
+        table = []
+        for data_item in xrange(256):
+            remainder = data_item << (width - 8)
+            for _ in xrange(8):
                 if remainder & topbit:
-                    remainder = (remainder << 1) ^ polynomial
-                    remainder &= 0xFFFFFFFF
+                    remainder = ((remainder << 1) ^ polynomial) & 0xFFFFFFFF
                 else:
-                    remainder = (remainder << 1)
-                    remainder &= 0xFFFFFFFF
-        return remainder
+                    remainder = (remainder << 1) & 0xFFFFFFFF
+            table.append(remainder)
+        return table
+
+
+UCANPalletCommandSpec._CRC_TABLE = UCANPalletCommandSpec._build_crc_table()
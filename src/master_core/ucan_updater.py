@@ -19,7 +19,7 @@ Module to work update an uCAN
 import logging
 import os
 import struct
-import time
+from threading import Thread
 from intelhex import IntelHex
 from master_core.ucan_api import UCANAPI
 from master_core.ucan_command import UCANPalletCommandSpec, SID
@@ -55,19 +55,110 @@ class UCANUpdater(object):
         :param hex_filename: The filename of the hex file to flash
         """
         try:
-            # TODO: Check version and skip update if the version is already active
+            logger.info('Loading {0}'.format(os.path.basename(hex_filename)))
+            firmware_blocks = UCANUpdater.load_firmware(hex_filename)
+        except Exception as ex:
+            logger.error('Error flashing: {0}'.format(ex))
+            return False
+        return UCANUpdater.flash(cc_address, ucan_address, ucan_communicator, firmware_blocks)
+
+    @staticmethod
+    def update_all(ucans, ucan_communicator, hex_filename):
+        """
+        Flashes the content from an Intel HEX file to multiple uCANs. The file is only parsed once and
+        uCANs on different CCs are flashed in parallel. uCANs on the same CC are flashed one after the other
+        since a CC only handles a single pallet at a time.
+        :param ucans: The uCANs to update
+        :type ucans: list of tuple(str, str)
+        :param ucan_communicator: uCAN commnicator
+        :type ucan_communicator: master_core.ucan_communicator.UCANCommunicator
+        :param hex_filename: The filename of the hex file to flash
+        :returns: Dict with the update result per (cc_address, ucan_address)
+        :rtype: dict
+        """
+        results = {}
+        try:
+            logger.info('Loading {0}'.format(os.path.basename(hex_filename)))
+            firmware_blocks = UCANUpdater.load_firmware(hex_filename)
+        except Exception as ex:
+            logger.error('Error flashing: {0}'.format(ex))
+            for entry in ucans:
+                results[entry] = False
+            return results
+
+        ucans_per_cc = {}
+        for cc_address, ucan_address in ucans:
+            ucans_per_cc.setdefault(cc_address, []).append(ucan_address)
+
+        def _update_cc(_cc_address, _ucan_addresses):
+            for _ucan_address in _ucan_addresses:
+                results[(_cc_address, _ucan_address)] = UCANUpdater.flash(_cc_address, _ucan_address, ucan_communicator, firmware_blocks)
+
+        threads = []
+        for cc_address, ucan_addresses in ucans_per_cc.iteritems():
+            thread = Thread(target=_update_cc, args=(cc_address, ucan_addresses), name='uCAN updater CC {0}'.format(cc_address))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        return results
+
+    @staticmethod
+    def load_firmware(hex_filename):
+        """
+        Loads an Intel HEX file and splits it into the blocks to be flashed. The last block also holds the
+        reset vector and the CRC over the complete application space.
+        :param hex_filename: The filename of the hex file to flash
+        :returns: List of (start_address, payload) tuples
+        :rtype: list of tuple(int, list)
+        """
+        if not os.path.exists(hex_filename):
+            raise RuntimeError('The given path does not point to an existing file')
+        intel_hex = IntelHex(hex_filename)
+        data = list(intel_hex.tobinarray(start=0, end=UCANUpdater.ADDRESS_END - 1))
+        reset_vector = data[:4]
+
+        address_blocks = range(UCANUpdater.ADDRESS_START, UCANUpdater.ADDRESS_END, UCANUpdater.MAX_FLASH_BYTES)
+        firmware_blocks = []
+        crc = 0
+        for start_address in address_blocks:
+            end_address = min(UCANUpdater.ADDRESS_END, start_address + UCANUpdater.MAX_FLASH_BYTES)
+            payload = data[start_address:end_address]
+            crc = UCANPalletCommandSpec.calculate_crc(payload, crc)
+            if start_address == address_blocks[-1]:
+                crc = UCANPalletCommandSpec.calculate_crc(reset_vector, crc)
+                payload += reset_vector
+                payload += UInt32Field.encode_bytes(crc)
+                # Continuing the running CRC over the CRC itself must yield 0, as the bootloader will validate it that way
+                crc = UCANPalletCommandSpec.calculate_crc(payload[-4:], crc)
+            firmware_blocks.append((start_address, payload))
+        if crc != 0:
+            raise RuntimeError('Unexpected error in CRC calculation ({0})'.format(crc))
+        return firmware_blocks
 
-            logger.info('Updating uCAN {0} at CC {1}'.format(ucan_address, cc_address))
+    @staticmethod
+    def flash(cc_address, ucan_address, ucan_communicator, firmware_blocks):
+        """
+        Flashes pre-loaded firmware blocks to the specified uCAN
+        :param cc_address: CC address
+        :param ucan_address: uCAN address
+        :param ucan_communicator: uCAN commnicator
+        :type ucan_communicator: master_core.ucan_communicator.UCANCommunicator
+        :param firmware_blocks: The blocks to flash, as returned by `load_firmware`
+        :type firmware_blocks: list of tuple(int, list)
+        """
+        prefix = 'uCAN {0} at CC {1}'.format(ucan_address, cc_address)
+        try:
+            # TODO: Check version and skip update if the version is already active
 
-            if not os.path.exists(hex_filename):
-                raise RuntimeError('The given path does not point to an existing file')
-            intel_hex = IntelHex(hex_filename)
+            logger.info('Updating {0}'.format(prefix))
 
             in_bootloader = ucan_communicator.is_ucan_in_bootloader(cc_address, ucan_address)
             if in_bootloader:
-                logger.info('Bootloader active')
+                logger.info('{0} - Bootloader active'.format(prefix))
             else:
-                logger.info('Bootloader not active, switching to bootloader')
+                logger.info('{0} - Bootloader not active, switching to bootloader'.format(prefix))
                 ucan_communicator.do_command(cc_address, UCANAPI.set_bootloader_timeout(SID.NORMAL_COMMAND), ucan_address, {'timeout': UCANUpdater.BOOTLOADER_TIMEOUT_UPDATE})
                 response = ucan_communicator.do_command(cc_address, UCANAPI.reset(SID.NORMAL_COMMAND), ucan_address, {}, timeout=10)
                 if response is None:
@@ -77,67 +168,46 @@ class UCANUpdater(object):
                 in_bootloader = ucan_communicator.is_ucan_in_bootloader(cc_address, ucan_address)
                 if not in_bootloader:
                     raise RuntimeError('Could not enter bootloader')
-                logger.info('Bootloader active')
+                logger.info('{0} - Bootloader active'.format(prefix))
 
-            logger.info('Erasing flash...')
+            logger.info('{0} - Erasing flash...'.format(prefix))
             ucan_communicator.do_command(cc_address, UCANAPI.erase_flash(), ucan_address, {})
-            logger.info('Erasing flash... Done')
-
-            logger.info('Flashing contents of {0}'.format(os.path.basename(hex_filename)))
-            logger.info('Flashing...')
-            address_blocks = range(UCANUpdater.ADDRESS_START, UCANUpdater.ADDRESS_END, UCANUpdater.MAX_FLASH_BYTES)
-            total_amount = float(len(address_blocks))
-            crc = 0
-            total_payload = []
-            logged_percentage = -1
-            reset_vector = [intel_hex[i] for i in xrange(4)]
-            for index, start_address in enumerate(address_blocks):
-                end_address = min(UCANUpdater.ADDRESS_END, start_address + UCANUpdater.MAX_FLASH_BYTES)
-
-                payload = []
-                for i in xrange(start_address, end_address):
-                    payload.append(intel_hex[i])
+            logger.info('{0} - Erasing flash... Done'.format(prefix))
 
-                crc = UCANPalletCommandSpec.calculate_crc(payload, crc)
-                if start_address == address_blocks[-1]:
-                    crc = UCANPalletCommandSpec.calculate_crc(reset_vector, crc)
-                    payload += reset_vector
-                    payload += UInt32Field.encode_bytes(crc)
-
-                little_start_address = struct.unpack('<I', struct.pack('>I', start_address))[0]  # TODO: Handle endianness in API definition using Field endianness
-
-                if payload != [255] * UCANUpdater.MAX_FLASH_BYTES:
+            logger.info('{0} - Flashing...'.format(prefix))
+            empty_block = [255] * UCANUpdater.MAX_FLASH_BYTES
+            total_amount = float(len(firmware_blocks))
+            logged_percentage = -1
+            for index, (start_address, payload) in enumerate(firmware_blocks):
+                if payload != empty_block:
                     # Since the uCAN flash area is erased, skip empty blocks
+                    little_start_address = struct.unpack('<I', struct.pack('>I', start_address))[0]  # TODO: Handle endianness in API definition using Field endianness
                     ucan_communicator.do_command(cc_address, UCANAPI.write_flash(len(payload)), ucan_address, {'start_address': little_start_address,
                                                                                                                'data': payload})
-                total_payload += payload
 
                 percentage = int(index / total_amount * 100)
-                if percentage > logged_percentage:
-                    logger.info('Flashing... {0}%'.format(percentage))
+                if percentage >= logged_percentage + 10:
+                    logger.info('{0} - Flashing... {1}%'.format(prefix, percentage))
                     logged_percentage = percentage
 
-            logger.info('Flashing... Done')
-            crc = UCANPalletCommandSpec.calculate_crc(total_payload)
-            if crc != 0:
-                raise RuntimeError('Unexpected error in CRC calculation ({0})'.format(crc))
+            logger.info('{0} - Flashing... Done'.format(prefix))
 
             # Prepare reset to application mode
-            logger.info('Reduce bootloader timeout to {0}s'.format(UCANUpdater.BOOTLOADER_TIMEOUT_RUNTIME))
+            logger.info('{0} - Reduce bootloader timeout to {1}s'.format(prefix, UCANUpdater.BOOTLOADER_TIMEOUT_RUNTIME))
             ucan_communicator.do_command(cc_address, UCANAPI.set_bootloader_timeout(SID.BOOTLOADER_COMMAND), ucan_address, {'timeout': UCANUpdater.BOOTLOADER_TIMEOUT_RUNTIME})
-            logger.info('Set safety bit allowing the application to immediately start on reset')
+            logger.info('{0} - Set safety bit allowing the application to immediately start on reset'.format(prefix))
             ucan_communicator.do_command(cc_address, UCANAPI.set_bootloader_safety_flag(), ucan_address, {'safety_flag': 1})
 
             # Switch to application mode
-            logger.info('Reset to application mode')
+            logger.info('{0} - Reset to application mode'.format(prefix))
             response = ucan_communicator.do_command(cc_address, UCANAPI.reset(SID.BOOTLOADER_COMMAND), ucan_address, {}, timeout=10)
             if response is None:
                 raise RuntimeError('Error resettings uCAN after flashing')
             if response.get('application_mode', 0) != 1:
                 raise RuntimeError('uCAN didn\'t enter application mode after reset')
 
-            logger.info('Update completed')
+            logger.info('{0} - Update completed'.format(prefix))
             return True
         except Exception as ex:
-            logger.error('Error flashing: {0}'.format(ex))
+            logger.error('{0} - Error flashing: {1}'.format(prefix, ex))
             return False
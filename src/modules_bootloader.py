@@ -203,106 +203,174 @@ def do_command(logger, master_communicator, action, retry=True, success_code=0):
         raise
 
 
-def bootload(master_communicator, address, ihex, crc, blocks, logger):
+def get_firmware_blocks(ihex, blocks):
     """
-    Bootload 1 module.
+    Split the firmware in the blocks of 64 bytes that are written to the modules. The blocks are
+    the same for all modules of a type, so they are only built once.
 
-    :param master_communicator: Used to communicate with the master.
-    :type master_communicator: master.master_communicator.MasterCommunicator
-    :param address: Address for the module to bootload
-    :type address: string of length 4
     :param ihex: The hex file
     :type ihex: IntelHex
+    :param blocks: The number of blocks
+    :type blocks: int
+    :returns: list of strings of length 64.
+    """
+    firmware_blocks = []
+    for i in range(blocks):
+        if i == blocks - 1:
+            # The first 8 bytes (the jump) is placed at the end of the code.
+            block = [ihex[i * 64 + j] for j in range(56)] + [ihex[j] for j in range(8)]
+        else:
+            block = [ihex[i * 64 + j] for j in range(64)]
+        firmware_blocks.append(''.join(chr(byte) for byte in block))
+    return firmware_blocks
+
+
+def bootload(master_communicator, addresses, firmware_blocks, crc, logger):
+    """
+    Bootload a set of modules of the same type. The modules are flashed one by one: a module only stays
+    in its bootloader for a few seconds, so it's sent to the bootloader right before it's flashed. Waiting
+    for the modules to start their application is shared. A module that fails a step is skipped for the
+    remaining steps.
+
+    :param master_communicator: Used to communicate with the master.
+    :type master_communicator: master.master_communicator.MasterCommunicator
+    :param addresses: Addresses of the modules to bootload
+    :type addresses: list of strings of length 4
+    :param firmware_blocks: The firmware blocks (see get_firmware_blocks)
+    :type firmware_blocks: list of strings of length 64
     :param crc: The crc for the hex file
     :type crc: tuple of 4 bytes
-    :param blocks: The number of blocks to write
     :param logger: Logger
+    :returns: list of the addresses for which bootloading failed.
     """
-    logger('Checking the version')
-    try:
-        result = do_command(logger,
-                            master_communicator,
-                            create_bl_action(master_api.modules_get_version(),
-                                             {'addr': address}),
-                            retry=False,
-                            success_code=255)
-        logger('Current version: v{0}.{1}.{2}'.format(result['f1'], result['f2'], result['f3']))
-    except Exception:
-        logger('Version call not (yet) implemented or module unavailable')
+    failed = []
+    blocks = len(firmware_blocks)
 
-    logger('Going to bootloader')
-    try:
-        do_command(logger,
-                   master_communicator,
-                   create_bl_action(master_api.modules_goto_bootloader(),
-                                    {'addr': address, 'sec': 5}),
-                   retry=False,
-                   success_code=[255, 1])
-    except Exception:
-        logger('Module has no bootloader or is unavailable. Skipping...')
-        return
-
-    time.sleep(1)
-
-    logger('Setting the firmware crc')
-    do_command(logger,
-               master_communicator,
-               create_bl_action(master_api.modules_new_crc(),
-                                {'addr': address, 'ccrc0': crc[0], 'ccrc1': crc[1], 'ccrc2': crc[2], 'ccrc3': crc[3]}))
+    def module_logger(address):
+        return lambda msg: logger('{0} - {1}'.format(pretty_address(address), msg))
 
-    try:
-        logger('Going to long mode')
-        master_communicator.do_command(master_api.change_communication_mode_to_long())
+    def execute(step, modules):
+        """ Executes a step for the given modules, returns the modules that should continue with the next step. """
+        remaining = []
+        for address in modules:
+            _logger = module_logger(address)
+            try:
+                if step(address, _logger) is not False:
+                    remaining.append(address)
+            except Exception:
+                failed.append(address)
+                _logger('Bootloading failed:')
+                _logger(traceback.format_exc())
+        return remaining
+
+    def goto_bootloader(address, _logger):
+        _logger('Checking the version')
+        try:
+            result = do_command(_logger,
+                                master_communicator,
+                                create_bl_action(master_api.modules_get_version(),
+                                                 {'addr': address}),
+                                retry=False,
+                                success_code=255)
+            _logger('Current version: v{0}.{1}.{2}'.format(result['f1'], result['f2'], result['f3']))
+        except Exception:
+            _logger('Version call not (yet) implemented or module unavailable')
 
-        logger('Writing firmware data')
-        for i in range(blocks):
-            bytes_to_send = ''
-            for j in range(64):
-                if i == blocks - 1 and j >= 56:
-                    # The first 8 bytes (the jump) is placed at the end of the code.
-                    bytes_to_send += chr(ihex[j - 56])
-                else:
-                    bytes_to_send += chr(ihex[i*64 + j])
+        _logger('Going to bootloader')
+        try:
+            do_command(_logger,
+                       master_communicator,
+                       create_bl_action(master_api.modules_goto_bootloader(),
+                                        {'addr': address, 'sec': 5}),
+                       retry=False,
+                       success_code=[255, 1])
+        except Exception:
+            _logger('Module has no bootloader or is unavailable. Skipping...')
+            return False
+
+    def set_crc(address, _logger):
+        _logger('Setting the firmware crc')
+        do_command(_logger,
+                   master_communicator,
+                   create_bl_action(master_api.modules_new_crc(),
+                                    {'addr': address, 'ccrc0': crc[0], 'ccrc1': crc[1], 'ccrc2': crc[2], 'ccrc3': crc[3]}))
 
-            logger('* Block {0}'.format(i))
-            do_command(logger,
+    def write_firmware(address, _logger):
+        _logger('Writing firmware data')
+        progress = -1
+        for i in range(blocks):
+            if i * 10 / blocks != progress:
+                progress = i * 10 / blocks
+                _logger('* Block {0}/{1} ({2}%)'.format(i, blocks, progress * 10))
+            do_command(_logger,
                        master_communicator,
                        create_bl_action(master_api.modules_update_firmware_block(),
-                                        {'addr': address, 'block': i, 'bytes': bytes_to_send}))
-    finally:
-        logger('Going to short mode')
-        master_communicator.do_command(master_api.change_communication_mode_to_short())
+                                        {'addr': address, 'block': i, 'bytes': firmware_blocks[i]}))
+        _logger('* Block {0}/{0} (100%)'.format(blocks))
+
+    def goto_application(address, _logger):
+        _logger('Integrity check')
+        do_command(_logger,
+                   master_communicator,
+                   create_bl_action(master_api.modules_integrity_check(),
+                                    {'addr': address}))
 
-    logger("Integrity check")
-    do_command(logger,
-               master_communicator,
-               create_bl_action(master_api.modules_integrity_check(),
-                                {'addr': address}))
+        _logger('Going to application')
+        do_command(_logger,
+                   master_communicator,
+                   create_bl_action(master_api.modules_goto_application(),
+                                    {'addr': address}))
 
-    logger("Going to application")
-    do_command(logger,
-               master_communicator,
-               create_bl_action(master_api.modules_goto_application(),
-                                {'addr': address}))
+    def check_application(address, _logger):
+        _logger('Waiting for application...')
+        result = do_command(_logger,
+                            master_communicator,
+                            create_bl_action(master_api.modules_get_version(), {'addr': address}),
+                            success_code=255)
+        _logger('New version: v{0}.{1}.{2}'.format(result['f1'], result['f2'], result['f3']))
 
-    tries = 0
-    while True:
+    def flash(address, _logger):
+        if goto_bootloader(address, _logger) is False:
+            return False
+        time.sleep(1)
+
+        set_crc(address, _logger)
         try:
-            tries += 1
-            logger('Waiting for application...')
-            result = do_command(logger,
-                                master_communicator,
-                                create_bl_action(master_api.modules_get_version(), {'addr': address}),
-                                success_code=255)
-            logger('New version: v{0}.{1}.{2}'.format(result['f1'], result['f2'], result['f3']))
-            break
-        except Exception:
-            if tries >= 5:
-                raise
+            _logger('Going to long mode')
+            master_communicator.do_command(master_api.change_communication_mode_to_long())
+            write_firmware(address, _logger)
+        finally:
+            _logger('Going to short mode')
+            master_communicator.do_command(master_api.change_communication_mode_to_short())
+        goto_application(address, _logger)
+
+    modules = execute(flash, addresses)
+
+    tries = 0
+    waiting = modules
+    while waiting:
+        tries += 1
+        pending = []
+        for address in waiting:
+            _logger = module_logger(address)
+            try:
+                check_application(address, _logger)
+            except Exception:
+                if tries >= 5:
+                    failed.append(address)
+                    _logger('Bootloading failed:')
+                    _logger(traceback.format_exc())
+                else:
+                    pending.append(address)
+        waiting = pending
+        if waiting:
             time.sleep(1)
 
-    logger('Resetting error list')
-    master_communicator.do_command(master_api.clear_error_list())
+    if modules:
+        logger('Resetting error list')
+        master_communicator.do_command(master_api.clear_error_list())
+
+    return failed
 
 
 @Inject
@@ -325,18 +393,11 @@ def bootload_modules(module_type, filename, logger, master_communicator=INJECTED
     blocks = 922 if module_type == 'C' else 410
     ihex = intelhex.IntelHex(filename)
     crc = calc_crc(ihex, blocks)
+    firmware_blocks = get_firmware_blocks(ihex, blocks)
 
-    update_success = True
-    for address in addresses:
-        logger('Bootloading module {0}'.format(pretty_address(address)))
-        try:
-            bootload(master_communicator, address, ihex, crc, blocks, logger)
-        except Exception:
-            update_success = False
-            logger('Bootloading failed:')
-            logger(traceback.format_exc())
-
-    return update_success
+    logger('Bootloading modules {0}'.format(', '.join(pretty_address(address) for address in addresses)))
+    failed = bootload(master_communicator, addresses, firmware_blocks, crc, logger)
+    return len(failed) == 0
 
 
 def main():
@@ -25,12 +25,12 @@ from models import Database, Feature
 from ioc import Injectable, Inject, INJECTED
 from bus.om_bus_service import MessageService
 from bus.om_bus_client import MessageClient
+from gateway.startup import StartupOrchestrator
 from serial import Serial
 from signal import signal, SIGTERM
 from ConfigParser import ConfigParser
 from threading import Lock
 from serial_utils import RS485
-from gateway.observer import Observer
 from urlparse import urlparse
 from peewee_migrate import Router
 
@@ -61,6 +61,7 @@ class OpenmoticsService(object):
         metrics_lock = Lock()
 
         config_database_file = constants.get_config_database_file()
+        platform = Platform.get_platform()
 
         # TODO: Clean up dependencies more to reduce complexity
 
@@ -73,12 +74,12 @@ class OpenmoticsService(object):
         from plugins import base
         from gateway import (metrics_controller, webservice, scheduling, observer, gateway_api, metrics_collector,
                              maintenance_controller, comm_led_controller, users, pulses, config as config_controller,
-                             metrics_caching, watchdog)
+                             metrics_caching, watchdog, health_monitor, api_statistics)
         from cloud import events
         _ = (metrics_controller, webservice, scheduling, observer, gateway_api, metrics_collector,
              maintenance_controller, base, events, power_communicator, comm_led_controller, users,
-             power_controller, pulses, config_controller, metrics_caching, watchdog)
-        if Platform.get_platform() == Platform.Type.CORE_PLUS:
+             power_controller, pulses, config_controller, metrics_caching, watchdog, health_monitor, api_statistics)
+        if platform == Platform.Type.CORE_PLUS:
             from gateway.hal import master_controller_core
             from master_core import maintenance, core_communicator, ucan_communicator
             from master import eeprom_extension  # TODO: Obsolete, need to be removed
@@ -90,7 +91,7 @@ class OpenmoticsService(object):
 
         thermostats_gateway_feature = Feature.get_or_none(name='thermostats_gateway')
         thermostats_gateway_enabled = thermostats_gateway_feature is not None and thermostats_gateway_feature.enabled
-        if Platform.get_platform() == Platform.Type.CORE_PLUS or thermostats_gateway_enabled:
+        if platform == Platform.Type.CORE_PLUS or thermostats_gateway_enabled:
             from gateway.thermostat.gateway import thermostat_controller_gateway
             _ = thermostat_controller_gateway
         else:
@@ -139,7 +140,7 @@ class OpenmoticsService(object):
         # Master Controller
         controller_serial_port = config.get('OpenMotics', 'controller_serial')
         Injectable.value(controller_serial=Serial(controller_serial_port, 115200))
-        if Platform.get_platform() == Platform.Type.CORE_PLUS:
+        if platform == Platform.Type.CORE_PLUS:
             from master_core.memory_file import MemoryFile, MemoryTypes
             core_cli_serial_port = config.get('OpenMotics', 'cli_serial')
             Injectable.value(cli_serial=Serial(core_cli_serial_port, 115200))
@@ -174,6 +175,8 @@ class OpenmoticsService(object):
 
         # TODO: Fix circular dependencies
 
+        from gateway.observer import Observer  # Not imported at module level, platform specific imports happen in `build_graph`
+
         thermostat_controller.subscribe_events(web_interface.send_event_websocket)
         thermostat_controller.subscribe_events(event_sender.enqueue_event)
         thermostat_controller.subscribe_events(plugin_controller.process_observer_event)
@@ -203,28 +206,43 @@ class OpenmoticsService(object):
 
     @staticmethod
     @Inject
-    def start(master_controller=INJECTED, maintenance_controller=INJECTED,
-              observer=INJECTED, power_communicator=INJECTED, metrics_controller=INJECTED, passthrough_service=INJECTED,
-              scheduling_controller=INJECTED, metrics_collector=INJECTED, web_service=INJECTED, watchdog=INJECTED, plugin_controller=INJECTED,
-              communication_led_controller=INJECTED, event_sender=INJECTED, thermostat_controller=INJECTED):
+    def get_startup_orchestrator(master_controller=INJECTED, maintenance_controller=INJECTED,
+                                 observer=INJECTED, power_communicator=INJECTED, metrics_controller=INJECTED, passthrough_service=INJECTED,
+                                 scheduling_controller=INJECTED, metrics_collector=INJECTED, web_service=INJECTED, watchdog=INJECTED, plugin_controller=INJECTED,
+                                 communication_led_controller=INJECTED, event_sender=INJECTED, thermostat_controller=INJECTED,
+                                 health_monitor=INJECTED):
+        """ Declares the components to start, each with the components it needs to be started first """
+        orchestrator = StartupOrchestrator()
+        orchestrator.add('master_controller', master_controller)
+        orchestrator.add('maintenance_controller', maintenance_controller)
+        orchestrator.add('observer', observer, requires=['master_controller'])
+        orchestrator.add('power_communicator', power_communicator)
+        orchestrator.add('metrics_controller', metrics_controller)
+        orchestrator.add('passthrough_service', passthrough_service, requires=['master_controller'])
+        orchestrator.add('scheduling_controller', scheduling_controller, requires=['master_controller'])
+        orchestrator.add('thermostat_controller', thermostat_controller, requires=['master_controller', 'observer'])
+        orchestrator.add('metrics_collector', metrics_collector, requires=['master_controller', 'power_communicator', 'metrics_controller'])
+        orchestrator.add('web_service', web_service, requires=['master_controller', 'maintenance_controller'])
+        orchestrator.add('plugin_controller', plugin_controller, requires=['observer', 'web_service', 'metrics_controller', 'metrics_collector'])
+        orchestrator.add('communication_led_controller', communication_led_controller, requires=['master_controller', 'power_communicator'])
+        orchestrator.add('event_sender', event_sender, requires=['observer'])
+        orchestrator.add('watchdog', watchdog, requires=['master_controller', 'power_communicator'])
+        orchestrator.add('health_monitor', health_monitor, requires=['master_controller'])
+        return orchestrator
+
+    @staticmethod
+    @Inject
+    def start(master_controller=INJECTED, maintenance_controller=INJECTED, metrics_controller=INJECTED,
+              metrics_collector=INJECTED, web_service=INJECTED, watchdog=INJECTED, plugin_controller=INJECTED,
+              event_sender=INJECTED, thermostat_controller=INJECTED, health_monitor=INJECTED):
         """ Main function. """
         logger.info('Starting OM core service...')
 
-        master_controller.start()
-        maintenance_controller.start()
-        observer.start()
-        power_communicator.start()
-        metrics_controller.start()
-        if passthrough_service:
-            passthrough_service.start()
-        scheduling_controller.start()
-        thermostat_controller.start()
-        metrics_collector.start()
-        web_service.start()
-        plugin_controller.start()
-        communication_led_controller.start()
-        event_sender.start()
-        watchdog.start()
+        # Components are started concurrently, each as soon as the components it needs are started
+        timings = OpenmoticsService.get_startup_orchestrator().start()
+        logger.info('Component startup timings: {0}'.format(', '.join('{0}: {1:.2f}s'.format(name, duration)
+                                                                       for name, duration in sorted(timings.items(),
+                                                                                                    key=lambda item: -item[1]))))
 
         signal_request = {'stop': False}
 
@@ -241,6 +259,7 @@ class OpenmoticsService(object):
             thermostat_controller.stop()
             plugin_controller.stop()
             event_sender.stop()
+            health_monitor.stop()
             logger.info('Stopping OM core service... Done')
             signal_request['stop'] = True
 
@@ -116,16 +116,20 @@ class System(object):
         ANGSTROM = 'angstrom'
         DEBIAN = 'debian'
 
+    _operating_system = None  # The operating system doesn't change while running, so it's only parsed once
+
     @staticmethod
     def _get_operating_system():
-        operating_system = {}
-        with open('/etc/os-release', 'r') as osfh:
-            lines = osfh.readlines()
-            for line in lines:
-                k, v = line.strip().split('=')
-                operating_system[k] = v
-        operating_system['ID'] = operating_system['ID'].lower()
-        return operating_system
+        if System._operating_system is None:
+            operating_system = {}
+            with open('/etc/os-release', 'r') as osfh:
+                lines = osfh.readlines()
+                for line in lines:
+                    k, v = line.strip().split('=')
+                    operating_system[k] = v
+            operating_system['ID'] = operating_system['ID'].lower()
+            System._operating_system = operating_system
+        return System._operating_system
 
     @staticmethod
     def get_ip_address():
@@ -229,8 +233,16 @@ class Platform(object):
 
     Types = [Type.CLASSIC, Type.CORE_PLUS]
 
+    _platform = None  # A platform change requires a service restart, so it's only read once
+
     @staticmethod
     def get_platform():
+        if Platform._platform is None:
+            Platform._platform = Platform._read_platform()
+        return Platform._platform
+
+    @staticmethod
+    def _read_platform():
         config = ConfigParser()
         config.read(constants.get_config_file())
 
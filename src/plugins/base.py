@@ -20,6 +20,7 @@ import pkgutil
 import traceback
 from gateway.observer import Event
 from datetime import datetime
+from threading import Lock, Thread
 from ioc import Injectable, Inject, INJECTED, Singleton
 from plugins.runner import PluginRunner, RunnerWatchdog
 
@@ -51,6 +52,7 @@ class PluginController(object):
         self.__logs = {}
         self.__runners = {}
         self.__runner_watchdogs = {}
+        self.__dependencies_lock = Lock()
 
         self.__metrics_controller = None
         self.__metrics_collector = None
@@ -88,13 +90,22 @@ class PluginController(object):
 
         self.__runners = {}
         self.__runner_watchdogs = {}
-        # First initialize all plugin runners, then start them.
+        # First initialize all plugin runners, then start them concurrently. Every runner waits
+        # (at most its start timeout) for its own plugin process, so a slow plugin doesn't delay the others.
+        # The dependencies are updated as soon as a plugin is started, so its routes are available right away.
         for package_name in package_names:
             self.__init_plugin_runner(package_name)
+        threads = []
         for package_name in package_names:
             runner = self.__runners.get(package_name)
             if runner is not None:
-                self.__start_plugin_runner(runner, package_name, False)
+                thread = Thread(target=self.__start_plugin_runner, args=(runner, package_name, True),
+                                name='PluginController start {0}'.format(package_name))
+                thread.daemon = True
+                thread.start()
+                threads.append(thread)
+        for thread in threads:
+            thread.join()
 
     def __init_plugin_runner(self, plugin_name):
         """ Initializes a single plugin runner """
@@ -172,12 +183,13 @@ class PluginController(object):
 
     def __update_dependencies(self):
         """ When a runner is added/removed, this call updates all code that needs to know about plugins """
-        if self.__webinterface is not None and self.__web_service is not None:
-            self.__web_service.update_tree(self.__get_cherrypy_mounts())
-        if self.__metrics_collector is not None:
-            self.__metrics_collector.set_plugin_intervals(self.__get_metric_receivers())
-        if self.__metrics_controller is not None:
-            self.__metrics_controller.set_plugin_definitions(self.__get_metric_definitions())
+        with self.__dependencies_lock:
+            if self.__webinterface is not None and self.__web_service is not None:
+                self.__web_service.update_tree(self.__get_cherrypy_mounts())
+            if self.__metrics_collector is not None:
+                self.__metrics_collector.set_plugin_intervals(self.__get_metric_receivers())
+            if self.__metrics_controller is not None:
+                self.__metrics_controller.set_plugin_definitions(self.__get_metric_definitions())
 
     def get_plugins(self):
         """
@@ -365,12 +377,14 @@ class PluginController(object):
         """ Enqueues all metrics in a separate queue per plugin """
         rates = {'total': 0}
         rate_keys = []
-        # Preprocess rate keys
+        metric_dicts = []
+        # Preprocess rate keys and convert the metrics once for serialization towards the plugins
         for metric in metrics:
-            rate_key = '{0}.{1}'.format(metric['source'].lower(), metric['type'].lower())
+            rate_key = '{0}.{1}'.format(metric.source.lower(), metric.type.lower())
             if rate_key not in rates:
                 rates[rate_key] = 0
             rate_keys.append(rate_key)
+            metric_dicts.append(metric.as_dict())
         # Distribute
         for runner in self.__iter_running_runners():
             for receiver in runner.get_metric_receivers():
@@ -379,8 +393,8 @@ class PluginController(object):
                     sources = self.__metrics_controller.get_filter('source', receiver['source'])
                     metric_types = self.__metrics_controller.get_filter('metric_type', receiver['metric_type'])
                     for index, metric in enumerate(metrics):
-                        if metric['source'] in sources and metric['type'] in metric_types:
-                            receiver_metrics.append(metric)
+                        if metric.source in sources and metric.type in metric_types:
+                            receiver_metrics.append(metric_dicts[index])
                             rates[rate_keys[index]] += 1
                             rates['total'] += 1
                     runner.distribute_metrics(receiver['name'], receiver_metrics)
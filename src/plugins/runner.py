@@ -8,22 +8,33 @@ import ujson as json
 from threading import Thread, Lock
 from Queue import Queue, Empty, Full
 from toolbox import PluginIPCStream
+from ioc import Inject, INJECTED
 
 logger = logging.getLogger("openmotics")
 
 
 class PluginRunner:
 
-    def __init__(self, name, runtime_path, plugin_path, logger, command_timeout=5):
+    class State(object):
+        STOPPED = 'STOPPED'
+        STARTING = 'STARTING'
+        RUNNING = 'RUNNING'
+        FAILED = 'FAILED'
+
+    @Inject
+    def __init__(self, name, runtime_path, plugin_path, logger, command_timeout=5, start_timeout=180, api_statistics=INJECTED):
         self.runtime_path = runtime_path
         self.plugin_path = plugin_path
         self.command_timeout = command_timeout
+        self.start_timeout = start_timeout
 
         self._logger = logger
+        self._api_statistics = api_statistics
         self._cid = 0
         self._proc = None
         self._running = False
         self._process_running = False
+        self._state = PluginRunner.State.STOPPED
         self._command_lock = Lock()
         self._response_queue = Queue()
         self._stream = None
@@ -50,7 +61,16 @@ class PluginRunner:
             raise Exception('PluginRunner is already running')
 
         self.logger('[Runner] Starting')
+        self._state = PluginRunner.State.STARTING
+        try:
+            self._start()
+        except Exception:
+            self._state = PluginRunner.State.FAILED
+            raise
+        self._state = PluginRunner.State.RUNNING
+        self.logger('[Runner] Started')
 
+    def _start(self):
         python_executable = sys.executable
         if python_executable is None or len(python_executable) == 0:
             python_executable = '/usr/bin/python'
@@ -68,7 +88,7 @@ class PluginRunner:
                                        command_receiver=self._process_command)
         self._stream.start()
 
-        start_out = self._do_command('start', timeout=180)
+        start_out = self._do_command('start', timeout=self.start_timeout)
         self.name = start_out['name']
         self.version = start_out['version']
         self.interfaces = start_out['interfaces']
@@ -89,13 +109,14 @@ class PluginRunner:
         self._async_command_thread.start()
 
         self._running = True
-        self.logger('[Runner] Started')
 
     def logger(self, message):
         self._logger(message)
         logger.info('Plugin {0} - {1}'.format(self.name, message))
 
     def get_webservice(self, webinterface):
+        api_statistics = self._api_statistics
+
         class Service:
             def __init__(self, runner):
                 self.runner = runner
@@ -117,9 +138,14 @@ class PluginRunner:
 
             @cherrypy.expose
             def index(self, method, *args, **kwargs):
+                start = time.time()
+                endpoint = 'plugins/{0}/{1}'.format(self.runner.name, method)
                 try:
-                    return self.runner.request(method, args=args, kwargs=kwargs)
+                    response = self.runner.request(method, args=args, kwargs=kwargs)
+                    api_statistics.add_call(endpoint, time.time() - start)
+                    return response
                 except Exception as ex:
+                    api_statistics.add_call(endpoint, time.time() - start, error=True)
                     cherrypy.response.headers["Content-Type"] = "application/json"
                     cherrypy.response.status = 500
                     return json.dumps({"success": False, "msg": str(ex)})
@@ -129,7 +155,14 @@ class PluginRunner:
     def is_running(self):
         return self._running
 
+    def get_state(self):
+        if self._state == PluginRunner.State.RUNNING and not self._process_running:
+            return PluginRunner.State.FAILED  # The plugin process exited unexpectedly
+        return self._state
+
     def stop(self):
+        if self._state != PluginRunner.State.FAILED:
+            self._state = PluginRunner.State.STOPPED
         if self._process_running:
             self._running = False
 
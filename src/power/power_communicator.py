@@ -21,7 +21,7 @@ import time
 from Queue import Empty
 from ioc import Injectable, Inject, INJECTED, Singleton
 from threading import Thread, RLock
-from serial_utils import printable, CommunicationTimedOutException
+from serial_utils import printable, CommunicationTimedOutException, CommunicationStatistics, DebugBuffer
 from power import power_api
 from power.power_command import crc7, crc8
 from power.time_keeper import TimeKeeper
@@ -35,7 +35,7 @@ class PowerCommunicator(object):
     """ Uses a serial port to communicate with the power modules. """
 
     @Inject
-    def __init__(self, power_serial=INJECTED, power_controller=INJECTED, verbose=False, time_keeper_period=60,
+    def __init__(self, power_serial=INJECTED, power_controller=INJECTED, verbose=False, time_keeper_period=600,
                  address_mode_timeout=300):
         """ Default constructor.
 
@@ -61,13 +61,8 @@ class PowerCommunicator(object):
         else:
             self.__time_keeper = None
 
-        self.__communication_stats = {'calls_succeeded': [],
-                                      'calls_timedout': [],
-                                      'bytes_written': 0,
-                                      'bytes_read': 0}
-        self.__debug_buffer = {'read': {},
-                               'write': {}}
-        self.__debug_buffer_duration = 300
+        self.__communication_stats = CommunicationStatistics()
+        self.__debug_buffer = DebugBuffer()
 
         self.__verbose = verbose
 
@@ -77,10 +72,13 @@ class PowerCommunicator(object):
             self.__time_keeper.start()
 
     def get_communication_statistics(self):
-        return self.__communication_stats
+        return self.__communication_stats.get()
+
+    def get_command_statistics(self):
+        return self.__communication_stats.get_commands()
 
     def get_debug_buffer(self):
-        return self.__debug_buffer
+        return self.__debug_buffer.get()
 
     def get_seconds_since_last_success(self):
         """ Get the number of seconds since the last successful communication. """
@@ -108,12 +106,8 @@ class PowerCommunicator(object):
         if self.__verbose:
             PowerCommunicator.__log('writing to', data)
         self.__serial.write(data)
-        self.__communication_stats['bytes_written'] += len(data)
-        threshold = time.time() - self.__debug_buffer_duration
-        self.__debug_buffer['write'][time.time()] = printable(data)
-        for t in self.__debug_buffer['write'].keys():
-            if t < threshold:
-                del self.__debug_buffer['write'][t]
+        self.__communication_stats.bytes_written += len(data)
+        self.__debug_buffer.capture('write', data)
 
     def do_command(self, address, cmd, *data):
         """ Send a command over the serial port and block until an answer is received.
@@ -134,14 +128,14 @@ class PowerCommunicator(object):
 
         def do_once(_address, _cmd, *_data):
             """ Send the command once. """
+            start = time.time()
             try:
                 cid = self.__get_cid()
                 send_data = _cmd.create_input(_address, cid, *_data)
                 self.__write_to_serial(send_data)
 
                 if _address == power_api.BROADCAST_ADDRESS:
-                    self.__communication_stats['calls_succeeded'].append(time.time())
-                    self.__communication_stats['calls_succeeded'] = self.__communication_stats['calls_succeeded'][-50:]
+                    self.__communication_stats.record_success(_cmd.mode + _cmd.type, time.time() - start)
                     return None  # No reply on broadcast messages !
                 else:
                     tries = 0
@@ -163,12 +157,10 @@ class PowerCommunicator(object):
 
                     self.__last_success = time.time()
                     return_data = _cmd.read_output(response_data)
-                    self.__communication_stats['calls_succeeded'].append(time.time())
-                    self.__communication_stats['calls_succeeded'] = self.__communication_stats['calls_succeeded'][-50:]
+                    self.__communication_stats.record_success(_cmd.mode + _cmd.type, self.__last_success - start)
                     return return_data
             except CommunicationTimedOutException:
-                self.__communication_stats['calls_timedout'].append(time.time())
-                self.__communication_stats['calls_timedout'] = self.__communication_stats['calls_timedout'][-50:]
+                self.__communication_stats.record_timeout(_cmd.mode + _cmd.type)
                 raise
 
         with self.__serial_lock:
@@ -182,10 +174,12 @@ class PowerCommunicator(object):
                 return self.do_command(address, cmd, *data)
             except CommunicationTimedOutException:
                 # Communication timed out, try again.
+                self.__communication_stats.record_retry(cmd.mode + cmd.type)
                 return do_once(address, cmd, *data)
             except Exception as ex:
                 logger.exception("Unexpected error: {0}".format(ex))
                 time.sleep(0.25)
+                self.__communication_stats.record_retry(cmd.mode + cmd.type)
                 return do_once(address, cmd, *data)
 
     def start_address_mode(self):
@@ -313,7 +307,7 @@ class PowerCommunicator(object):
             while phase < 8:
                 byte = self.__serial.read_queue.get(True, 0.25)
                 command += byte
-                self.__communication_stats['bytes_read'] += 1
+                self.__communication_stats.bytes_read += 1
 
                 if phase == 0:  # Skip non 'R' bytes
                     if byte == 'R':
@@ -368,11 +362,7 @@ class PowerCommunicator(object):
             if self.__verbose:
                 PowerCommunicator.__log('reading from', command)
 
-        threshold = time.time() - self.__debug_buffer_duration
-        self.__debug_buffer['read'][time.time()] = printable(command)
-        for t in self.__debug_buffer['read'].keys():
-            if t < threshold:
-                del self.__debug_buffer['read'][t]
+        self.__debug_buffer.capture('read', command)
 
         return header, data
 
@@ -51,6 +51,8 @@ class PowerController(object):
                                             isolation_level=None)
         self.__cursor = self.__connection.cursor()
         self.__lock = Lock()
+        self.__modules_changed_callbacks = []
+        self.__power_modules = None  # In-memory copy of the power_modules table
 
         self.__update_schema_if_needed()  # Table creations and/or migrations
 
@@ -94,37 +96,44 @@ class PowerController(object):
         'sensor4', 'sensor5', 'sensor6', 'sensor7'. For the 12-port power module also contains
         'input8', 'input9', 'input10', 'input11', 'times8', 'times9', 'times10', 'times11'.
         """
+        return dict((module_id, dict(module)) for module_id, module in self.__get_power_modules().iteritems())
+
+    def __get_power_modules(self):
+        """ Returns the in-memory power modules, which are only loaded from the database after a change. """
+        with self.__lock:
+            if self.__power_modules is None:
+                self.__power_modules = self.__load_power_modules()
+            return self.__power_modules
+
+    def __load_power_modules(self):
         power_modules = {}
         fields = {}
         for version in [POWER_MODULE, ENERGY_MODULE, P1_CONCENTRATOR]:
             amount = NUM_PORTS[version]
             fields[version] = ['id', 'name', 'address', 'version'] + PowerController._power_setting_fields(amount)
-        with self.__lock:
-            for row in self.__cursor.execute('SELECT {0} FROM power_modules;'.format(', '.join(fields[LARGEST_MODULE_TYPE]))):
-                version = row[3]
-                if version not in [POWER_MODULE, ENERGY_MODULE, P1_CONCENTRATOR]:
-                    raise ValueError('Unknown power api version')
-                power_modules[row[0]] = dict([(field, row[fields[version].index(field)])
-                                              for field in fields[version]])
-            return power_modules
+        for row in self.__cursor.execute('SELECT {0} FROM power_modules;'.format(', '.join(fields[LARGEST_MODULE_TYPE]))):
+            version = row[3]
+            if version not in [POWER_MODULE, ENERGY_MODULE, P1_CONCENTRATOR]:
+                raise ValueError('Unknown power api version')
+            power_modules[row[0]] = dict([(field, row[fields[version].index(field)])
+                                          for field in fields[version]])
+        return power_modules
 
     def get_address(self, id):
         """ Get the address of a module when the module id is provided. """
-        with self.__lock:
-            for row in self.__cursor.execute('SELECT address FROM power_modules WHERE id=?;', (id,)):
-                return row[0]
+        module = self.__get_power_modules().get(id)
+        if module is not None:
+            return module['address']
 
     def get_version(self, id):
         """ Get the version of a module when the module id is provided. """
-        with self.__lock:
-            for row in self.__cursor.execute('SELECT version FROM power_modules WHERE id=?;', (id,)):
-                return row[0]
+        module = self.__get_power_modules().get(id)
+        if module is not None:
+            return module['version']
 
     def module_exists(self, address):
         """ Check if a module with a certain address exists. """
-        with self.__lock:
-            for row in self.__cursor.execute('SELECT count(id) FROM power_modules WHERE address=?;', (address,)):
-                return row[0] > 0
+        return any(module['address'] == address for module in self.__get_power_modules().itervalues())
 
     def update_power_module(self, module):
         """
@@ -146,24 +155,41 @@ class PowerController(object):
             self.__cursor.execute('UPDATE power_modules SET {0} WHERE id=?'.format(
                 ', '.join(['{0}=?'.format(field) for field in fields])
             ), tuple([module[field] for field in fields] + [module['id']]))
+            if self.__power_modules is not None:
+                self.__power_modules[module['id']].update((field, module[field]) for field in fields)
+        self.__modules_changed()
 
     def register_power_module(self, address, version):
         """ Register a new power module using an address. """
         with self.__lock:
             self.__cursor.execute('INSERT INTO power_modules(address, version) VALUES (?, ?);', (address, version))
+            self.__power_modules = None  # Reloaded to get the defaults of the new module
+        self.__modules_changed()
 
     def readdress_power_module(self, old_address, new_address):
         """ Change the address of a power module. """
         with self.__lock:
             self.__cursor.execute('UPDATE power_modules SET address=? WHERE address=?;', (new_address, old_address))
+            if self.__power_modules is not None:
+                for power_module in self.__power_modules.itervalues():
+                    if power_module['address'] == old_address:
+                        power_module['address'] = new_address
+        self.__modules_changed()
+
+    def subscribe_power_modules_changed(self, callback):
+        """ Subscribes a callback which is called when a power module is registered or changed. """
+        self.__modules_changed_callbacks.append(callback)
+
+    def __modules_changed(self):
+        for callback in self.__modules_changed_callbacks:
+            callback()
 
     def get_free_address(self):
         """ Get a free address for a power module. """
         max_address = 0
-        with self.__lock:
-            for row in self.__cursor.execute('SELECT address FROM power_modules;'):
-                max_address = max(max_address, row[0])
-            return max_address + 1 if max_address < 255 else 1
+        for module in self.__get_power_modules().itervalues():
+            max_address = max(max_address, module['address'])
+        return max_address + 1 if max_address < 255 else 1
 
     def close(self):
         """ Close the database connection. """
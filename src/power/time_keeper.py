@@ -17,16 +17,26 @@
 """
 
 import logging
-import time
 from datetime import datetime
-from threading import Thread
+from threading import Event, Lock, Thread
 
 import power.power_api as power_api
 logger = logging.getLogger("openmotics")
 
+if False:  # MYPY
+    from typing import List, Optional, Tuple
+
 
 class TimeKeeper(object):
-    """ The TimeKeeper keeps track of time and sets the day or night mode on the power modules. """
+    """
+    The TimeKeeper keeps track of time and sets the day or night mode on the power modules.
+    The day/night times of the modules are compiled when the configuration changes, and the
+    TimeKeeper sleeps until the next day/night transition (or at most `period` seconds).
+    """
+
+    MINUTES_PER_DAY = 24 * 60
+    MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+    RETRY_DELAY = 10
 
     def __init__(self, power_communicator, power_controller, period):
         self.__power_communicator = power_communicator
@@ -34,15 +44,21 @@ class TimeKeeper(object):
         self.__period = period
 
         self.__mode = {}
+        self.__schedules = None  # type: Optional[List[Tuple[int, int, List[List[Tuple[int, int]]]]]]
+        self.__transitions = []  # type: List[int]
+        self.__generation = 0
+        self.__lock = Lock()
 
         self.__thread = None
         self.__stop = False
+        self.__wakeup = Event()
 
     def start(self):
         """ Start the background thread of the TimeKeeper. """
         if self.__thread is None:
             logger.info("Starting TimeKeeper")
             self.__stop = False
+            self.__power_controller.subscribe_power_modules_changed(self.refresh)
             self.__thread = Thread(target=self.__run, name="TimeKeeper thread")
             self.__thread.daemon = True
             self.__thread.start()
@@ -53,53 +69,111 @@ class TimeKeeper(object):
         """ Stop the background thread in the TimeKeeper. """
         if self.__thread is not None:
             self.__stop = True
+            self.__wakeup.set()
         else:
             raise Exception("TimeKeeper thread not running.")
 
+    def refresh(self):
+        """ Reloads the day/night times of the power modules, to be called when they are changed. """
+        with self.__lock:
+            self.__generation += 1
+            self.__schedules = None
+        self.__wakeup.set()
+
     def __run(self):
         """ Code for the background thread. """
         while not self.__stop:
+            self.__wakeup.clear()  # Before the run, so a refresh during the run isn't lost
             try:
-                self.__run_once()
+                delay = self.__run_once()
             except Exception:
                 logger.exception("Exception in TimeKeeper")
+                delay = TimeKeeper.RETRY_DELAY
 
-            time.sleep(self.__period)
+            self.__wakeup.wait(delay)
 
         logger.info("Stopped TimeKeeper")
         self.__thread = None
 
     def __run_once(self):
-        """ One run of the background thread. """
+        """ One run of the background thread, returns the time until the next run. """
+        schedules = self.__schedules
+        if schedules is None:
+            schedules = self.__load_schedules()
         date = datetime.now()
-        for module in self.__power_controller.get_power_modules().values():
-            version = module['version']
-            if version == power_api.P1_CONCENTRATOR:
-                continue
+        failed = False
+        for version, address, port_windows in schedules:
             daynight = []
-            for i in range(power_api.NUM_PORTS[version]):
-                if self.is_day_time(module['times%d' % i], date):
+            for windows in port_windows:
+                if TimeKeeper.in_day_window(windows, date):
                     daynight.append(power_api.DAY)
                 else:
                     daynight.append(power_api.NIGHT)
 
-            self.__set_mode(version, module['address'], daynight)
+            try:
+                self.__set_mode(version, address, daynight)
+            except Exception:
+                logger.exception("Could not set day/night mode of power module %s", address)
+                failed = True
+        delay = min(self.__period, self.__get_time_until_transition(date))
+        if failed:
+            delay = min(delay, TimeKeeper.RETRY_DELAY)
+        return delay
+
+    def __load_schedules(self):
+        """ Compiles the day/night times of all power modules. """
+        generation = self.__generation
+        schedules = []
+        transitions = set()
+        for module in self.__power_controller.get_power_modules().values():
+            version = module['version']
+            if version == power_api.P1_CONCENTRATOR:
+                continue
+            port_windows = [TimeKeeper.compile_times(module['times%d' % i])
+                            for i in range(power_api.NUM_PORTS[version])]
+            for windows in port_windows:
+                for day_of_week, (start, stop) in enumerate(windows):
+                    if stop > start:
+                        transitions.add(day_of_week * TimeKeeper.MINUTES_PER_DAY + start)
+                        transitions.add(day_of_week * TimeKeeper.MINUTES_PER_DAY + stop)
+            schedules.append((version, module['address'], port_windows))
+        with self.__lock:
+            if generation == self.__generation:  # Don't store stale times if a refresh happened meanwhile
+                self.__transitions = sorted(transitions)
+                self.__schedules = schedules
+        return schedules
+
+    def __get_time_until_transition(self, date):
+        """ Returns the number of seconds until the next day/night transition of any module. """
+        transitions = self.__transitions
+        if not transitions:
+            return self.__period
+        minute = date.weekday() * TimeKeeper.MINUTES_PER_DAY + date.hour * 60 + date.minute
+        next_minute = next((transition for transition in transitions if transition > minute),
+                           transitions[0] + TimeKeeper.MINUTES_PER_WEEK)
+        return (next_minute - minute) * 60 - date.second - date.microsecond / 1000000.0
 
     @staticmethod
-    def is_day_time(times, date):
-        """ Check if a date is in day time. """
+    def compile_times(times):
+        """ Compiles the times string into a (start, stop) window in minutes for each day of the week. """
         if times is None:
-            times = [0 for _ in range(14)]
-        else:
-            times = [int(t.replace(":", "")) for t in times.split(",")]
+            return [(0, 0) for _ in range(7)]
+        minutes = []
+        for time_string in times.split(","):
+            value = int(time_string.replace(":", ""))
+            minutes.append(value // 100 * 60 + value % 100)
+        return [(minutes[day * 2], minutes[day * 2 + 1]) for day in range(7)]
 
-        day_of_week = date.weekday()  # 0 = Monday, 6 = Sunday
-        current_time = date.hour * 100 + date.minute
-
-        start = times[day_of_week * 2]
-        stop = times[day_of_week * 2 + 1]
+    @staticmethod
+    def in_day_window(windows, date):
+        """ Check if a date is in the day window of its day of the week. """
+        start, stop = windows[date.weekday()]  # 0 = Monday, 6 = Sunday
+        return stop > date.hour * 60 + date.minute >= start
 
-        return stop > current_time >= start
+    @staticmethod
+    def is_day_time(times, date):
+        """ Check if a date is in day time. """
+        return TimeKeeper.in_day_window(TimeKeeper.compile_times(times), date)
 
     def __set_mode(self, version, address, bytes):
         """ Set the power modules mode. """
@@ -58,6 +58,22 @@ class HexReader(object):
         """ Constructor with the name of the hex file. """
         self.__hex = intelhex.IntelHex(hex_file)
         self.__crc = 0
+        self.__blocks = {}
+
+    def get_blocks(self, version):
+        """
+        Get all blocks to write for the given module version. The blocks (and the crc) are only built once,
+        so the hex file isn't processed again for each module.
+        """
+        if version not in self.__blocks:
+            self.__crc = 0
+            if version == power_api.POWER_MODULE:
+                blocks = [self.get_bytes_version_8(address) for address in range(0, 1024, 128)]  # 0x000 - 0x400
+                blocks += [self.get_bytes_version_8(address) for address in range(8192, 44032, 128)]  # 0x2000 - 0xAC00
+            else:
+                blocks = [self.get_bytes_version_12(address) for address in range(0x1D006000, 0x1D03FFFB, 128)]
+            self.__blocks[version] = blocks
+        return self.__blocks[version]
 
     def get_bytes_version_8(self, address):
         """ Get the 192 bytes from the hex file, with 3 address bytes prepended. """
@@ -142,17 +158,37 @@ def get_module_firmware_version(module_address, version, power_communicator):
         return '{0}.{1}.{2} ({3})'.format(parsed_version[1], parsed_version[2], parsed_version[3], parsed_version[0])
 
 
-def bootload_power_module(module_address, hex_file, power_communicator):
+def write_blocks(prefix, module_address, blocks, command, power_communicator):
+    """
+    Write blocks of code to a power module, reporting the progress.
+
+    :param prefix: The prefix of the module address in the logging.
+    :param module_address: The address of a power module (integer).
+    :param blocks: The blocks to write.
+    :param command: The command used to write a block.
+    :param power_communicator: Communication with the power modules.
+    """
+    progress = -1
+    for i, data in enumerate(blocks):
+        if i * 10 / len(blocks) != progress:
+            progress = i * 10 / len(blocks)
+            logger.info('{0}{1} - Block {2}/{3} ({4}%)'.format(prefix, module_address, i, len(blocks), progress * 10))
+        power_communicator.do_command(module_address, command, *data)
+    logger.info('{0}{1} - Block {2}/{2} (100%)'.format(prefix, module_address, len(blocks)))
+
+
+def bootload_power_module(module_address, reader, power_communicator):
     """
     Bootload a 8 port power module.
 
     :param module_address: The address of a power module (integer).
-    :param hex_file: The filename of the hex file to write.
+    :param reader: The hex file to write.
+    :type reader: HexReader
     :param power_communicator: Communication with the power modules.
     """
-    logger.info('P{0} - Version: {0}'.format(module_address, get_module_firmware_version(module_address, power_api.POWER_MODULE, power_communicator)))
+    logger.info('P{0} - Version: {1}'.format(module_address, get_module_firmware_version(module_address, power_api.POWER_MODULE, power_communicator)))
     logger.info('P{0} - Start bootloading'.format(module_address))
-    reader = HexReader(hex_file)
+    blocks = reader.get_blocks(power_api.POWER_MODULE)
 
     logger.info('P{0} - Going to bootloader'.format(module_address))
     power_communicator.do_command(module_address, power_api.bootloader_goto(power_api.POWER_MODULE), 10)
@@ -162,15 +198,8 @@ def bootload_power_module(module_address, hex_file, power_communicator):
     if chip_id[0] != 213:
         raise Exception('Unknown chip id: {0}'.format(chip_id[0]))
 
-    logger.info('P{0} - Writing vector tabel'.format(module_address))
-    for address in range(0, 1024, 128):      # 0x000 - 0x400
-        data = reader.get_bytes_version_8(address)
-        power_communicator.do_command(module_address, power_api.bootloader_write_code(power_api.POWER_MODULE), *data)
-
-    logger.info('P{0} -  Writing code'.format(module_address))
-    for address in range(8192, 44032, 128):  # 0x2000 - 0xAC00
-        data = reader.get_bytes_version_8(address)
-        power_communicator.do_command(module_address, power_api.bootloader_write_code(power_api.POWER_MODULE), *data)
+    logger.info('P{0} - Writing vector tabel and code'.format(module_address))
+    write_blocks('P', module_address, blocks, power_api.bootloader_write_code(power_api.POWER_MODULE), power_communicator)
 
     logger.info('P{0} - Jumping to application'.format(module_address))
     power_communicator.do_command(module_address, power_api.bootloader_jump_application())
@@ -178,12 +207,13 @@ def bootload_power_module(module_address, hex_file, power_communicator):
     logger.info('P{0} - Done'.format(module_address))
 
 
-def bootload_energy_module(module_address, hex_file, power_communicator):
+def bootload_energy_module(module_address, reader, power_communicator):
     """
     Bootload a 12 port power module.
 
     :param module_address: The address of a power module (integer).
-    :param hex_file: The filename of the hex file to write.
+    :param reader: The hex file to write.
+    :type reader: HexReader
     :param power_communicator: Communication with the power modules.
     """
     logger.info('E{0} - Version: {1}'.format(module_address, get_module_firmware_version(module_address, power_api.ENERGY_MODULE, power_communicator)))
@@ -197,7 +227,7 @@ def bootload_energy_module(module_address, hex_file, power_communicator):
         logger.info('E{0} - Could not read calibration data: {1}'.format(module_address, ex))
         calibration_data = None
 
-    reader = HexReader(hex_file)
+    blocks = reader.get_blocks(power_api.ENERGY_MODULE)
 
     logger.info('E{0} - Going to bootloader'.format(module_address))
     power_communicator.do_command(module_address, power_api.bootloader_goto(power_api.ENERGY_MODULE), 10)
@@ -209,9 +239,7 @@ def bootload_energy_module(module_address, hex_file, power_communicator):
             power_communicator.do_command(module_address, power_api.bootloader_erase_code(), page)
 
         logger.info('E{0} - Writing code...'.format(module_address))
-        for address in range(0x1D006000, 0x1D03FFFB, 128):
-            data = reader.get_bytes_version_12(address)
-            power_communicator.do_command(module_address, power_api.bootloader_write_code(power_api.ENERGY_MODULE), *data)
+        write_blocks('E', module_address, blocks, power_api.bootloader_write_code(power_api.ENERGY_MODULE), power_communicator)
     finally:
         logger.info('E{0} - Jumping to application'.format(module_address))
         power_communicator.do_command(module_address, power_api.bootloader_jump_application())
@@ -236,8 +264,9 @@ def bootload_energy_module(module_address, hex_file, power_communicator):
     logger.info('E{0} - Done'.format(module_address))
 
 
-def bootload_p1_concentrator(module_address, hex_file, power_communicator):
+def bootload_p1_concentrator(module_address, reader, power_communicator):
     """ Bootload a P1 Concentrator module """
+    _ = reader
 
     logger.info('C{0} - Version: {1}'.format(module_address, get_module_firmware_version(module_address, power_api.P1_CONCENTRATOR, power_communicator)))
     logger.info('C{0} - Start bootloading'.format(module_address))
@@ -294,14 +323,16 @@ def main():
     elif args.p1c:
         version = power_api.P1_CONCENTRATOR
 
-    def _bootload(_module, _module_address, filename):
+    reader = HexReader(args.file)  # The hex file is only processed once for all modules
+
+    def _bootload(_module, _module_address):
         try:
             if version == _module['version'] == power_api.POWER_MODULE:
-                bootload_power_module(_module_address, filename, power_communicator)
+                bootload_power_module(_module_address, reader, power_communicator)
             elif version == _module['version'] == power_api.ENERGY_MODULE:
-                bootload_energy_module(_module_address, filename, power_communicator)
+                bootload_energy_module(_module_address, reader, power_communicator)
             elif version == _module['version'] == power_api.P1_CONCENTRATOR:
-                bootload_p1_concentrator(_module_address, filename, power_communicator)
+                bootload_p1_concentrator(_module_address, reader, power_communicator)
         except CommunicationTimedOutException:
             logger.warning('E{0} - Module unavailable. Skipping...'.format(address))
         except Exception:
@@ -313,7 +344,7 @@ def main():
             for module_id in power_modules:
                 module = power_modules[module_id]
                 address = module['address']
-                _bootload(module, address, args.file)
+                _bootload(module, address)
         else:
             address = args.address
             modules = [module for module in power_modules.values() if module['address'] == address]
@@ -321,7 +352,7 @@ def main():
                 logger.info('ERROR: Cannot find a module with address {0}'.format(address))
                 sys.exit(0)
             module = modules[0]
-            _bootload(module, address, args.file)
+            _bootload(module, address)
     else:
         parser.print_help()
 
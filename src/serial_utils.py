@@ -13,15 +13,22 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
-Serial tools contains the RS485 wrapper, printable and CommunicationTimedOutException.
+Serial tools contains the RS485 wrapper, printable, DebugBuffer, CommunicationStatistics and
+CommunicationTimedOutException.
 
 @author: fryckbos
 """
 
 import struct
 import fcntl
-from threading import Thread
+import time
+from collections import deque
+from threading import Thread, Lock
 from Queue import Queue
+from toolbox import Histogram
+
+if False:  # MYPY
+    from typing import Dict, Any
 
 
 class CommunicationTimedOutException(Exception):
@@ -42,6 +49,109 @@ def printable(data):
     return '{0}    {1}'.format(byte_notation, string_notation)
 
 
+class DebugBuffer(object):
+    """
+    Captures the raw serial traffic of a communicator in a fixed-size, preallocated ring buffer per
+    direction. The data is only formatted when the buffer is requested.
+    """
+
+    def __init__(self, size=500, duration=300):
+        self._size = size
+        self._duration = duration
+        self._entries = {'read': [None] * size,
+                         'write': [None] * size}
+        self._indexes = {'read': 0,
+                         'write': 0}
+
+    def capture(self, direction, data):
+        """ Captures a frame of raw data for the given direction ('read' or 'write') """
+        index = self._indexes[direction]
+        self._entries[direction][index] = (time.time(), data)
+        self._indexes[direction] = (index + 1) % self._size
+
+    def get(self):
+        """ Returns the frames of the last `duration` seconds, formatted per direction and keyed by timestamp """
+        threshold = time.time() - self._duration
+        debug_buffer = {}
+        for direction, entries in self._entries.iteritems():
+            debug_buffer[direction] = dict((entry[0], printable(entry[1]))
+                                     for entry in list(entries)
+                                     if entry is not None and entry[0] >= threshold)
+        return debug_buffer
+
+
+class CommunicationStatistics(object):
+    """
+    Keeps the traffic statistics of a communicator: the timestamps of the last calls (as used by the
+    Watchdog), the bytes read/written, and per command a latency histogram and timeout/retry counters.
+    All updates are O(1).
+    """
+
+    def __init__(self, history=50):
+        self._lock = Lock()
+        self._calls_succeeded = deque(maxlen=history)
+        self._calls_timedout = deque(maxlen=history)
+        self._commands = {}  # type: Dict[str, Dict[str, Any]]
+        self.bytes_written = 0
+        self.bytes_read = 0
+
+    def _get_command(self, command):
+        statistics = self._commands.get(command)
+        if statistics is None:
+            statistics = {'calls': 0,
+                          'timeouts': 0,
+                          'retries': 0,
+                          'latency': Histogram()}
+            self._commands[command] = statistics
+        return statistics
+
+    def record_success(self, command, duration):
+        # type: (str, float) -> None
+        with self._lock:
+            self._calls_succeeded.append(time.time())
+            statistics = self._get_command(command)
+            statistics['calls'] += 1
+            statistics['latency'].add(duration)
+
+    def record_timeout(self, command):
+        # type: (str) -> None
+        with self._lock:
+            self._calls_timedout.append(time.time())
+            statistics = self._get_command(command)
+            statistics['calls'] += 1
+            statistics['timeouts'] += 1
+
+    def record_retry(self, command):
+        # type: (str) -> None
+        with self._lock:
+            self._get_command(command)['retries'] += 1
+
+    def get(self):
+        # type: () -> Dict[str, Any]
+        """ Returns the call timestamps and byte counters """
+        with self._lock:
+            return {'calls_succeeded': list(self._calls_succeeded),
+                    'calls_timedout': list(self._calls_timedout),
+                    'bytes_written': self.bytes_written,
+                    'bytes_read': self.bytes_read}
+
+    def get_commands(self):
+        # type: () -> Dict[str, Dict[str, Any]]
+        """ Returns per command the number of calls, the timeout and retry rates and the latency histogram """
+        with self._lock:
+            return dict((command, {'calls': statistics['calls'],
+                                   'timeouts': statistics['timeouts'],
+                                   'retries': statistics['retries'],
+                                   'timeout_rate': CommunicationStatistics._rate(statistics['timeouts'], statistics['calls']),
+                                   'retry_rate': CommunicationStatistics._rate(statistics['retries'], statistics['calls']),
+                                   'latency': statistics['latency'].as_dict()})
+                        for command, statistics in self._commands.iteritems())
+
+    @staticmethod
+    def _rate(count, calls):
+        return count / float(calls) if calls else 0.0
+
+
 class RS485(object):
     """ Replicates the pyserial interface. """
 
@@ -18,6 +18,7 @@ A few helper classes
 
 import time
 import msgpack
+from bisect import bisect_left
 from select import select
 from collections import deque
 from threading import Thread
@@ -64,6 +65,60 @@ class Queue(object):
         return self._queue.clear()
 
 
+class Histogram(object):
+    """
+    Latency histogram with fixed buckets. Adding a value takes constant memory and time, the
+    percentiles are estimated as the upper bound of the bucket they fall in.
+    """
+
+    BUCKETS = [0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10]  # Upper bounds, in seconds
+
+    def __init__(self):
+        self._counts = [0] * (len(Histogram.BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self._counts[bisect_left(Histogram.BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, percentile):
+        if self.count == 0:
+            return None
+        rank = percentile / 100.0 * self.count
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank and count > 0:
+                if index == len(Histogram.BUCKETS):
+                    return self.max
+                return min(Histogram.BUCKETS[index], self.max)
+        return self.max
+
+    def as_dict(self):
+        """ Summary with all durations in milliseconds """
+        def _ms(value):
+            return None if value is None else value * 1000.0
+
+        buckets = dict(('{0}'.format(_ms(bound)), count) for bound, count in zip(Histogram.BUCKETS, self._counts))
+        buckets['+inf'] = self._counts[-1]
+        return {'count': self.count,
+                'avg': _ms(self.total / self.count) if self.count > 0 else None,
+                'min': _ms(self.min),
+                'max': _ms(self.max),
+                'p50': _ms(self.percentile(50)),
+                'p90': _ms(self.percentile(90)),
+                'p99': _ms(self.percentile(99)),
+                'buckets': buckets}
+
+
 class PluginIPCStream(object):
     """
     This class handles IPC communications.
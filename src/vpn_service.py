@@ -32,6 +32,7 @@ import constants
 import ujson as json
 from threading import Thread, Lock
 from collections import deque
+from urllib import quote
 from ConfigParser import ConfigParser
 from ioc import Injectable, INJECTED, Inject
 from gateway.config import ConfigurationController
@@ -183,6 +184,7 @@ class Gateway(object):
     def __init__(self, host="127.0.0.1"):
         self.__host = host
         self.__last_pulse_counters = None
+        self.__snapshot = {}
 
     def do_call(self, uri):
         """ Do a call to the webservice, returns a dict parsed from the json returned by the webserver. """
@@ -193,18 +195,33 @@ class Gateway(object):
             logger.info('Exception during Gateway call: {0} {1}'.format(ex, uri))
             return
 
-    def get_real_time_power(self):
-        """ Get the real time power measurements. """
-        data = self.do_call("get_realtime_power?token=None")
+    def load_snapshot(self, datasets):
+        """ Loads the given datasets with a single call, to be consumed by the getters below. """
+        self.__snapshot = {}
+        if not datasets:
+            return
+        data = self.do_call("get_status_snapshot?token=None&datasets={0}".format(quote(json.dumps(datasets))))
+        if data is not None and data['success']:
+            self.__snapshot = data['snapshot']
+
+    def __get_dataset(self, dataset, uri):
+        """ Gets a dataset from the loaded snapshot, falling back to a dedicated call to the webservice. """
+        if dataset in self.__snapshot:
+            return self.__snapshot.pop(dataset)
+        data = self.do_call(uri)
         if data is not None and data['success']:
             del data['success']
             return data
         return
 
+    def get_real_time_power(self):
+        """ Get the real time power measurements. """
+        return self.__get_dataset('power', "get_realtime_power?token=None")
+
     def get_pulse_counter_diff(self):
         """ Get the pulse counter differences. """
-        data = self.do_call("get_pulse_counter_status?token=None")
-        if data is not None and data['success']:
+        data = self.__get_dataset('pulse_counters', "get_pulse_counter_status?token=None")
+        if data is not None:
             counters = data['counters']
 
             if self.__last_pulse_counters is None:
@@ -225,8 +242,8 @@ class Gateway(object):
 
     def get_enabled_outputs(self):
         """ Get the enabled outputs. """
-        data = self.do_call("get_output_status?token=None")
-        if data is not None and data['success']:
+        data = self.__get_dataset('outputs', "get_output_status?token=None")
+        if data is not None:
             ret = []
             for output in data['status']:
                 if output["status"] == 1:
@@ -236,22 +253,22 @@ class Gateway(object):
 
     def get_inputs_status(self):
         """ Get the inputs status. """
-        data = self.do_call("get_input_status?token=None")
-        if data is not None and data['success']:
+        data = self.__get_dataset('inputs', "get_input_status?token=None")
+        if data is not None:
             return [(inp["id"], inp["status"]) for inp in data['status']]
         return
 
     def get_shutters_status(self):
         """ Get the shutters status. """
-        data = self.do_call("get_shutter_status?token=None")
-        if data is not None and data['success']:
+        data = self.__get_dataset('shutters', "get_shutter_status?token=None")
+        if data is not None:
             return [(int(shutter_id), details["state"].upper()) for shutter_id, details in data['detail'].iteritems()]
         return
 
     def get_thermostats(self):
         """ Fetch the setpoints for the enabled thermostats from the webservice. """
-        data = self.do_call("get_thermostat_status?token=None")
-        if data is None or data['success'] is False:
+        data = self.__get_dataset('thermostats', "get_thermostat_status?token=None")
+        if data is None:
             return None
         ret = {'thermostats_on': data['thermostats_on'],
                'automatic': data['automatic'],
@@ -267,7 +284,7 @@ class Gateway(object):
 
     def get_errors(self):
         """ Get the errors on the gateway. """
-        data = self.do_call("get_errors?token=None")
+        data = self.__get_dataset('errors', "get_errors?token=None")
         if data:
             if data['errors'] is not None:
                 master_errors = sum([error[1] for error in data['errors']])
@@ -288,16 +305,18 @@ class Gateway(object):
 class DataCollector(object):
     """ Defines a function to retrieve data, the period between two collections """
 
-    def __init__(self, fct, period=0):
+    def __init__(self, fct, period=0, dataset=None):
         """
         Create a collector with a function to call and a period.
         If the period is 0, the collector will be executed on each call.
+        The optional dataset is the name of the status snapshot dataset the function consumes.
         """
         self.__function = fct
         self.__period = period
         self.__last_collect = 0
+        self.dataset = dataset
 
-    def __should_collect(self):
+    def should_collect(self):
         """ Should we execute the collect? """
 
         return self.__period == 0 or time.time() >= self.__last_collect + self.__period
@@ -305,7 +324,7 @@ class DataCollector(object):
     def collect(self):
         """ Execute the collect if required, return None otherwise. """
         try:
-            if self.__should_collect():
+            if self.should_collect():
                 if self.__period != 0:
                     self.__last_collect = time.time()
                 return self.__function()
@@ -345,13 +364,13 @@ class VPNService(object):
                             self._message_client,
                             self._config_controller)
 
-        self._collectors = {'thermostats': DataCollector(self._gateway.get_thermostats, 60),
-                            'inputs': DataCollector(self._gateway.get_inputs_status),
-                            'outputs': DataCollector(self._gateway.get_enabled_outputs),
-                            'shutters': DataCollector(self._gateway.get_shutters_status),
-                            'pulses': DataCollector(self._gateway.get_pulse_counter_diff, 60),
-                            'power': DataCollector(self._gateway.get_real_time_power),
-                            'errors': DataCollector(self._gateway.get_errors, 600),
+        self._collectors = {'thermostats': DataCollector(self._gateway.get_thermostats, 60, dataset='thermostats'),
+                            'inputs': DataCollector(self._gateway.get_inputs_status, dataset='inputs'),
+                            'outputs': DataCollector(self._gateway.get_enabled_outputs, dataset='outputs'),
+                            'shutters': DataCollector(self._gateway.get_shutters_status, dataset='shutters'),
+                            'pulses': DataCollector(self._gateway.get_pulse_counter_diff, 60, dataset='pulse_counters'),
+                            'power': DataCollector(self._gateway.get_real_time_power, dataset='power'),
+                            'errors': DataCollector(self._gateway.get_errors, 600, dataset='errors'),
                             'local_ip': DataCollector(self._gateway.get_local_ip_address, 1800)}
 
     @staticmethod
@@ -459,6 +478,12 @@ class VPNService(object):
         if event == OMBusEvents.DIRTY_EEPROM:
             self._eeprom_events.appendleft(True)
 
+    @staticmethod
+    def _get_due_datasets(collectors):
+        """ Returns the status snapshot datasets consumed by the collectors that will collect in this cycle """
+        return [collector.dataset for collector in collectors
+                if collector.dataset is not None and collector.should_collect()]
+
     @staticmethod
     def _unload_queue(queue):
         events = []
@@ -508,7 +533,8 @@ class VPNService(object):
                 if dirty_events:
                     call_data['events']['DIRTY_EEPROM'] = True
 
-                # Collect data to be send to the Cloud
+                # Collect data to be send to the Cloud, loading all local datasets that are due at once
+                self._gateway.load_snapshot(VPNService._get_due_datasets(self._collectors.values()))
                 for collector_name in self._collectors:
                     collector = self._collectors[collector_name]
                     data = collector.collect()
@@ -0,0 +1,363 @@
+# Copyright (C) 2020 OpenMotics BV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Benchmarks for the serial hot paths, running against in-process emulators of the
+classic master, the Core+ and the RS485 power modules.
+
+Usage (from this folder):
+  PYTHONPATH=../../src python2 benchmark.py [-s SCENARIO ...] [-i ITERATIONS] [-l LATENCY] [-b BAUDRATE] [-j FILE]
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from collections import deque
+from multiprocessing import Process, Queue
+from threading import Lock
+
+from ioc import SetTestMode, SetUpTestInjections
+from master import master_api
+from master_core.core_api import CoreAPI
+from power import power_api
+from serial_utils import RS485
+
+from emulators import MasterEmulator, CoreEmulator, PowerBusEmulator
+
+
+class Measurement(object):
+    """ Collects the durations of an operation and summarizes them as throughput and latency percentiles """
+
+    PERCENTILES = [50, 90, 99]
+
+    def __init__(self, name):
+        self.name = name
+        self.durations = []
+        self.wall_time = 0.0
+        self._lock = Lock()
+
+    def add(self, duration):
+        with self._lock:
+            self.durations.append(duration)
+
+    def measure(self, function, *args, **kwargs):
+        """ Executes the function, recording its duration """
+        start = time.time()
+        result = function(*args, **kwargs)
+        self.add(time.time() - start)
+        return result
+
+    def summary(self):
+        durations = sorted(self.durations)
+        count = len(durations)
+        summary = {'name': self.name,
+                   'count': count,
+                   'throughput': count / self.wall_time if self.wall_time > 0 else 0.0}
+        if count == 0:
+            return summary
+        summary['min'] = durations[0] * 1000.0
+        summary['max'] = durations[-1] * 1000.0
+        for percentile in Measurement.PERCENTILES:
+            index = min(count - 1, max(0, int(round(percentile / 100.0 * count)) - 1))  # Nearest rank
+            summary['p{0}'.format(percentile)] = durations[index] * 1000.0
+        return summary
+
+
+class Timer(object):
+    """ Tracks the wall time of a number of measurements """
+
+    def __init__(self, *measurements):
+        self._measurements = measurements
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.time()
+        return self
+
+    def __exit__(self, *args):
+        wall_time = time.time() - self._start
+        for measurement in self._measurements:
+            measurement.wall_time = wall_time
+
+
+# The communicators are imported when needed: the classic and Core+ communicator can't be
+# loaded in the same process as both register themselves as the `master_communicator`.
+
+def _get_master_communicator(emulator):
+    from master.master_communicator import MasterCommunicator
+    SetUpTestInjections(controller_serial=emulator)
+    communicator = MasterCommunicator(init_master=False)
+    communicator.start()
+    return communicator
+
+
+def _get_core_communicator(emulator):
+    from master_core.core_communicator import CoreCommunicator
+    SetUpTestInjections(controller_serial=emulator)
+    communicator = CoreCommunicator()
+    communicator.start()
+    return communicator
+
+
+def _get_power_communicator(emulator):
+    from power.power_communicator import PowerCommunicator
+    SetUpTestInjections(power_serial=RS485(emulator),
+                        power_controller=None)
+    communicator = PowerCommunicator(time_keeper_period=0)
+    communicator.start()
+    return communicator
+
+
+def classic_output_refresh(options):
+    """ Full output refresh as done by the classic master controller """
+    emulator = MasterEmulator(output_modules=options.modules, latency=options.latency, baudrate=options.baudrate)
+    communicator = _get_master_communicator(emulator)
+    refreshes = Measurement('classic.output_refresh')
+    commands = Measurement('classic.output_refresh.read_output')
+
+    def _refresh():
+        number_of_outputs = communicator.do_command(master_api.number_of_io_modules())['out'] * 8
+        for i in xrange(number_of_outputs):
+            commands.measure(communicator.do_command, master_api.read_output(), {'id': i})
+
+    with Timer(refreshes, commands):
+        for _ in xrange(options.iterations):
+            refreshes.measure(_refresh)
+    emulator.stop()
+    return [refreshes, commands]
+
+
+def classic_eeprom_load(options):
+    """ Loads the complete EEPROM through a cold EepromFile """
+    from master.eeprom_controller import EepromFile, EepromAddress
+    emulator = MasterEmulator(eeprom_banks=options.banks, latency=options.latency, baudrate=options.baudrate)
+    communicator = _get_master_communicator(emulator)
+    SetUpTestInjections(master_communicator=communicator)
+    eeprom_file = EepromFile()
+    addresses = [EepromAddress(bank, 0, 256) for bank in xrange(options.banks)]
+    loads = Measurement('classic.eeprom_load')
+
+    def _load():
+        eeprom_file.invalidate_cache()
+        eeprom_file.read(addresses)
+
+    with Timer(loads):
+        for _ in xrange(options.iterations):
+            loads.measure(_load)
+    emulator.stop()
+    return [loads]
+
+
+def classic_event_storm(options):
+    """ Burst of OL messages, measuring the time until they are delivered to the consumer """
+    from master.master_communicator import BackgroundConsumer
+    emulator = MasterEmulator(latency=options.latency, baudrate=options.baudrate)
+    communicator = _get_master_communicator(emulator)
+    events = Measurement('classic.event_storm')
+    emitted = deque()
+
+    def _on_output_list(_):
+        events.add(time.time() - emitted.popleft())
+
+    communicator.register_consumer(BackgroundConsumer(master_api.output_list(), 0, _on_output_list))
+    total = options.iterations * options.events
+    with Timer(events):
+        for i in xrange(total):
+            emitted.append(time.time())
+            emulator.emit_output_list([(i % 64, 63)])
+        _wait_for(lambda: len(events.durations) == total)
+    emulator.stop()
+    return [events]
+
+
+def core_output_refresh(options):
+    """ Reads the details of all Core+ outputs """
+    emulator = CoreEmulator(outputs=options.modules * 8, latency=options.latency, baudrate=options.baudrate)
+    communicator = _get_core_communicator(emulator)
+    refreshes = Measurement('core.output_refresh')
+    commands = Measurement('core.output_refresh.output_detail')
+
+    def _refresh():
+        for i in xrange(options.modules * 8):
+            commands.measure(communicator.do_command, CoreAPI.output_detail(), {'device_nr': i})
+
+    with Timer(refreshes, commands):
+        for _ in xrange(options.iterations):
+            refreshes.measure(_refresh)
+    emulator.stop()
+    return [refreshes, commands]
+
+
+def core_memory_load(options):
+    """ Loads a number of EEPROM pages through a cold MemoryFile """
+    from master_core.memory_file import MemoryFile, MemoryTypes
+    emulator = CoreEmulator(latency=options.latency, baudrate=options.baudrate)
+    communicator = _get_core_communicator(emulator)
+    SetUpTestInjections(master_communicator=communicator)
+    memory_file = MemoryFile(MemoryTypes.EEPROM)
+    loads = Measurement('core.memory_load')
+
+    def _load():
+        memory_file.invalidate_cache()
+        for page in xrange(options.banks):
+            memory_file.read_page(page)
+
+    with Timer(loads):
+        for _ in xrange(options.iterations):
+            loads.measure(_load)
+    emulator.stop()
+    return [loads]
+
+
+def core_event_storm(options):
+    """ Burst of EV messages, measuring the time until they are delivered to the consumer """
+    from master_core.core_communicator import BackgroundConsumer
+    emulator = CoreEmulator(latency=options.latency, baudrate=options.baudrate)
+    communicator = _get_core_communicator(emulator)
+    events = Measurement('core.event_storm')
+    emitted = deque()
+
+    def _on_event(_):
+        events.add(time.time() - emitted.popleft())
+
+    communicator.register_consumer(BackgroundConsumer(CoreAPI.event_information(), 0, _on_event))
+    total = options.iterations * options.events
+    with Timer(events):
+        for i in xrange(total):
+            emitted.append(time.time())
+            emulator.emit_event({'type': 0, 'action': 1, 'device_nr': i % 64, 'data': [0, 0, 0, 0]})
+        _wait_for(lambda: len(events.durations) == total)
+    emulator.stop()
+    return [events]
+
+
+def power_poll(options):
+    """ Realtime power poll of all power modules, as done by the gateway """
+    version = power_api.POWER_MODULE
+    emulator = PowerBusEmulator(modules=options.modules, version=version, latency=options.latency, baudrate=options.baudrate)
+    communicator = _get_power_communicator(emulator)
+    polls = Measurement('power.poll')
+    commands = Measurement('power.poll.command')
+    poll_commands = [power_api.get_voltage(version), power_api.get_frequency(version),
+                     power_api.get_current(version), power_api.get_power(version)]
+
+    def _poll():
+        for address in emulator.addresses:
+            for command in poll_commands:
+                commands.measure(communicator.do_command, address, command)
+
+    with Timer(polls, commands):
+        for _ in xrange(options.iterations):
+            polls.measure(_poll)
+    emulator.stop()
+    return [polls, commands]
+
+
+def _wait_for(condition, timeout=60):
+    end = time.time() + timeout
+    while not condition():
+        if time.time() > end:
+            raise RuntimeError('Timeout waiting for the scenario to complete')
+        time.sleep(0.001)
+
+
+SCENARIOS = [('classic_output_refresh', classic_output_refresh),
+             ('classic_eeprom_load', classic_eeprom_load),
+             ('classic_event_storm', classic_event_storm),
+             ('core_output_refresh', core_output_refresh),
+             ('core_memory_load', core_memory_load),
+             ('core_event_storm', core_event_storm),
+             ('power_poll', power_poll)]
+
+
+def run_scenario(scenario, options):
+    """
+    Runs a scenario in a separate process, so the communicator and emulator threads of one
+    scenario can't influence the next one.
+
+    :returns: The summaries of the scenario's measurements
+    """
+    results = Queue()
+
+    def _run():
+        logging.getLogger('openmotics').addHandler(logging.NullHandler())
+        SetTestMode()
+        try:
+            results.put([measurement.summary() for measurement in scenario(options)])
+        except Exception as ex:
+            results.put(ex)
+
+    process = Process(target=_run)
+    process.start()
+    result = results.get()
+    process.join()
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def print_summaries(summaries):
+    """ Prints the summaries as a table """
+    columns = ['count', 'throughput', 'min', 'p50', 'p90', 'p99', 'max']
+    print '{0:<40} {1:>7} {2:>10} {3:>9} {4:>9} {5:>9} {6:>9} {7:>9}'.format('benchmark', 'count', 'ops/s', 'min ms', 'p50 ms', 'p90 ms', 'p99 ms', 'max ms')
+    for summary in summaries:
+        values = [summary.get(column, 0.0) for column in columns]
+        print '{0:<40} {1:>7} {2:>10.1f} {3:>9.2f} {4:>9.2f} {5:>9.2f} {6:>9.2f} {7:>9.2f}'.format(summary['name'], *values)
+
+
+def main():
+    """ The main function. """
+    scenario_names = [name for name, _ in SCENARIOS]
+    parser = argparse.ArgumentParser(description='Benchmarks the serial hot paths against emulated hardware.')
+    parser.add_argument('-s', '--scenario', dest='scenarios', action='append', choices=scenario_names,
+                        help='the scenario(s) to run (default: all)')
+    parser.add_argument('-i', '--iterations', dest='iterations', type=int, default=5,
+                        help='the number of iterations per scenario')
+    parser.add_argument('-l', '--latency', dest='latency', type=float, default=0.0,
+                        help='the turnaround latency of the emulated devices, in seconds')
+    parser.add_argument('-b', '--baudrate', dest='baudrate', type=int, default=115200,
+                        help='the emulated baudrate, 0 for unlimited')
+    parser.add_argument('-m', '--modules', dest='modules', type=int, default=8,
+                        help='the number of output or power modules')
+    parser.add_argument('--banks', dest='banks', type=int, default=256,
+                        help='the number of EEPROM banks or pages to load')
+    parser.add_argument('-e', '--events', dest='events', type=int, default=200,
+                        help='the number of events per iteration in the event storms')
+    parser.add_argument('-j', '--json', dest='json', required=False,
+                        help='write the results as json to the given file')
+    args = parser.parse_args()
+
+    summaries = []
+    for name, scenario in SCENARIOS:
+        if args.scenarios and name not in args.scenarios:
+            continue
+        summaries += run_scenario(scenario, args)
+    print_summaries(summaries)
+
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump({'settings': {'iterations': args.iterations,
+                                    'latency': args.latency,
+                                    'baudrate': args.baudrate,
+                                    'modules': args.modules,
+                                    'banks': args.banks,
+                                    'events': args.events},
+                       'results': summaries}, json_file, indent=4)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,357 @@
+# Copyright (C) 2020 OpenMotics BV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+In-process emulators for the classic master, the Core+ and the RS485 power bus.
+
+The emulators replicate the pyserial interface used by the communicators and answer
+the requests written to them after a configurable turnaround latency, taking the
+transfer time of the configured baudrate into account.
+"""
+
+import copy
+import logging
+import struct
+import time
+from collections import deque
+from threading import Condition, Thread
+
+from master import master_api
+from master.master_command import MasterCommandSpec, Field
+from master_core.core_api import CoreAPI
+from master_core.core_command import CoreCommandSpec
+from master_core.fields import WordField
+from power import power_api
+from power.power_command import crc7
+
+logger = logging.getLogger('openmotics')
+
+
+class SerialEmulator(object):
+    """
+    Base class replicating a pyserial port. Subclasses parse the written requests in
+    `_process` and return the replies, which are delivered to the reader once the
+    turnaround latency and transfer time have passed.
+    """
+
+    def __init__(self, latency=0.0, baudrate=115200):
+        """
+        :param latency: Turnaround time of the emulated device, in seconds
+        :type latency: float
+        :param baudrate: Baudrate of the emulated serial line, 0 for unlimited
+        :type baudrate: int
+        """
+        self.timeout = None
+        self.latency = latency
+        self.baudrate = baudrate
+        self.bytes_written = 0
+        self.bytes_read = 0
+
+        self._request_buffer = ''
+        self._read_buffer = ''
+        self._scheduled = deque()
+        self._line_free_at = 0
+        self._condition = Condition()
+        self._stop = False
+        self._thread = Thread(target=self._deliver, name='{0} delivery thread'.format(self.__class__.__name__))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """ Stops the delivery thread, pending reads are released with empty data """
+        with self._condition:
+            self._stop = True
+            self._condition.notify_all()
+
+    def _transfer_time(self, data):
+        if self.baudrate == 0:
+            return 0
+        return len(data) * 10.0 / self.baudrate  # 8N1: 10 bits per byte
+
+    def _schedule(self, data, delay):
+        """ Schedules data to arrive at the reader after the given delay, keeping the line sequential. """
+        with self._condition:
+            due = max(time.time() + delay, self._line_free_at) + self._transfer_time(data)
+            self._line_free_at = due
+            self._scheduled.append((due, data))
+            self._condition.notify_all()
+
+    def _deliver(self):
+        while True:
+            with self._condition:
+                while not self._stop and len(self._scheduled) == 0:
+                    self._condition.wait()
+                if self._stop:
+                    return
+                due, data = self._scheduled[0]
+                delay = due - time.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                self._scheduled.popleft()
+                self._read_buffer += data
+                self._condition.notify_all()
+
+    def write(self, data):
+        """ Write data to the emulated device """
+        self.bytes_written += len(data)
+        self._request_buffer += data
+        for reply in self._process():
+            self._schedule(reply, self.latency)
+
+    def emit(self, data):
+        """ Sends unsolicited data (e.g. events) from the emulated device """
+        self._schedule(data, 0)
+
+    def read(self, size):
+        """ Blocks until `size` bytes can be read """
+        with self._condition:
+            while not self._stop and len(self._read_buffer) < size:
+                self._condition.wait()
+            data = self._read_buffer[:size]
+            self._read_buffer = self._read_buffer[size:]
+        self.bytes_read += len(data)
+        return data
+
+    def inWaiting(self):  # pylint: disable=C0103
+        """ Get the number of bytes pending to be read """
+        return len(self._read_buffer)
+
+    def fileno(self):
+        return None
+
+    def _process(self):
+        """
+        Consumes the complete requests from the request buffer
+
+        :returns: The replies to send back
+        :rtype: list of str
+        """
+        raise NotImplementedError()
+
+
+class MasterEmulator(SerialEmulator):
+    """ Emulates a classic master with output modules and an EEPROM """
+
+    def __init__(self, output_modules=8, eeprom_banks=256, latency=0.0, baudrate=115200):
+        super(MasterEmulator, self).__init__(latency=latency, baudrate=baudrate)
+        self.output_modules = output_modules
+        self.eeprom = dict((bank, ''.join(chr((bank + i) % 256) for i in xrange(256)))
+                           for bank in xrange(eeprom_banks))
+        self.outputs = dict((i, 0) for i in xrange(output_modules * 8))
+        self._handlers = {}
+        self.register(master_api.number_of_io_modules(),
+                      lambda fields: {'in': 0, 'out': self.output_modules, 'shutter': 0})
+        self.register(master_api.read_output(), self._read_output)
+        self.register(master_api.eeprom_list(),
+                      lambda fields: {'bank': fields['bank'], 'data': self.eeprom.get(fields['bank'], '\xff' * 256)})
+        self.register(master_api.basic_action(),
+                      lambda fields: {'resp': 'OK'})
+
+    def register(self, spec, handler):
+        """
+        Registers the handler answering a command
+
+        :param spec: The command spec
+        :type spec: master.master_command.MasterCommandSpec
+        :param handler: Callable receiving the request fields and returning the reply fields
+        """
+        input_spec = MasterCommandSpec(spec.action, [], spec.input_fields)
+        self._handlers[spec.action] = (spec, input_spec, handler)
+
+    def _read_output(self, fields):
+        output_id = fields['id']
+        dimmer = self.outputs.get(output_id, 0)
+        return {'id': output_id, 'type': 'D', 'light': 1, 'timer': 0, 'ctimer': 0,
+                'status': 1 if dimmer > 0 else 0, 'dimmer': dimmer, 'controller_out': 0,
+                'max_power': 0, 'floor_level': 0, 'menu_position': [0, 0, 0],
+                'name': 'Output {0}'.format(output_id).ljust(16)[:16]}
+
+    def emit_output_list(self, outputs):
+        """
+        Emits an OL message, as sent by the master when outputs change
+
+        :param outputs: List of (output_id, dimmer) tuples, dimmer in [0, 63]
+        """
+        data = ''.join(chr(output_id) + chr(dimmer) for output_id, dimmer in outputs)
+        self.emit('OL' + chr(0) + chr(len(outputs)) + data + '\r\n')
+
+    def _process(self):
+        replies = []
+        while True:
+            index = self._request_buffer.find('STR')
+            if index == -1 or len(self._request_buffer) < index + 6:
+                return replies
+            self._request_buffer = self._request_buffer[index:]
+            action = self._request_buffer[3:5]
+            cid = ord(self._request_buffer[5])
+            if action not in self._handlers:
+                logger.warning('Master emulator: unknown action {0}'.format(action))
+                self._request_buffer = self._request_buffer[3:]
+                continue
+            spec, input_spec, handler = self._handlers[action]
+            consumed, result, done = input_spec.consume_output(self._request_buffer[6:])
+            if not done or len(self._request_buffer) < 6 + consumed + 2:
+                return replies
+            self._request_buffer = self._request_buffer[6 + consumed + 2:]
+            replies.append(MasterEmulator._create_output(spec, cid, handler(result.fields)))
+
+    @staticmethod
+    def _create_output(spec, cid, fields):
+        crc = 0
+        for field in spec.output_fields:
+            if Field.is_crc(field):
+                fields['crc'] = [67, crc / 256, crc % 256]
+                break
+            for byte in field.encode(fields.get(field.name)):
+                crc += ord(byte)
+        return spec.create_output(cid, fields)
+
+
+class CoreEmulator(SerialEmulator):
+    """ Emulates a Core+ with outputs and its memory (EEPROM and FRAM) """
+
+    def __init__(self, outputs=64, latency=0.0, baudrate=115200):
+        super(CoreEmulator, self).__init__(latency=latency, baudrate=baudrate)
+        self.outputs = dict((i, 0) for i in xrange(outputs))
+        self._handlers = {}
+        self.register(CoreAPI.memory_read(), self._memory_read)
+        self.register(CoreAPI.output_detail(), self._output_detail)
+        self.register(CoreAPI.basic_action(), lambda fields: fields)
+
+    def register(self, spec, handler):
+        """
+        Registers the handler answering a command
+
+        :param spec: The command spec
+        :type spec: master_core.core_command.CoreCommandSpec
+        :param handler: Callable receiving the request fields and returning the reply fields
+        """
+        input_spec = CoreCommandSpec(spec.instruction, response_fields=spec.request_fields)
+        self._handlers[spec.instruction] = (spec, input_spec, handler)
+
+    @staticmethod
+    def _memory_read(fields):
+        page, start = fields['page'], fields['start']
+        return {'type': fields['type'], 'page': page, 'start': start,
+                'data': [(page + start + i) % 256 for i in xrange(fields['length'])]}
+
+    def _output_detail(self, fields):
+        device_nr = fields['device_nr']
+        dimmer = self.outputs.get(device_nr, 0)
+        return {'device_nr': device_nr, 'status': 1 if dimmer > 0 else 0, 'dimmer': dimmer,
+                'dimmer_min': 0, 'dimmer_max': 255, 'timer_type': 0, 'timer_type_standard': 0,
+                'timer': 0, 'timer_standard': 0, 'group_action': 65535, 'dali_output': 255}
+
+    def emit_event(self, fields):
+        """
+        Emits an EV message, as sent by the Core when e.g. an output or input changes
+
+        :param fields: The event fields (type, action, device_nr, data)
+        """
+        self.emit(CoreEmulator._create_reply(CoreAPI.event_information(), 0, fields))
+
+    def _process(self):
+        replies = []
+        while True:
+            index = self._request_buffer.find('STR')
+            if index == -1 or len(self._request_buffer) < index + 8:
+                return replies
+            self._request_buffer = self._request_buffer[index:]
+            cid = ord(self._request_buffer[3])
+            instruction = self._request_buffer[4:6]
+            length = WordField.decode(self._request_buffer[6:8])
+            message_length = 8 + length + 2 + 4  # Header, payload, 'C' + CRC, '\r\n\r\n'
+            if len(self._request_buffer) < message_length:
+                return replies
+            payload = self._request_buffer[8:8 + length]
+            self._request_buffer = self._request_buffer[message_length:]
+            if instruction not in self._handlers:
+                logger.warning('Core emulator: unknown instruction {0}'.format(instruction))
+                continue
+            spec, input_spec, handler = self._handlers[instruction]
+            replies.append(CoreEmulator._create_reply(spec, cid, handler(input_spec.consume_response_payload(payload))))
+
+    @staticmethod
+    def _create_reply(spec, cid, fields):
+        payload = ''
+        for field in spec.response_fields:
+            value = fields.get(field.name)
+            if callable(field.length):
+                # Variable length field, its length is derived from the reply length when decoding
+                field = copy.copy(field)
+                field.length = len(value)
+            payload += field.encode(value)
+        checked_payload = chr(cid) + spec.response_instruction + WordField.encode(len(payload)) + payload
+        crc = 0
+        for byte in checked_payload:
+            crc += ord(byte)
+        return 'RTR' + checked_payload + 'C' + chr(crc % 256) + '\r\n'
+
+
+class PowerBusEmulator(SerialEmulator):
+    """ Emulates a number of power modules on the RS485 bus """
+
+    def __init__(self, modules=4, version=power_api.POWER_MODULE, latency=0.0, baudrate=115200):
+        """
+        :param modules: Number of modules, addressed from 1 onwards
+        :param version: The power module version (power_api.POWER_MODULE or power_api.ENERGY_MODULE)
+        """
+        super(PowerBusEmulator, self).__init__(latency=latency, baudrate=baudrate)
+        self.addresses = range(1, modules + 1)
+        self._handlers = {}
+        for command in [power_api.get_voltage(version), power_api.get_frequency(version),
+                        power_api.get_current(version), power_api.get_power(version),
+                        power_api.get_version(version)]:
+            self.register(command)
+
+    def register(self, command, handler=None):
+        """
+        Registers the handler answering a command
+
+        :param command: The power command
+        :type command: power.power_command.PowerCommand
+        :param handler: Callable receiving the address and request data, returning the reply values.
+                        Without handler, the reply holds zero values.
+        """
+        if handler is None:
+            empty = struct.unpack(command.output_format, '\x00' * struct.calcsize(command.output_format))
+            handler = lambda address, data: empty
+        self._handlers[(command.module_type, command.mode, command.type)] = (command, handler)
+
+    def _process(self):
+        replies = []
+        while True:
+            index = self._request_buffer.find('STR')
+            if index == -1 or len(self._request_buffer) < index + 11:
+                return replies
+            self._request_buffer = self._request_buffer[index:]
+            header = self._request_buffer[3:11]
+            length = ord(header[7])
+            message_length = 11 + length + 1 + 2  # Header, payload, CRC, '\r\n'
+            if len(self._request_buffer) < message_length:
+                return replies
+            data = self._request_buffer[11:11 + length]
+            self._request_buffer = self._request_buffer[message_length:]
+            module_type, address, cid, mode, command_type = header[0], ord(header[1]), ord(header[2]), header[3], header[4:7]
+            if address not in self.addresses:
+                continue  # Nobody on the bus answers
+            if (module_type, mode, command_type) not in self._handlers:
+                # Unknown commands are answered with a NACK
+                payload = chr(1) + '\x02'
+                nack_header = module_type + chr(address) + chr(cid) + 'N' + command_type
+                replies.append('RTR' + nack_header + payload + chr(crc7(nack_header + payload)) + '\r\n')
+                continue
+            command, handler = self._handlers[(module_type, mode, command_type)]
+            replies.append(command.create_output(address, cid, *handler(address, data)))
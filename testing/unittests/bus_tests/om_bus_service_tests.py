@@ -0,0 +1,117 @@
+# Copyright (C) 2020 OpenMotics BV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for the message bus service
+"""
+
+import socket
+import unittest
+import xmlrunner
+import ujson as json
+from multiprocessing.connection import Client
+from bus.om_bus_service import MessageService, _ClientConnection
+
+
+class MessageServiceTest(unittest.TestCase):
+    """ Tests for MessageService """
+
+    PORT = 10123
+
+    @classmethod
+    def setUpClass(cls):
+        cls.service = MessageService(port=MessageServiceTest.PORT, authkey='test')
+        cls.service.start()
+
+    def _connect(self, name):
+        client = Client(('localhost', MessageServiceTest.PORT), authkey='test')
+        self._send(client, name, 'discovery')
+        return client
+
+    @staticmethod
+    def _send(client, name, data, destination=None):
+        client.send_bytes(json.dumps({'type': 'event', 'source': name, 'destination': destination, 'data': data}))
+
+    @staticmethod
+    def _drain(client):
+        sources = []
+        while client.poll(0.2):
+            sources.append(json.loads(client.recv_bytes())['source'])
+        return sources
+
+    @staticmethod
+    def _receive_from(client, source):
+        while client.poll(2):
+            if json.loads(client.recv_bytes())['source'] == source:
+                return True
+        return False
+
+    @staticmethod
+    def _receive(client):
+        if not client.poll(2):
+            return None
+        return json.loads(client.recv_bytes())
+
+    def test_routing(self):
+        first = self._connect('first')
+        second = self._connect('second')
+        third = self._connect('third')
+        # Discovery messages are multicasted
+        self.assertEqual(['second', 'third'], sorted(self._receive(first)['source'] for _ in range(2)))
+        self.assertTrue(self._receive_from(second, 'third'))
+        for client in [first, second, third]:
+            self._drain(client)
+
+        # Multicast, not to the sender
+        self._send(first, 'first', {'foo': 'bar'})
+        self.assertEqual({'foo': 'bar'}, self._receive(second)['data'])
+        self.assertEqual({'foo': 'bar'}, self._receive(third)['data'])
+        self.assertFalse(first.poll(0.2))
+
+        # Unicast
+        self._send(third, 'third', 'ping', destination='first')
+        self.assertEqual('ping', self._receive(first)['data'])
+        self.assertFalse(second.poll(0.2))
+
+        # Large messages are framed correctly
+        payload = 'x' * 500000
+        self._send(second, 'second', payload, destination='third')
+        self.assertEqual(payload, self._receive(third)['data'])
+
+        # A client can't change its name
+        self._send(second, 'first', 'spoof')
+        self.assertFalse(first.poll(0.2))
+        self.assertRaises(EOFError, second.recv_bytes)
+
+        for client in [first, third]:
+            client.close()
+
+    def test_bounded_send_buffer(self):
+        sock, other = socket.socketpair()
+        connection = _ClientConnection(sock, max_send_buffer=1024)
+        frame = MessageService._frame('x' * 600)
+        connection.queue(frame)
+        connection.queue(frame)  # Dropped, the buffer would exceed 1024 bytes
+        self.assertTrue(connection.wants_write)
+        connection.flush()
+        self.assertFalse(connection.wants_write)
+        self.assertEqual(frame, other.recv(4096))
+        connection.queue(frame)  # There's room again
+        self.assertTrue(connection.wants_write)
+        connection.close()
+        other.close()
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output='../gw-unit-reports'))
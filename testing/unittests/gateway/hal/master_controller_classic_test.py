@@ -26,6 +26,7 @@ from master.eeprom_controller import EepromController
 from master.eeprom_models import InputConfiguration
 from master.inputs import InputStatus
 from master.master_communicator import BackgroundConsumer
+from serial_utils import CommunicationTimedOutException
 
 
 class MasterClassicControllerTest(unittest.TestCase):
@@ -122,6 +123,50 @@ class MasterClassicControllerTest(unittest.TestCase):
             classic.get_recent_inputs()
             self.assertIn(mock.call(), get.call_args_list)
 
+    def test_cached_modules(self):
+        classic = get_classic_controller_dummy()
+        master_communicator = classic._master_communicator
+        master_communicator.do_command.return_value = {'in': 0, 'out': 1, 'shutter': 1, 'data': 'O', 'resp': 'OK'}
+        self.assertEqual({'outputs': ['O'], 'inputs': [], 'shutters': ['S'], 'can_inputs': []},
+                         classic.get_modules())
+        self.assertEqual(2, master_communicator.do_command.call_count)
+        classic.get_modules()
+        self.assertEqual(2, master_communicator.do_command.call_count)
+        classic.module_discover_stop()
+        classic.get_modules()
+        self.assertEqual(5, master_communicator.do_command.call_count)
+
+    def test_cached_firmware_version(self):
+        classic = get_classic_controller_dummy()
+        master_communicator = classic._master_communicator
+        master_communicator.do_command.return_value = {'f1': 3, 'f2': 143, 'f3': 90}
+        classic._get_master_version()
+        self.assertEqual((3, 143, 90), classic.get_firmware_version())
+        self.assertEqual(1, master_communicator.do_command.call_count)
+
+
+    def test_modules_information_timeout(self):
+        classic = get_classic_controller_dummy()
+        classic._eeprom_controller.read_address.side_effect = lambda address: mock.Mock(bytes='O\x01\x02\x03' if address.length == 4 else 'O')
+        master_communicator = classic._master_communicator
+        versions = [CommunicationTimedOutException(), {'hw_version': 1, 'f1': 3, 'f2': 1, 'f3': 2}]
+
+        def do_command(command, fields=None, **kwargs):
+            _ = fields, kwargs
+            if command == master.master_api.number_of_io_modules():
+                return {'in': 0, 'out': 1, 'shutter': 0}
+            version = versions.pop(0)
+            if isinstance(version, Exception):
+                raise version
+            return version
+
+        master_communicator.do_command.side_effect = do_command
+        self.assertIsNone(classic.get_modules_information()['079.001.002.003']['firmware'])
+        # The module that timed out is queried again on the next call
+        self.assertEqual('3.1.2', classic.get_modules_information()['079.001.002.003']['firmware'])
+        self.assertEqual(3, master_communicator.do_command.call_count)
+        classic.get_modules_information()
+        self.assertEqual(3, master_communicator.do_command.call_count)
 
 @Scope
 def get_classic_controller_dummy(inputs=None):
@@ -126,6 +126,29 @@ class MasterCoreControllerTest(unittest.TestCase):
                                                            'location': {'room_id': 255}}})
         subscriber.callback.assert_called_with(expected_event)
 
+    def test_output_status_changes(self):
+        consumer_list = []
+
+        def new_consumer(*args):
+            consumer = BackgroundConsumer(*args)
+            consumer_list.append(consumer)
+            return consumer
+
+        with mock.patch.object(gateway.hal.master_controller_core, 'BackgroundConsumer',
+                               side_effect=new_consumer):
+            controller = get_core_controller_dummy({'output': 1, 'status': 0, 'timer': 0, 'dimmer': 0})
+        controller._refresh_output_states()
+        self.assertEqual(8, len(controller.get_output_statuses()))
+        version, _ = controller.get_output_status_changes(0)
+
+        event_data = {'type': 0, 'action': 1, 'device_nr': 2,
+                      'data': [50, 0, 0, 0]}
+        with mock.patch.object(Queue, 'get', return_value=event_data):
+            consumer_list[0].deliver()
+        self.assertEqual({'id': 2, 'status': 1, 'ctimer': 0, 'dimmer': 50}, controller.get_output_status(2))
+        self.assertEqual((version + 1, [(version + 1, 2, 1, 50)]), controller.get_output_status_changes(version))
+        self.assertEqual((version + 1, None), controller.get_output_status_changes(0))
+
 
 class MasterCoreControllerCompatibilityTest(unittest.TestCase):
     @classmethod
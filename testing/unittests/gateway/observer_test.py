@@ -22,6 +22,7 @@ import mock
 import xmlrunner
 from gateway.observer import Observer
 from ioc import Scope, SetTestMode, SetUpTestInjections
+from serial_utils import CommunicationTimedOutException
 from master.inputs import InputStatus
 
 
@@ -50,6 +51,42 @@ class ObserverTest(unittest.TestCase):
             inputs = observer.get_recent()
             self.assertEqual([1], [x['id'] for x in inputs])
 
+    def test_refresh_shutters(self):
+        observer = get_observer()
+        observer.set_gateway_api(mock.Mock())
+        shutter_controller = observer._shutter_controller
+        master_communicator = observer._master_communicator
+        master_communicator.do_command.return_value = {'shutter': 2, 'status': 0}
+
+        observer._on_shutter_update({'module_nr': 1, 'status': 0b00000001})
+        observer._refresh_shutters()
+        # The module count and the state of the module without events are read
+        self.assertEqual(2, master_communicator.do_command.call_count)
+        self.assertEqual([mock.call({'module_nr': 1, 'status': 0b00000001}),
+                          mock.call({'module_nr': 0, 'status': 0})],
+                         shutter_controller.update_from_master_state.call_args_list)
+
+        master_communicator.do_command.reset_mock()
+        observer._refresh_shutters()  # Everything is known
+        self.assertEqual(0, master_communicator.do_command.call_count)
+
+        observer.invalidate_cache(Observer.Types.SHUTTERS)
+        observer._refresh_shutters()
+        self.assertEqual(3, master_communicator.do_command.call_count)
+
+    def test_refresh_shutters_failure(self):
+        observer = get_observer()
+        observer.set_gateway_api(mock.Mock())
+        master_communicator = observer._master_communicator
+        master_communicator.do_command.side_effect = [{'shutter': 1}, CommunicationTimedOutException()]
+
+        with self.assertRaises(CommunicationTimedOutException):
+            observer._refresh_shutters()
+        master_communicator.do_command.side_effect = None
+        master_communicator.do_command.return_value = {'status': 0}
+        observer._refresh_shutters()  # The failed module is read again
+        self.assertEqual(3, master_communicator.do_command.call_count)
+
 
 @Scope
 def get_observer():
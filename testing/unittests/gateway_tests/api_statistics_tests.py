@@ -0,0 +1,81 @@
+# Copyright (C) 2020 OpenMotics BV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for the api statistics module.
+"""
+
+import unittest
+import xmlrunner
+from gateway.api_statistics import ApiStatistics
+from toolbox import Histogram
+
+
+class HistogramTest(unittest.TestCase):
+    """ Tests for Histogram. """
+
+    def test_empty(self):
+        histogram = Histogram()
+        self.assertIsNone(histogram.percentile(50))
+        summary = histogram.as_dict()
+        self.assertEqual(0, summary['count'])
+        self.assertIsNone(summary['avg'])
+        self.assertIsNone(summary['p99'])
+
+    def test_percentiles(self):
+        histogram = Histogram()
+        for _ in xrange(90):
+            histogram.add(0.0015)
+        for _ in xrange(9):
+            histogram.add(0.03)
+        histogram.add(20)
+        self.assertEqual(100, histogram.count)
+        self.assertEqual(0.002, histogram.percentile(50))
+        self.assertEqual(0.002, histogram.percentile(90))
+        self.assertEqual(0.05, histogram.percentile(99))
+        self.assertEqual(20, histogram.percentile(100))  # Overflow bucket uses the maximum
+        summary = histogram.as_dict()
+        self.assertAlmostEqual(1.5, summary['min'])
+        self.assertAlmostEqual(20000, summary['max'])
+        self.assertEqual(90, summary['buckets']['2.0'])
+        self.assertEqual(1, summary['buckets']['+inf'])
+
+    def test_percentile_bounded_by_max(self):
+        histogram = Histogram()
+        histogram.add(0.011)
+        self.assertEqual(0.011, histogram.percentile(50))
+
+
+class ApiStatisticsTest(unittest.TestCase):
+    """ Tests for ApiStatistics. """
+
+    def test_statistics(self):
+        statistics = ApiStatistics()
+        statistics.add_call('get_status', 0.004)
+        statistics.add_call('get_status', 0.006, error=True)
+        statistics.add_timing('get_status', ApiStatistics.SERIALIZATION, 0.0005)
+        statistics.add_timing('plugins/foo/bar', ApiStatistics.AUTHENTICATION, 0.001)
+
+        result = statistics.get_statistics()
+        self.assertEqual(['get_status', 'plugins/foo/bar'], sorted(result.keys()))
+        self.assertEqual(2, result['get_status']['calls'])
+        self.assertEqual(1, result['get_status']['errors'])
+        self.assertEqual(['process', 'serialization'], sorted(result['get_status']['timings'].keys()))
+        self.assertAlmostEqual(5.0, result['get_status']['timings']['process']['avg'])
+        self.assertEqual(0, result['plugins/foo/bar']['calls'])
+        self.assertEqual(1, result['plugins/foo/bar']['timings']['authentication']['count'])
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output='../gw-unit-reports'))
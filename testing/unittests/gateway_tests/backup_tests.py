@@ -0,0 +1,157 @@
+# Copyright (C) 2020 OpenMotics BV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for the streaming full backup and restore.
+"""
+
+import os
+import shutil
+import sqlite3
+import tarfile
+import tempfile
+import unittest
+import xmlrunner
+from StringIO import StringIO
+from mock import Mock, patch
+from ioc import SetTestMode, SetUpTestInjections
+from gateway.gateway_api import GatewayApi
+
+DATABASES = ['config', 'scheduling', 'power', 'eeprom_extension', 'metrics', 'pulse_counter']
+
+
+class BackupTest(unittest.TestCase):
+    """ Tests for the full backup and restore. """
+
+    @classmethod
+    def setUpClass(cls):
+        SetTestMode()
+
+    def setUp(self):
+        self._root = tempfile.mkdtemp()
+        self._patches = []
+        for folder in ['source', 'target']:
+            os.makedirs(os.path.join(self._root, folder, 'plugins', 'dummy', 'static'))
+            os.makedirs(os.path.join(self._root, folder, 'etc'))
+        for database in DATABASES:
+            self._patch('constants.get_{0}_database_file'.format(database),
+                        os.path.join(self._root, 'source', '{0}.db'.format(database)))
+            connection = sqlite3.connect(os.path.join(self._root, 'source', '{0}.db'.format(database)))
+            connection.execute('CREATE TABLE test (value TEXT)')
+            connection.execute('INSERT INTO test VALUES (?)', (database,))
+            connection.commit()
+            connection.close()
+        self._patch('constants.get_plugin_dir', os.path.join(self._root, 'source', 'plugins') + '/')
+        self._patch('constants.get_plugin_configfiles', os.path.join(self._root, 'source', 'etc', 'pi_*'))
+        with open(os.path.join(self._root, 'source', 'plugins', 'dummy', 'main.py'), 'w') as plugin_file:
+            plugin_file.write('x' * 100000)
+        with open(os.path.join(self._root, 'source', 'plugins', 'dummy', 'static', 'index.html'), 'w') as plugin_file:
+            plugin_file.write('<html/>')
+        with open(os.path.join(self._root, 'source', 'etc', 'pi_dummy.conf'), 'w') as config_file:
+            config_file.write('{}')
+
+        self.master_controller = Mock()
+        self.master_controller.get_backup.return_value = 'E' * 65536
+        SetUpTestInjections(master_controller=self.master_controller,
+                            power_communicator=Mock(),
+                            power_controller=Mock(),
+                            pulse_controller=Mock(),
+                            message_client=Mock(),
+                            observer=Mock(),
+                            configuration_controller=Mock(),
+                            shutter_controller=Mock(),
+                            health_monitor=Mock())
+        self.gateway_api = GatewayApi()
+
+    def tearDown(self):
+        for patcher in self._patches:
+            patcher.stop()
+        shutil.rmtree(self._root)
+
+    def _patch(self, target, return_value):
+        patcher = patch(target, return_value=return_value)
+        patcher.start()
+        self._patches.append(patcher)
+
+    def test_backup(self):
+        backup = StringIO(''.join(self.gateway_api.get_full_backup()))
+        with tarfile.open(fileobj=backup) as backup_tar:
+            names = backup_tar.getnames()
+            self.assertEqual('E' * 65536, backup_tar.extractfile('sqlite/master.eep').read())
+            self.assertEqual('x' * 100000, backup_tar.extractfile('plugins/content/dummy/main.py').read())
+        self.assertEqual(['plugins/config/pi_dummy.conf',
+                          'plugins/content/dummy/static/index.html',
+                          'sqlite/config.db',
+                          'sqlite/pulse.db'],
+                         sorted(name for name in names if name in ['plugins/config/pi_dummy.conf',
+                                                                  'plugins/content/dummy/static/index.html',
+                                                                  'sqlite/config.db',
+                                                                  'sqlite/pulse.db']))
+
+    def test_backup_cleanup(self):
+        tmp_dirs = []
+        mkdtemp = tempfile.mkdtemp
+
+        def track_mkdtemp():
+            tmp_dirs.append(mkdtemp())
+            return tmp_dirs[-1]
+
+        with patch('tempfile.mkdtemp', side_effect=track_mkdtemp):
+            backup = self.gateway_api.get_full_backup()  # e.g. a HEAD request, the backup is never consumed
+            self.assertTrue(os.path.exists(tmp_dirs[0]))
+            backup.close()
+            self.assertFalse(os.path.exists(tmp_dirs[0]))
+
+            backup = self.gateway_api.get_full_backup()
+            next(iter(backup))  # Partially consumed, e.g. the client disconnected
+            backup.close()
+            self.assertFalse(os.path.exists(tmp_dirs[1]))
+
+    def test_restore(self):
+        backup = StringIO(''.join(self.gateway_api.get_full_backup()))
+        for patcher in self._patches:
+            patcher.stop()
+        self._patches = []
+        for database in DATABASES:
+            self._patch('constants.get_{0}_database_file'.format(database),
+                        os.path.join(self._root, 'target', '{0}.db'.format(database)))
+        self._patch('constants.get_plugin_dir', os.path.join(self._root, 'target', 'plugins') + '/')
+        self._patch('constants.get_plugin_config_dir', os.path.join(self._root, 'target', 'etc'))
+        shutil.rmtree(os.path.join(self._root, 'target', 'plugins', 'dummy'))
+
+        with patch('gateway.gateway_api.threading.Timer'):  # Prevents the restart
+            self.assertEqual({'output': 'Restore complete'}, self.gateway_api.restore_full_backup(backup))
+        self.master_controller.restore.assert_called_once_with('E' * 65536)
+        connection = sqlite3.connect(os.path.join(self._root, 'target', 'metrics.db'))
+        self.assertEqual([('metrics',)], connection.execute('SELECT value FROM test').fetchall())
+        connection.close()
+        with open(os.path.join(self._root, 'target', 'plugins', 'dummy', 'main.py')) as plugin_file:
+            self.assertEqual('x' * 100000, plugin_file.read())
+        self.assertTrue(os.path.exists(os.path.join(self._root, 'target', 'etc', 'pi_dummy.conf')))
+
+    def test_restore_invalid_member(self):
+        backup = StringIO()
+        with tarfile.open(fileobj=backup, mode='w') as backup_tar:
+            tarinfo = tarfile.TarInfo('../evil')
+            tarinfo.size = 4
+            backup_tar.addfile(tarinfo, StringIO('evil'))
+        backup.seek(0)
+        with patch('gateway.gateway_api.threading.Timer'):
+            with self.assertRaises(Exception):
+                self.gateway_api.restore_full_backup(backup)
+        self.assertFalse(os.path.exists(os.path.join(tempfile.gettempdir(), 'evil')))
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output='../gw-unit-reports'))
@@ -0,0 +1,86 @@
+# Copyright (C) 2020 OpenMotics BV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for the configuration versions and the versioned API responses.
+"""
+
+import unittest
+import xmlrunner
+import cherrypy
+from gateway.config_versions import ConfigurationVersions, configuration_versions
+from gateway.webservice import openmotics_api
+
+
+class ConfigurationVersionsTest(unittest.TestCase):
+    """ Tests for ConfigurationVersions. """
+
+    def test_versions(self):
+        versions = ConfigurationVersions()
+        outputs = versions.get_version(ConfigurationVersions.OUTPUTS)
+        inputs = versions.get_version(ConfigurationVersions.INPUTS)
+        versions.bump(ConfigurationVersions.OUTPUTS)
+        self.assertNotEqual(outputs, versions.get_version(ConfigurationVersions.OUTPUTS))
+        self.assertEqual(inputs, versions.get_version(ConfigurationVersions.INPUTS))
+        versions.bump()
+        self.assertNotEqual(inputs, versions.get_version(ConfigurationVersions.INPUTS))
+
+
+class VersionedApiTest(unittest.TestCase):
+    """ Tests for the versioned API responses. """
+
+    def tearDown(self):
+        cherrypy.request.headers.pop('If-None-Match', None)
+
+    def test_versioned_response(self):
+        calls = []
+        configs = {'name': 'foo'}
+
+        @openmotics_api(versioned=ConfigurationVersions.OUTPUTS)
+        def get_configs(self, fields=None):
+            _ = self
+            calls.append(fields)
+            return {'config': [configs]}
+
+        @openmotics_api(invalidates=ConfigurationVersions.OUTPUTS)
+        def set_configs(self, config):
+            _ = self
+            configs.update(config)
+            return {}
+
+        contents = get_configs(None)
+        etag = cherrypy.response.headers['ETag']
+        self.assertEqual(1, len(calls))
+        self.assertEqual(contents, get_configs(None))  # Served from the cache
+        self.assertEqual(1, len(calls))
+        get_configs(None, fields=['name'])  # Different parameters
+        self.assertEqual(2, len(calls))
+
+        cherrypy.request.headers['If-None-Match'] = etag
+        self.assertEqual('', get_configs(None))
+        self.assertEqual(304, cherrypy.response.status)
+
+        set_configs(None, {'name': 'bar'})
+        self.assertIn('bar', get_configs(None))
+        self.assertEqual(200, cherrypy.response.status)
+        self.assertNotEqual(etag, cherrypy.response.headers['ETag'])
+        self.assertEqual(3, len(calls))
+
+        configuration_versions.bump()  # e.g. an eeprom cache invalidation
+        get_configs(None)
+        self.assertEqual(4, len(calls))
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output='../gw-unit-reports'))
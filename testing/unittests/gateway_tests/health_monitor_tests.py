@@ -0,0 +1,93 @@
+# Copyright (C) 2020 OpenMotics BV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for the health monitor.
+"""
+
+import time
+import unittest
+import xmlrunner
+from mock import Mock
+from ioc import SetTestMode
+from gateway.health_monitor import HealthMonitor
+
+
+class HealthMonitorTest(unittest.TestCase):
+    """ Tests for the HealthMonitor. """
+
+    @classmethod
+    def setUpClass(cls):
+        SetTestMode()
+
+    def setUp(self):
+        self.master_controller = Mock()
+        self.master_controller.error_list.return_value = [('O1', 2)]
+        self.states = {}
+        self.message_client = Mock()
+        self.message_client.get_state.side_effect = lambda service, default: self.states.get(service, default)
+        self.monitor = HealthMonitor(master_controller=self.master_controller,
+                                     message_client=self.message_client,
+                                     state_interval=0.1)
+
+    def tearDown(self):
+        self.monitor.stop()
+
+    def _wait_for(self, condition, timeout=2):
+        end = time.time() + timeout
+        while not condition() and time.time() < end:
+            time.sleep(0.01)
+
+    def test_errors(self):
+        self.assertEqual([], self.monitor.get_errors())  # Not loaded yet
+        self.assertEqual(0, self.master_controller.error_list.call_count)  # Loading is left to the background thread
+
+        self.monitor.start()
+        self._wait_for(lambda: self.monitor.get_errors() != [])
+        self.assertEqual([('O1', 2)], self.monitor.get_errors())
+        self.assertEqual([('O1', 2)], self.monitor.get_errors())
+        self.assertEqual(1, self.master_controller.error_list.call_count)  # Served from memory
+
+        self.master_controller.error_list.return_value = []
+        self.monitor.clear_errors()
+        self.master_controller.clear_error_list.assert_called_once_with()
+        self.assertEqual([], self.monitor.get_errors())
+        self._wait_for(lambda: self.master_controller.error_list.call_count == 2)
+        self.assertEqual(2, self.master_controller.error_list.call_count)  # The cleared errors are reloaded
+        self.assertEqual([], self.monitor.get_errors())
+
+        self.master_controller.error_list.side_effect = NotImplementedError()
+        self.monitor.clear_errors()
+        self._wait_for(lambda: self.master_controller.error_list.call_count == 3)
+        self.assertEqual([], self.monitor.get_errors())
+
+    def test_service_health(self):
+        self.assertEqual({'vpn_service': {'state': False},
+                          'led_service': {'state': False}}, self.monitor.get_service_health())
+        now = time.time()
+        self.states = {'vpn_service': {'last_cycle': now},
+                       'led_service': {'run_gpio': now, 'run_i2c': now, 'run_buttons': now, 'run_state_check': now - 10}}
+        self.monitor.start()
+        time.sleep(0.3)
+        self.assertEqual({'vpn_service': {'state': True},
+                          'led_service': {'state': False}}, self.monitor.get_service_health())
+        calls = self.message_client.get_state.call_count
+        for _ in xrange(10):
+            self.monitor.get_service_health()
+        self.assertLess(self.message_client.get_state.call_count, calls + 10)  # Not requested per call
+        self.assertEqual(1, self.master_controller.error_list.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output='../gw-unit-reports'))
@@ -0,0 +1,135 @@
+# Copyright (C) 2020 OpenMotics BV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for the maintenance line framing, the maintenance controller and the Core maintenance communicator.
+"""
+
+import time
+import unittest
+import xmlrunner
+from Queue import Queue, Empty
+from mock import Mock
+from ioc import SetTestMode, SetUpTestInjections
+from gateway.maintenance_communicator import LineBuffer
+from gateway.maintenance_controller import MaintenanceController
+from master_core.maintenance import MaintenanceCoreCommunicator
+
+
+class LineBufferTest(unittest.TestCase):
+    """ Tests for LineBuffer. """
+
+    def test_feed(self):
+        line_buffer = LineBuffer()
+        self.assertEqual([], line_buffer.feed(''))
+        self.assertEqual([], line_buffer.feed('foo'))
+        self.assertEqual(['foobar'], line_buffer.feed('bar\r\n'))
+        self.assertEqual(['a', '', 'b'], line_buffer.feed('a\r\n\r\nb\nc'))
+        self.assertEqual(['c'], line_buffer.feed('\n'))
+        self.assertEqual([], line_buffer.feed(''))
+
+
+class MaintenanceControllerTest(unittest.TestCase):
+    """ Tests for MaintenanceController. """
+
+    @classmethod
+    def setUpClass(cls):
+        SetTestMode()
+
+    def setUp(self):
+        self.communicator = Mock()
+        SetUpTestInjections(maintenance_communicator=self.communicator,
+                            ssl_private_key=None,
+                            ssl_certificate=None)
+        self.controller = MaintenanceController()
+        self.receiver = self.communicator.set_receiver.call_args[0][0]
+
+    def tearDown(self):
+        self.controller.stop()
+
+    def test_broadcast(self):
+        received = []
+        self.controller._connection = Mock()
+        self.controller.add_consumer('foo', received.append)
+        for i in xrange(150):
+            self.receiver('line {0}'.format(i))  # Messages are queued while the controller isn't started
+        self.controller.start()
+        for _ in xrange(50):
+            if len(received) == 150:
+                break
+            time.sleep(0.1)
+        self.assertEqual(['line {0}'.format(i) for i in xrange(150)], received)
+        sent = ''.join(call[0][0] for call in self.controller._connection.sendall.call_args_list)
+        self.assertEqual(''.join('line {0}\n'.format(i) for i in xrange(150)), sent)
+        self.assertLess(self.controller._connection.sendall.call_count, 150)  # Sent in batches
+
+    def test_queue_full(self):
+        for i in xrange(MaintenanceController.QUEUE_SIZE + 5):
+            self.receiver('line {0}'.format(i))
+        self.assertEqual(5, self.controller._messages_dropped)
+
+
+class SerialMock(object):
+    """ A serial port of which the reads block until data is written to it, or until the timeout expires """
+
+    def __init__(self):
+        self.timeout = None
+        self._data = Queue()
+
+    def feed(self, data):
+        for byte in data:
+            self._data.put(byte)
+
+    def read(self, size=1):
+        data = ''
+        try:
+            while len(data) < size:
+                data += self._data.get(timeout=self.timeout)
+        except Empty:
+            pass
+        return data
+
+    def inWaiting(self):
+        return self._data.qsize()
+
+
+class MaintenanceCoreCommunicatorTest(unittest.TestCase):
+    """ Tests for MaintenanceCoreCommunicator. """
+
+    @classmethod
+    def setUpClass(cls):
+        SetTestMode()
+
+    def test_read_and_stop(self):
+        serial = SerialMock()
+        communicator = MaintenanceCoreCommunicator(cli_serial=serial)
+        received = []
+        communicator.set_receiver(received.append)
+        communicator.start()
+        serial.feed('foo\r\nbar\r\n')
+        for _ in xrange(20):
+            if len(received) == 2:
+                break
+            time.sleep(0.05)
+        self.assertEqual(['foo', 'bar'], received)
+
+        thread = communicator._read_data_thread
+        start = time.time()
+        communicator.stop()
+        self.assertLess(time.time() - start, 1)
+        self.assertFalse(thread.is_alive())  # The reader stops, even without any data on the port
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output='../gw-unit-reports'))
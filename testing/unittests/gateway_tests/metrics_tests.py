@@ -27,6 +27,7 @@ from threading import Lock
 from mock import Mock
 from ioc import SetTestMode, SetUpTestInjections
 from gateway.config import ConfigurationController
+from gateway.metric import Metric
 from gateway.metrics_controller import MetricsController
 from gateway.metrics_caching import MetricsCacheController
 
@@ -84,6 +85,20 @@ class MetricsTest(unittest.TestCase):
         metrics_controller = MetricsController()
         return config_controller, metrics_controller
 
+    def test_metric_record(self):
+        metric_1 = Metric(source='OpenMotics', metric_type='output', timestamp=1,
+                          tags={'id': 1, 'name': 'foo'}, values={'value': 0})
+        metric_2 = Metric.from_dict({'source': 'OpenMotics', 'type': 'output', 'timestamp': 2,
+                                     'tags': {'name': 'foo', 'id': 1}, 'values': {'value': 100}})
+        self.assertIs(metric_1.tags, metric_2.tags)
+        self.assertEqual({'source': 'OpenMotics',
+                          'type': 'output',
+                          'timestamp': 2,
+                          'tags': {'id': 1, 'name': 'foo'},
+                          'values': {'value': 100}}, metric_2.as_dict())
+        with self.assertRaises(AttributeError):
+            metric_1.foo = 'bar'
+
     def test_base_validation(self):
         MetricsTest.intervals = {}
         _, _ = MetricsTest._get_controller(intervals=['energy'])
@@ -132,11 +147,11 @@ class MetricsTest(unittest.TestCase):
         metrics_controller.definitions = definitions
 
         # 2. test simple metric
-        metric = {'source': 'OpenMotics',
-                  'type': 'energy',
-                  'timestamp': 1234,
-                  'tags': {'device': 'OpenMotics energy ID1', 'id': 'E7.3'},
-                  'values': {'counter': 5678, 'power': 9012}}
+        metric = Metric(source='OpenMotics',
+                        metric_type='energy',
+                        timestamp=1234,
+                        tags={'device': 'OpenMotics energy ID1', 'id': 'E7.3'},
+                        values={'counter': 5678, 'power': 9012})
 
         needs_upload = metrics_controller._needs_upload_to_cloud(metric)
         self.assertTrue(needs_upload)
@@ -154,11 +169,11 @@ class MetricsTest(unittest.TestCase):
         config['cloud_metrics_types'] = ['counter', 'energy']
 
         # 4. test metric with unconfigured definition
-        metric = {'source': 'MBus',
-                  'type': 'energy',
-                  'timestamp': 1234,
-                  'tags': {'device': 'OpenMotics energy ID1', 'id': 'E7.3'},
-                  'values': {'counter': 5678, 'power': 9012}}
+        metric = Metric(source='MBus',
+                        metric_type='energy',
+                        timestamp=1234,
+                        tags={'device': 'OpenMotics energy ID1', 'id': 'E7.3'},
+                        values={'counter': 5678, 'power': 9012})
 
         needs_upload = metrics_controller._needs_upload_to_cloud(metric)
         self.assertFalse(needs_upload)
@@ -248,7 +263,7 @@ class MetricsTest(unittest.TestCase):
             # noinspection PyTypeChecker
             metric['timestamp'] = time.time()
             metric['values']['counter'] = counter
-            metrics_controller.receiver(metric)
+            metrics_controller.receiver(Metric.from_dict(metric))
             return metric
 
         def assert_fields(controller, cache, queue, stats, buffer, last_send, last_try, retry_interval):
@@ -26,6 +26,7 @@ import fakesleep
 from datetime import datetime, timedelta
 from threading import Lock, Semaphore
 from ioc import SetTestMode, SetUpTestInjections
+from gateway.api_statistics import ApiStatistics
 from gateway.webservice import WebInterface
 from gateway.scheduling import SchedulingController
 
@@ -77,7 +78,9 @@ class SchedulingControllerTest(unittest.TestCase):
                             maintenance_controller=None,
                             message_client=None,
                             configuration_controller=None,
-                            thermostat_controller=None)
+                            thermostat_controller=None,
+                            health_monitor=None,
+                            api_statistics=ApiStatistics())
         controller = SchedulingController()
         SetUpTestInjections(scheduling_controller=controller)
         controller.set_webinterface(WebInterface())
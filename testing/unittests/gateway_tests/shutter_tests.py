@@ -428,6 +428,40 @@ class ShutterControllerTest(unittest.TestCase):
         # Got data for an unconfigured shutter. This should not raise.
         controller.update_from_master_state({'module_nr': 0, 'status': 0b00000000})
 
+    def test_motion_integration(self):
+        fakesleep.reset(0)
+        controller = ShutterController(Mock())
+        config = copy.deepcopy(ShutterControllerTest.SHUTTER_CONFIG)
+        config[0].update({'steps': 100, 'timer_up': 100, 'timer_down': 100})
+        controller.update_config(config)
+        controller.update_from_master_state({'module_nr': 0, 'status': 0b00000000})
+
+        controller.update_from_master_state({'module_nr': 0, 'status': 0b00000001})  # Going down
+        time.sleep(50)
+        self.assertIsNone(controller.get_states()['detail'][0]['actual_position'])  # Unknown start position
+        time.sleep(50)
+        controller.update_from_master_state({'module_nr': 0, 'status': 0b00000000})
+        self.assertEqual({'state': ShutterController.State.DOWN, 'actual_position': 99, 'desired_position': None},
+                         controller.get_states()['detail'][0])
+
+        controller.update_from_master_state({'module_nr': 0, 'status': 0b00000010})  # Going up
+        time.sleep(50)
+        self.assertEqual(50, controller.get_states()['detail'][0]['actual_position'])
+        controller.update_from_master_state({'module_nr': 0, 'status': 0b00000000})
+        self.assertEqual({'state': ShutterController.State.STOPPED, 'actual_position': 50, 'desired_position': None},
+                         controller.get_states()['detail'][0])
+
+        controller.report_shutter_position(0, 60)
+        controller.update_from_master_state({'module_nr': 0, 'status': 0b00000001})  # Going down
+        time.sleep(10)
+        controller.report_shutter_position(0, 70)  # A reported position takes precedence
+        time.sleep(10)
+        controller.update_from_master_state({'module_nr': 0, 'status': 0b00000000})
+        self.assertEqual(79, controller.get_states()['detail'][0]['actual_position'])
+
+        time.sleep(10)
+        self.assertEqual(79, controller.get_states()['detail'][0]['actual_position'])  # Stopped shutters don't move
+
 
 if __name__ == '__main__':
     unittest.main(testRunner=xmlrunner.XMLTestRunner(output='../gw-unit-reports'))
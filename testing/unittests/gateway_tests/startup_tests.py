@@ -0,0 +1,190 @@
+# Copyright (C) 2020 OpenMotics BV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for the dependency aware startup of the service components.
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import traceback
+import unittest
+import xmlrunner
+from threading import Lock
+from mock import patch
+from gateway.startup import StartupOrchestrator
+
+CONFIG = """[OpenMotics]
+uuid = foo
+vpn_check_url = https://cloud.openmotics.com/portal/check_vpn/?uuid=foo
+cloud_user = user
+cloud_pass = pass
+controller_serial = /dev/null
+power_serial = /dev/null
+passthrough_serial = /dev/null
+cli_serial = /dev/null
+"""
+
+
+class Component(object):
+    def __init__(self, name, log, lock, duration=0.0, fail=False):
+        self._name = name
+        self._log = log
+        self._lock = lock
+        self._duration = duration
+        self._fail = fail
+
+    def start(self):
+        with self._lock:
+            self._log.append(('start', self._name))
+        time.sleep(self._duration)
+        if self._fail:
+            raise RuntimeError('failed')
+        with self._lock:
+            self._log.append(('started', self._name))
+
+
+def start_service_graph(platform, result_queue):
+    """ Builds the real service graph and starts its (patched) components. Runs in a separate process. """
+    import constants
+    from platform_utils import Platform
+    from ioc import Inject, INJECTED
+
+    try:
+        root = tempfile.mkdtemp()
+        config_file = os.path.join(root, 'openmotics.conf')
+        with open(config_file, 'w') as config:
+            config.write(CONFIG)
+        patch('constants.get_config_file', return_value=config_file).start()
+        for name in dir(constants):
+            if name.startswith('get_') and name.endswith('_database_file'):
+                patch('constants.{0}'.format(name), return_value=os.path.join(root, '{0}.db'.format(name))).start()
+        patch.object(Platform, 'get_platform', return_value=platform).start()
+
+        from openmotics_service import OpenmoticsService
+        with patch('openmotics_service.Serial'), patch('openmotics_service.RS485'), \
+                patch('openmotics_service.MessageClient'), patch('openmotics_service.Feature') as feature:
+            feature.get_or_none.return_value = None
+            OpenmoticsService.build_graph()
+
+        log = []
+        lock = Lock()
+
+        @Inject
+        def patch_starts(master_controller=INJECTED, maintenance_controller=INJECTED, observer=INJECTED,
+                         power_communicator=INJECTED, metrics_controller=INJECTED, passthrough_service=INJECTED,
+                         scheduling_controller=INJECTED, metrics_collector=INJECTED, web_service=INJECTED,
+                         watchdog=INJECTED, plugin_controller=INJECTED, communication_led_controller=INJECTED,
+                         event_sender=INJECTED, thermostat_controller=INJECTED, health_monitor=INJECTED):
+            components = {'master_controller': master_controller, 'maintenance_controller': maintenance_controller,
+                          'observer': observer, 'power_communicator': power_communicator,
+                          'metrics_controller': metrics_controller, 'passthrough_service': passthrough_service,
+                          'scheduling_controller': scheduling_controller, 'metrics_collector': metrics_collector,
+                          'web_service': web_service, 'watchdog': watchdog, 'plugin_controller': plugin_controller,
+                          'communication_led_controller': communication_led_controller, 'event_sender': event_sender,
+                          'thermostat_controller': thermostat_controller, 'health_monitor': health_monitor}
+            for name, component in components.items():
+                if component is not None:
+                    component.start = Component(name, log, lock).start
+
+        patch_starts()
+        timings = OpenmoticsService.get_startup_orchestrator().start()
+        result_queue.put({'log': log, 'timings': timings})
+        shutil.rmtree(root)
+    except Exception:
+        result_queue.put({'error': traceback.format_exc()})
+
+
+class StartupTest(unittest.TestCase):
+    """ Tests for the StartupOrchestrator. """
+
+    def test_concurrent_start(self):
+        log = []
+        lock = Lock()
+        orchestrator = StartupOrchestrator()
+        orchestrator.add('a', Component('a', log, lock, duration=0.2))
+        orchestrator.add('b', Component('b', log, lock, duration=0.2))
+        orchestrator.add('c', Component('c', log, lock), requires=['a'])
+        orchestrator.add('d', Component('d', log, lock), requires=['a', 'b', 'c', 'e'])
+        orchestrator.add('e', None)
+        start = time.time()
+        timings = orchestrator.start()
+        duration = time.time() - start
+        self.assertLess(duration, 0.35)  # `a` and `b` are started concurrently
+        self.assertEqual({'a', 'b', 'c', 'd'}, set(timings.keys()))
+        self.assertGreaterEqual(timings['a'], 0.2)
+        self.assertEqual({('start', 'a'), ('start', 'b')}, set(log[:2]))
+        self.assertLess(log.index(('started', 'a')), log.index(('start', 'c')))
+        self.assertLess(log.index(('started', 'b')), log.index(('start', 'd')))
+        self.assertLess(log.index(('started', 'c')), log.index(('start', 'd')))
+
+    def test_failures(self):
+        log = []
+        lock = Lock()
+        orchestrator = StartupOrchestrator()
+        orchestrator.add('a', Component('a', log, lock, fail=True))
+        orchestrator.add('b', Component('b', log, lock), requires=['a'])
+        orchestrator.add('c', Component('c', log, lock))
+        with self.assertRaises(RuntimeError):
+            orchestrator.start()
+        self.assertNotIn(('start', 'b'), log)
+        self.assertIn(('started', 'c'), log)
+
+        orchestrator = StartupOrchestrator()
+        orchestrator.add('a', Component('a', log, lock), requires=['b'])
+        orchestrator.add('b', Component('b', log, lock), requires=['a'])
+        with self.assertRaises(ValueError):
+            orchestrator.start()
+
+        orchestrator = StartupOrchestrator()
+        orchestrator.add('a', Component('a', log, lock), requires=['unknown'])
+        with self.assertRaises(ValueError):
+            orchestrator.start()
+
+    def _start_service_graph(self, platform):
+        result_queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=start_service_graph, args=(platform, result_queue))
+        process.start()
+        result = result_queue.get(timeout=60)
+        process.join(10)
+        self.assertNotIn('error', result, result.get('error'))
+        return result['log'], result['timings']
+
+    def _assert_started_before(self, log, first, second):
+        self.assertLess(log.index(('started', first)), log.index(('start', second)))
+
+    def test_service_graph(self):
+        for platform in ['CLASSIC', 'CORE_PLUS']:
+            log, timings = self._start_service_graph(platform)
+            expected = {'master_controller', 'maintenance_controller', 'observer', 'power_communicator',
+                        'metrics_controller', 'scheduling_controller', 'thermostat_controller', 'metrics_collector',
+                        'web_service', 'plugin_controller', 'communication_led_controller', 'event_sender',
+                        'watchdog', 'health_monitor'}
+            if platform == 'CLASSIC':
+                expected.add('passthrough_service')
+            self.assertEqual(expected, set(timings.keys()))
+            self._assert_started_before(log, 'master_controller', 'web_service')
+            self._assert_started_before(log, 'maintenance_controller', 'web_service')
+            self._assert_started_before(log, 'web_service', 'plugin_controller')
+            self._assert_started_before(log, 'metrics_controller', 'metrics_collector')
+            self._assert_started_before(log, 'metrics_collector', 'plugin_controller')
+            # The metrics controller doesn't wait for the plugins
+            self.assertLess(log.index(('started', 'metrics_controller')), log.index(('start', 'plugin_controller')))
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output='../gw-unit-reports'))
@@ -0,0 +1,168 @@
+# Copyright (C) 2020 OpenMotics BV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for the WebService plugin routing, the authentication and the status snapshot.
+"""
+
+import json
+import unittest
+import xmlrunner
+import cherrypy
+from cherrypy._cpdispatch import Dispatcher
+from cherrypy.lib.httputil import Host
+from mock import Mock, patch
+from gateway.api_statistics import ApiStatistics
+from gateway.webservice import WebInterface, WebService, PluginDispatcher, authentication_handler
+
+
+class PluginService(object):
+    def __init__(self):
+        self.method = None
+
+    def _cp_dispatch(self, vpath):
+        self.method = vpath.pop()
+        return self
+
+    @cherrypy.expose
+    def index(self):
+        return self.method
+
+
+class PluginDispatcherTest(unittest.TestCase):
+    """ Tests for the plugin routing. """
+
+    def setUp(self):
+        self.web_service = WebService(web_interface=Mock(), configuration_controller=Mock())
+        self.dispatcher = self.web_service._plugin_dispatcher
+        cherrypy.serving.request.app = cherrypy.Application(self.dispatcher, PluginDispatcher.SCRIPT_NAME)
+
+    def _find_handler(self, path):
+        handler, _ = Dispatcher().find_handler(path)
+        return handler
+
+    def test_routing(self):
+        p1, p2 = PluginService(), PluginService()
+        self.web_service.update_tree([{'root': p1,
+                                       'script_name': '/plugins/P1',
+                                       'config': {'/': {'tools.cors.on': True}}}])
+        self.assertIsNotNone(self._find_handler('/P1/foo'))
+        self.assertEqual('foo', p1.method)
+        self.assertTrue(cherrypy.serving.request.config.get('tools.cors.on'))
+        self.assertIsNone(self._find_handler('/P2/foo'))
+
+        # Routes are replaced without any server restart
+        self.web_service.update_tree([{'root': p2,
+                                       'script_name': '/plugins/P2',
+                                       'config': {'/': {}}}])
+        self.assertIsNone(self._find_handler('/P1/bar'))
+        self.assertIsNotNone(self._find_handler('/P2/bar'))
+        self.assertEqual('bar', p2.method)
+        self.assertEqual('foo', p1.method)
+
+
+class AuthenticationTest(unittest.TestCase):
+    """ Tests for the authentication tool. """
+
+    def setUp(self):
+        self.user_controller = Mock()
+        self.user_controller.check_token.side_effect = lambda token: token == 'valid'
+        self.web_interface = WebInterface(user_controller=self.user_controller, gateway_api=Mock(), maintenance_controller=Mock(),
+                                          message_client=Mock(), configuration_controller=Mock(), scheduling_controller=Mock(),
+                                          thermostat_controller=Mock(), health_monitor=Mock(), api_statistics=ApiStatistics())
+
+    def _authenticate(self, handler, path_info, token, params=None):
+        request = cherrypy.serving.request
+        request.method = 'GET'
+        request.script_name = ''
+        request.path_info = path_info
+        request.remote = Host('10.0.0.2', 443)
+        request.headers = {}
+        request.params = dict(params or {}, token=token)
+        request.handler = Mock(callable=handler)
+        with patch('gateway.webservice._add_api_timing') as add_timing:
+            authentication_handler()
+        return request.handler is not None, [call[0][0] for call in add_timing.call_args_list]
+
+    def test_timings(self):
+        """ Test that the timings are kept per handler, not per requested path """
+        self.assertEqual((True, ['get_output_status']),
+                         self._authenticate(self.web_interface.get_output_status, '/get_output_status/1/', 'valid'))
+
+        plugin = Mock(runner=Mock())
+        plugin.runner.name = 'P1'
+        plugin.index.__self__ = plugin
+        self.assertEqual((True, ['plugins/P1/foo']),
+                         self._authenticate(plugin.index, '/foo/bar/baz', 'valid', params={'method': 'foo'}))
+
+        # Rejected requests don't add any statistics
+        self.assertEqual((False, []), self._authenticate(self.web_interface.get_output_status, '/random/path', 'invalid'))
+
+
+class StatusSnapshotTest(unittest.TestCase):
+    """ Tests for the status snapshot. """
+
+    ENDPOINTS = {'power': 'get_realtime_power',
+                 'pulse_counters': 'get_pulse_counter_status',
+                 'outputs': 'get_output_status',
+                 'inputs': 'get_input_status',
+                 'shutters': 'get_shutter_status',
+                 'thermostats': 'get_thermostat_status',
+                 'errors': 'get_errors'}
+
+    def setUp(self):
+        self.gateway_api = Mock()
+        self.gateway_api.get_realtime_power.return_value = {'1': [[230.0, 50.0, 0.5, 115.0]]}
+        self.gateway_api.get_pulse_counter_status.return_value = [10, 20]
+        self.gateway_api.get_outputs_status.return_value = [{'id': 1, 'status': 1, 'dimmer': 50, 'ctimer': 0}]
+        self.gateway_api.get_input_status.return_value = [{'id': 2, 'status': 0}]
+        self.gateway_api.get_shutter_status.return_value = {'status': ['going_up'], 'detail': {'0': {'state': 'going_up'}}}
+        self.gateway_api.master_error_list.return_value = [['O1', 2]]
+        self.gateway_api.master_last_success.return_value = 1000.0
+        self.gateway_api.power_last_success.return_value = 1001.0
+        thermostat_controller = Mock()
+        thermostat_controller.v0_get_thermostat_status.return_value = {'thermostats_on': True, 'automatic': False,
+                                                                       'setpoint': 0, 'cooling': False, 'status': []}
+        self.web_interface = WebInterface(user_controller=Mock(), gateway_api=self.gateway_api, maintenance_controller=Mock(),
+                                          message_client=Mock(), configuration_controller=Mock(), scheduling_controller=Mock(),
+                                          thermostat_controller=thermostat_controller, health_monitor=Mock(),
+                                          api_statistics=ApiStatistics())
+
+    def _call(self, method, **kwargs):
+        return json.loads(getattr(self.web_interface, method)(**kwargs))
+
+    def test_snapshot(self):
+        """ Test that every dataset matches its dedicated API call """
+        result = self._call('get_status_snapshot')
+        self.assertTrue(result['success'])
+        self.assertEqual(set(StatusSnapshotTest.ENDPOINTS.keys()), set(result['snapshot'].keys()))
+        for dataset, endpoint in StatusSnapshotTest.ENDPOINTS.items():
+            expected = self._call(endpoint)
+            self.assertTrue(expected.pop('success'))
+            self.assertEqual(expected, result['snapshot'][dataset], dataset)
+
+    def test_datasets(self):
+        """ Test that only the requested datasets are loaded, and that failing datasets are omitted """
+        self.gateway_api.get_input_status.side_effect = RuntimeError('timeout')
+        result = self._call('get_status_snapshot', datasets=['outputs', 'inputs'])
+        self.assertTrue(result['success'])
+        self.assertEqual(['outputs'], result['snapshot'].keys())
+        self.gateway_api.get_realtime_power.assert_not_called()
+
+        result = self._call('get_status_snapshot', datasets=['unknown'])
+        self.assertFalse(result['success'])
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output='../gw-unit-reports'))
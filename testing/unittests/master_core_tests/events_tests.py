@@ -0,0 +1,65 @@
+# Copyright (C) 2020 OpenMotics BV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for the Core events
+"""
+
+import unittest
+import xmlrunner
+from master_core.events import Event
+
+
+class EventsTest(unittest.TestCase):
+    """ Tests for the Core events """
+
+    def test_output(self):
+        event = Event({'type': 0, 'action': 1, 'device_nr': 5, 'data': [100, 2, 1, 44]})
+        self.assertEqual(Event.Types.OUTPUT, event.type)
+        self.assertEqual({'output': 5,
+                          'status': True,
+                          'dimmer_value': 100,
+                          'timer_type': '1_S',
+                          'timer_factor': 1,
+                          'timer_value': 300}, event.data)
+        self.assertIs(event.data, event.data)  # Only decoded once
+
+    def test_input(self):
+        event = Event({'type': 1, 'action': 0, 'device_nr': 2, 'data': {}})
+        self.assertEqual(Event.Types.INPUT, event.type)
+        self.assertEqual({'input': 2, 'status': False}, event.data)
+
+    def test_sensor(self):
+        event = Event({'type': 2, 'action': 0, 'device_nr': 3, 'data': [0, 40, 0, 0]})
+        self.assertEqual({'sensor': 3, 'type': Event.SensorType.TEMPERATURE, 'value': 40}, event.data)
+        event = Event({'type': 2, 'action': 2, 'device_nr': 3, 'data': [1, 2, 0, 0]})
+        self.assertEqual({'sensor': 3, 'type': Event.SensorType.BRIGHTNESS, 'value': 258}, event.data)
+        event = Event({'type': 2, 'action': 9, 'device_nr': 3, 'data': [1, 2, 0, 0]})
+        self.assertEqual({'sensor': 3, 'type': Event.SensorType.UNKNOWN, 'value': None}, event.data)
+
+    def test_thermostat_and_system(self):
+        event = Event({'type': 20, 'action': 1, 'device_nr': 4, 'data': [1, 42, 0, 0]})
+        self.assertEqual({'origin': Event.ThermostatOrigins.MASTER,
+                          'thermostat': 4,
+                          'mode': 1,
+                          'setpoint': 42}, event.data)
+        event = Event({'type': 254, 'action': 1, 'device_nr': 0, 'data': [60, 0, 0, 0]})
+        self.assertEqual({'type': Event.SystemEventTypes.ONBOARD_TEMP_CHANGED, 'temperature': 60}, event.data)
+        event = Event({'type': 99, 'action': 0, 'device_nr': 0, 'data': [0, 0, 0, 0]})
+        self.assertEqual(Event.Types.UNKNOWN, event.type)
+        self.assertIsNone(event.data)
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output='../gw-unit-reports'))
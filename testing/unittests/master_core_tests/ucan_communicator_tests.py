@@ -170,6 +170,7 @@ class UCANCommunicatorTest(unittest.TestCase):
             crc = UCANPalletCommandSpec.calculate_crc([part], crc)
         total_payload = payload + UInt32Field.encode_bytes(crc)
         self.assertEqual(0, UCANPalletCommandSpec.calculate_crc(total_payload))
+        self.assertEqual(994452947, UCANPalletCommandSpec.calculate_crc(payload))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+# Copyright (C) 2020 OpenMotics BV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for uCAN updater module.
+"""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+import xmlrunner
+from intelhex import IntelHex
+from master_core.ucan_command import UCANPalletCommandSpec, SID
+from master_core.ucan_updater import UCANUpdater
+
+
+class UCANSimulator(object):
+    """ Records the commands sent to the uCANs """
+
+    def __init__(self):
+        self.flash = {}
+        self.active_ccs = set()
+        self.parallel_ccs = 0
+        self._lock = threading.Lock()
+
+    def is_ucan_in_bootloader(self, cc_address, ucan_address):
+        _ = cc_address, ucan_address
+        return True
+
+    def do_command(self, cc_address, command, identity, fields, timeout=2):
+        _ = timeout
+        with self._lock:
+            self.active_ccs.add(cc_address)
+            self.parallel_ccs = max(self.parallel_ccs, len(self.active_ccs))
+        time.sleep(0.001)
+        if command.sid == SID.BOOTLOADER_PALLET and 'data' in fields:
+            self.flash.setdefault((cc_address, identity), []).append(fields['data'])
+        with self._lock:
+            self.active_ccs.discard(cc_address)
+        if 'safety_flag' in fields:
+            return {}
+        return {'application_mode': 1}
+
+
+class UCANUpdaterTest(unittest.TestCase):
+    """ Tests for UCANUpdater """
+
+    def setUp(self):
+        intel_hex = IntelHex()
+        for address in xrange(0x0, 0x2000):
+            intel_hex[address] = address % 251
+        handle, self._hex_filename = tempfile.mkstemp(suffix='.hex')
+        os.close(handle)
+        intel_hex.write_hex_file(self._hex_filename)
+
+    def tearDown(self):
+        os.remove(self._hex_filename)
+
+    def test_load_firmware(self):
+        blocks = UCANUpdater.load_firmware(self._hex_filename)
+        self.assertEqual(UCANUpdater.ADDRESS_START, blocks[0][0])
+        self.assertEqual([4, 5, 6], blocks[0][1][:3])
+        data = []
+        for _, payload in blocks:
+            data += payload
+        self.assertEqual(0xCFF8 - 4 + 4 + 4, len(data))
+        self.assertEqual([0, 1, 2, 3], data[-8:-4])  # Reset vector
+        self.assertEqual(0, UCANPalletCommandSpec.calculate_crc(data))
+
+    def test_update_all(self):
+        simulator = UCANSimulator()
+        ucans = [('000.000.000', '000.000.001'),
+                 ('000.000.000', '000.000.002'),
+                 ('000.000.001', '000.000.003')]
+        results = UCANUpdater.update_all(ucans, simulator, self._hex_filename)
+        self.assertEqual(dict((ucan, True) for ucan in ucans), results)
+        self.assertEqual(2, simulator.parallel_ccs)
+        expected = [payload for _, payload in UCANUpdater.load_firmware(self._hex_filename)
+                    if payload != [255] * UCANUpdater.MAX_FLASH_BYTES]
+        for ucan in ucans:
+            self.assertEqual(expected, simulator.flash[ucan])
+
+    def test_update_missing_file(self):
+        simulator = UCANSimulator()
+        self.assertFalse(UCANUpdater.update('000.000.000', '000.000.001', simulator, '/tmp/non_existing.hex'))
+        results = UCANUpdater.update_all([('000.000.000', '000.000.001')], simulator, '/tmp/non_existing.hex')
+        self.assertEqual({('000.000.000', '000.000.001'): False}, results)
+        self.assertEqual({}, simulator.flash)
+
+
+if __name__ == "__main__":
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output='../gw-unit-reports'))
@@ -21,7 +21,7 @@ import unittest
 
 import mock
 import xmlrunner
-from master.inputs import InputStatus
+from master.inputs import InputStatus, RecentInputs
 
 
 class InputStatusTest(unittest.TestCase):
@@ -116,6 +116,30 @@ class InputStatusTest(unittest.TestCase):
 
         self.assertEquals([2], inps.get_recent())
 
+    def test_full_update_removes_recent(self):
+        inps = InputStatus()
+        inps.full_update([{'input': 1, 'status': 1}, {'input': 2, 'status': 1}])
+        self.assertEqual([1, 2], inps.get_recent())
+        inps.full_update([{'input': 2, 'status': 1}])
+        self.assertEqual([2], inps.get_recent())
+
+
+class RecentInputsTest(unittest.TestCase):
+    """ Tests for RecentInputs. """
+
+    def test_recency_order(self):
+        recent = RecentInputs(num_inputs=3, seconds=10)
+        with mock.patch.object(time, 'time', return_value=100):
+            for input_id in [1, 2, 3, 4]:
+                recent.add(input_id, 95)
+            self.assertEqual([2, 3, 4], recent.get())
+            recent.add(2, 96)
+            self.assertEqual([3, 4, 2], recent.get())
+            recent.add(5, 80)  # Changed too long ago
+            self.assertEqual([4, 2], recent.get())
+            recent.remove(4)
+            self.assertEqual([2], recent.get())
+
 
 if __name__ == "__main__":
     unittest.main(testRunner=xmlrunner.XMLTestRunner(output='../gw-unit-reports'))
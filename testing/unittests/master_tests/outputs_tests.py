@@ -16,8 +16,10 @@
 Tests for the outputs module.
 """
 
+import time
 import unittest
 import xmlrunner
+from mock import patch
 
 from master.outputs import OutputStatus
 
@@ -73,6 +75,59 @@ class OutputStatusTest(unittest.TestCase):
         self.assertEquals(1, status.get_outputs()[2]['status'])
         self.assertEquals(0, status.get_outputs()[2]['dimmer'])
 
+    def test_partial_update_changes(self):
+        """ Test that partial_update only reports and records actual changes """
+        changes = []
+        status = OutputStatus(on_output_change=lambda output_id, output: changes.append((output_id, output)),
+                              history=4)
+        first = status.get_version()
+        status.full_update([{'id': i, 'status': 0, 'dimmer': 0, 'ctimer': 0} for i in xrange(100)])
+        self.assertEqual(100, len(changes))
+        self.assertEqual(first + 100, status.get_version())
+        del changes[:]
+
+        status.partial_update([(5, 50), (7, 70)])
+        self.assertEqual([(5, {'on': True, 'value': 50}), (7, {'on': True, 'value': 70})], sorted(changes))
+        self.assertEqual((first + 102, [(first + 101, 5, 1, 50), (first + 102, 7, 1, 70)]), status.get_changes(first + 100))
+        del changes[:]
+
+        status.partial_update([(7, 80)])
+        self.assertEqual([(5, {'on': False, 'value': 50}), (7, {'on': True, 'value': 80})], sorted(changes))
+        self.assertEqual(first + 104, status.get_version())
+        self.assertEqual((first + 104, [(first + 104, 7, 1, 80)]), status.get_changes(first + 103))
+        self.assertEqual((first + 104, []), status.get_changes(first + 104))
+        self.assertEqual((first + 104, None), status.get_changes(first + 99))  # No longer available
+
+        status.partial_update([(7, 80)])
+        self.assertEqual(first + 104, status.get_version())
+        self.assertEqual(0, status.get_output(5)['status'])
+        self.assertEqual(1, status.get_output(7)['status'])
+
+
+    def test_versions_after_restart(self):
+        """ Test that versions of a previous run force a resynchronisation """
+        status = OutputStatus()
+        status.full_update([{'id': 0, 'status': 0, 'dimmer': 0, 'ctimer': 0}])
+        old_version = status.get_version() + 1000  # e.g. a long running previous run
+        with patch.object(time, 'time', return_value=time.time() + 60):
+            status = OutputStatus()
+        status.full_update([{'id': 0, 'status': 0, 'dimmer': 0, 'ctimer': 0}])
+        self.assertGreater(status.get_version(), old_version)
+        self.assertEqual((status.get_version(), None), status.get_changes(old_version))
+        self.assertEqual((status.get_version(), None), status.get_changes(status.get_version() + 10))
+        self.assertEqual((status.get_version(), None), status.get_changes(0))
+
+    def test_update_output(self):
+        """ Test updating a single output """
+        changes = []
+        status = OutputStatus(on_output_change=lambda output_id, output: changes.append((output_id, output)))
+        status.full_update([{'id': 1, 'status': 0, 'dimmer': 0, 'ctimer': 0}])
+        version = status.get_version()
+        status.update_output({'id': 1, 'status': 1, 'dimmer': 50, 'ctimer': 0})
+        status.update_output({'id': 1, 'status': 1, 'dimmer': 50, 'ctimer': 0})
+        self.assertEqual((version + 1, [(version + 1, 1, 1, 50)]), status.get_changes(version))
+        status.partial_update([])
+        self.assertEqual(0, status.get_output(1)['status'])
 
 if __name__ == "__main__":
     unittest.main(testRunner=xmlrunner.XMLTestRunner(output='../gw-unit-reports'))
@@ -0,0 +1,193 @@
+# Copyright (C) 2020 OpenMotics BV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for the modules bootloader, using simulated slave modules behind a master stand-in.
+"""
+
+import unittest
+import xmlrunner
+import intelhex
+import mock
+import master.master_api as master_api
+from modules_bootloader import bootload, calc_crc, check_bl_crc, create_bl_action, get_firmware_blocks
+
+
+class SimulatedModule(object):
+    """ A slave module with a bootloader """
+
+    def __init__(self, address, has_bootloader=True, boot_delay=0):
+        self.address = address
+        self.has_bootloader = has_bootloader
+        self.in_bootloader = False
+        self.bootloader_timeout = 0
+        self.bootloader_deadline = 0.0
+        self.boot_delay = boot_delay
+        self.booting = 0
+        self.crc = None
+        self.blocks = {}
+        self.version = (1, 0, 0)
+
+
+class MasterSimulator(object):
+    """ Stand-in for the MasterCommunicator, forwarding the bootload commands to the simulated modules """
+
+    def __init__(self, modules, command_duration=0.0):
+        self.modules = dict((module.address, module) for module in modules)
+        self.command_duration = command_duration
+        self.clock = 0.0
+        self.long_mode = False
+        self.mode_changes = 0
+        self.commands = 0
+
+    def start(self):
+        pass
+
+    def do_command(self, cmd, fields=None, timeout=2, extended_crc=False):
+        _ = timeout, extended_crc
+        self.commands += 1
+        self.clock += self.command_duration
+        if cmd.action == 'cm':
+            self.long_mode = cmd.input_fields[0].encode(None) == '\x4d'
+            self.mode_changes += 1
+            return {}
+        if cmd.action == 'ec':
+            return {'resp': 'OK'}
+
+        # Verify the crc of the request
+        expected = create_bl_action(cmd, dict((key, value) for key, value in fields.iteritems() if key not in ['crc0', 'crc1']))[1]
+        if (expected['crc0'], expected['crc1']) != (fields['crc0'], fields['crc1']):
+            return self._reply(cmd, fields['addr'], 2)
+        module = self.modules.get(fields['addr'])
+        if module is None:
+            raise RuntimeError('Module not found')
+
+        if cmd.action == 'FV':
+            if module.booting > 0:
+                module.booting -= 1
+                raise RuntimeError('Module is booting')
+            return self._reply(cmd, module.address, 255, hw_version=1, f1=module.version[0], f2=module.version[1], f3=module.version[2], status=0)
+        if cmd.action == 'FR':
+            if not module.has_bootloader:
+                return self._reply(cmd, module.address, 3)
+            module.in_bootloader = True
+            module.bootloader_timeout = fields['sec']
+            module.bootloader_deadline = self.clock + fields['sec']
+            return self._reply(cmd, module.address, 255)
+        if module.in_bootloader:
+            # The module leaves the bootloader if it doesn't receive a bootloader command in time
+            if self.clock > module.bootloader_deadline:
+                module.in_bootloader = False
+            module.bootloader_deadline = self.clock + module.bootloader_timeout
+        if not module.in_bootloader:
+            return self._reply(cmd, module.address, 4)
+        if cmd.action == 'FC':
+            module.crc = (fields['ccrc0'] << 24) + (fields['ccrc1'] << 16) + (fields['ccrc2'] << 8) + fields['ccrc3']
+        elif cmd.action == 'FD':
+            if not self.long_mode:
+                return self._reply(cmd, module.address, 5)
+            module.blocks[fields['block']] = fields['bytes']
+        elif cmd.action == 'FE':
+            data = ''.join(module.blocks[i] for i in sorted(module.blocks))
+            if sum(ord(c) for c in data) - sum(ord(c) for c in data[:8]) != module.crc:
+                return self._reply(cmd, module.address, 6)
+        elif cmd.action == 'FG':
+            module.in_bootloader = False
+            module.booting = module.boot_delay
+            module.version = (2, 0, 0)
+        return self._reply(cmd, module.address, 0)
+
+    @staticmethod
+    def _reply(cmd, address, error_code, **kwargs):
+        result = {'addr': address, 'error_code': error_code}
+        result.update(kwargs)
+        crc = ord(cmd.action[0]) + ord(cmd.action[1])
+        for field in cmd.output_fields:
+            if field.name == 'literal' and field.encode(None) == 'C':
+                break
+            for byte in field.encode(result[field.name]):
+                crc += ord(byte)
+        result['crc0'] = crc / 256
+        result['crc1'] = crc % 256
+        assert check_bl_crc(cmd, result)
+        return result
+
+
+class ModulesBootloaderTest(unittest.TestCase):
+    """ Tests for the modules bootloader """
+
+    BLOCKS = 10
+
+    def setUp(self):
+        self.ihex = intelhex.IntelHex()
+        for i in range(64 * ModulesBootloaderTest.BLOCKS):
+            self.ihex[i] = (i * 7) % 256
+        self.firmware_blocks = get_firmware_blocks(self.ihex, ModulesBootloaderTest.BLOCKS)
+        self.crc = calc_crc(self.ihex, ModulesBootloaderTest.BLOCKS)
+        self.log = []
+
+    def test_firmware_blocks(self):
+        self.assertEqual(ModulesBootloaderTest.BLOCKS, len(self.firmware_blocks))
+        self.assertTrue(all(len(block) == 64 for block in self.firmware_blocks))
+        self.assertEqual([self.ihex[i] for i in range(64)], [ord(c) for c in self.firmware_blocks[0]])
+        # The jump is placed at the end of the code
+        last_block = [ord(c) for c in self.firmware_blocks[-1]]
+        self.assertEqual([self.ihex[i] for i in range(8)], last_block[56:])
+        self.assertEqual([self.ihex[576 + i] for i in range(56)], last_block[:56])
+
+    def test_bootload(self):
+        modules = [SimulatedModule('O\x01\x02\x03'),
+                   SimulatedModule('O\x04\x05\x06', boot_delay=4),
+                   SimulatedModule('O\x07\x08\x09', has_bootloader=False)]
+        master = MasterSimulator(modules)
+        with mock.patch('time.sleep') as sleep:
+            failed = bootload(master, [module.address for module in modules], self.firmware_blocks, self.crc, self.log.append)
+        self.assertEqual([], failed)
+        for module in modules[:2]:
+            self.assertEqual((2, 0, 0), module.version)
+            self.assertEqual(self.firmware_blocks, [module.blocks[i] for i in range(ModulesBootloaderTest.BLOCKS)])
+        self.assertEqual((1, 0, 0), modules[2].version)
+        self.assertEqual({}, modules[2].blocks)
+        self.assertEqual(4, master.mode_changes)  # Long and short mode for each flashed module
+        self.assertFalse(master.long_mode)
+        self.assertEqual(4, sleep.call_count)  # Once per module for going to the bootloader, waiting for the application is shared
+        self.assertIn('O.4.5.6 - * Block 10/10 (100%)', self.log)
+
+    def test_bootloader_window(self):
+        modules = [SimulatedModule('O\x01\x02\x03'),
+                   SimulatedModule('O\x04\x05\x06')]
+        master = MasterSimulator(modules, command_duration=0.6)  # Flashing a module takes longer than the bootloader window
+
+        def sleep(seconds):
+            master.clock += seconds
+
+        with mock.patch('time.sleep', side_effect=sleep):
+            failed = bootload(master, [module.address for module in modules], self.firmware_blocks, self.crc, self.log.append)
+        self.assertEqual([], failed)
+        self.assertTrue(all(module.version == (2, 0, 0) for module in modules))
+
+    def test_bootload_failure(self):
+        modules = [SimulatedModule('O\x01\x02\x03'),
+                   SimulatedModule('O\x04\x05\x06')]
+        master = MasterSimulator(modules)
+        crc = (0, 0, 0, 1)  # Invalid crc, so the integrity check fails
+        with mock.patch('time.sleep'):
+            failed = bootload(master, [module.address for module in modules], self.firmware_blocks, crc, self.log.append)
+        self.assertEqual([module.address for module in modules], failed)
+        self.assertFalse(master.long_mode)
+        self.assertTrue(all(module.in_bootloader for module in modules))
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output='../gw-unit-reports'))
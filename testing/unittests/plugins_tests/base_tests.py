@@ -27,6 +27,7 @@ import unittest
 import xmlrunner
 from subprocess import call
 
+from gateway.metric import Metric
 from gateway.observer import Event
 from plugin_runtime.base import PluginConfigChecker, PluginException
 
@@ -159,6 +160,50 @@ class P2(OMPluginBase):
             PluginControllerTest._destroy_plugin('P1')
             PluginControllerTest._destroy_plugin('P2')
 
+    def test_concurrent_start(self):
+        """ Test whether plugins are started concurrently and report their state. """
+        controller = None
+        try:
+            for name in ['P1', 'P2']:
+                PluginControllerTest._create_plugin(name, """
+import time
+from plugins.base import *
+
+class {0}(OMPluginBase):
+    name = '{0}'
+    version = '1.0.0'
+    interfaces = []
+
+    def __init__(self, webservice, logger):
+        super({0}, self).__init__(webservice, logger)
+        time.sleep(2)
+""".format(name))
+            PluginControllerTest._create_plugin('P3', """
+from plugins.base import *
+
+class P3(OMPluginBase):
+    name = 'P3'
+    version = '1.0.0'
+    interfaces = []
+
+    def __init__(self, webservice, logger):
+        super(P3, self).__init__(webservice, logger)
+        raise RuntimeError('Broken plugin')
+""")
+            controller = PluginControllerTest._get_controller()
+            start = time.time()
+            controller.start()
+            self.assertLess(time.time() - start, 3.5)
+            states = dict((runner.name, runner.get_state()) for runner in controller.get_plugins())
+            self.assertEqual({'P1': 'RUNNING', 'P2': 'RUNNING', 'P3': 'FAILED'}, states)
+            controller.stop_plugin('P1')
+            self.assertEqual('STOPPED', [runner for runner in controller.get_plugins() if runner.name == 'P1'][0].get_state())
+        finally:
+            if controller is not None:
+                controller.stop()
+            for name in ['P1', 'P2', 'P3']:
+                PluginControllerTest._destroy_plugin(name)
+
     def test_get_special_methods(self):
         """ Test getting special methods on a plugin. """
         controller = None
@@ -352,11 +397,11 @@ class P2(OMPluginBase):
             controller.install_plugin(p2_md5, p2_data)
             controller.start_plugin('P2')
 
-            delivery_rate = controller.distribute_metrics([{'timestamp': 0,
-                                                            'source': 'test',
-                                                            'type': 'test',
-                                                            'tags': {},
-                                                            'values': {}}])
+            delivery_rate = controller.distribute_metrics([Metric(source='test',
+                                                                  metric_type='test',
+                                                                  timestamp=0,
+                                                                  tags={},
+                                                                  values={})])
             self.assertEqual({'total': 2,
                               'test.test': 2}, delivery_rate)
 
@@ -22,6 +22,7 @@ import shutil
 import tempfile
 import unittest
 import xmlrunner
+from gateway.api_statistics import ApiStatistics
 from plugins.runner import PluginRunner
 
 
@@ -47,7 +48,7 @@ class PluginRunnerTest(unittest.TestCase):
         _ = args, kwargs
 
     def test_queue_length(self):
-        runner = PluginRunner('foo', self.RUNTIME_PATH, self.PLUGIN_PATH, self._log)
+        runner = PluginRunner('foo', self.RUNTIME_PATH, self.PLUGIN_PATH, self._log, api_statistics=ApiStatistics())
         self.assertEqual(runner.get_queue_length(), 0)
 
 
@@ -178,6 +178,39 @@ class PowerControllerTest(unittest.TestCase):
 
         self.assertEquals(3, power_controller.get_address(1))
 
+    def test_in_memory_modules(self):
+        """ Test that the in-memory power modules match the database. """
+        power_controller = self.__get_controller()
+        changes = []
+        power_controller.subscribe_power_modules_changed(lambda: changes.append(True))
+        power_controller.register_power_module(1, POWER_MODULE)
+        power_controller.register_power_module(2, POWER_MODULE)
+        modules = power_controller.get_power_modules()
+        modules[1]['address'] = 5  # Changes to the returned modules don't affect the controller
+        self.assertEquals(1, power_controller.get_address(1))
+
+        module = power_controller.get_power_modules()[2]
+        module.update({'name': u'test', 'times0': u'00:00,12:00'})
+        power_controller.update_power_module(module)
+        power_controller.readdress_power_module(1, 3)
+        self.assertEquals(4, len(changes))
+
+        SetUpTestInjections(power_db=PowerControllerTest.FILE)
+        self.assertEquals(PowerController().get_power_modules(), power_controller.get_power_modules())
+
+    def test_update_unknown_module(self):
+        """ Test that updating an unknown module is rejected and leaves the in-memory modules untouched. """
+        power_controller = self.__get_controller()
+        changes = []
+        power_controller.subscribe_power_modules_changed(lambda: changes.append(True))
+        power_controller.register_power_module(1, POWER_MODULE)
+        module = power_controller.get_power_modules()[1]
+        module['id'] = 5
+        with self.assertRaises(ValueError):
+            power_controller.update_power_module(module)
+        self.assertEquals(1, len(changes))
+        self.assertEquals([1], power_controller.get_power_modules().keys())
+
 
 if __name__ == "__main__":
     unittest.main(testRunner=xmlrunner.XMLTestRunner(output='../gw-unit-reports'))
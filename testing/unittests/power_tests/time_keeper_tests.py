@@ -19,7 +19,9 @@
 import unittest
 import xmlrunner
 from datetime import datetime
+from mock import Mock, patch
 
+import power.power_api as power_api
 from power.time_keeper import TimeKeeper
 
 
@@ -77,6 +79,87 @@ class TimeKeeperTest(unittest.TestCase):
         self.assertFalse(tkeep.is_day_time(None, datetime(2013, 3, 10, 12, 20, 0)))  # Sunday 12:00
         self.assertFalse(tkeep.is_day_time(None, datetime(2013, 3, 10, 18, 0, 0)))  # Sunday 18:00
 
+    def test_transitions(self):
+        """ Test that the modules are only configured at day/night transitions. """
+        times = ','.join(['08:00,18:30'] * 7)
+        module = {'version': power_api.POWER_MODULE, 'address': 1}
+        module.update({'times%d' % i: times if i == 0 else None for i in range(8)})
+        power_controller = Mock()
+        power_controller.get_power_modules.return_value = {1: module}
+        power_communicator = Mock()
+        tkeep = TimeKeeper(power_communicator, power_controller, 3600)
+
+        def run_once(date):
+            with patch('power.time_keeper.datetime') as datetime_mock:
+                datetime_mock.now.return_value = date
+                return tkeep._TimeKeeper__run_once()
+
+        night = [power_api.NIGHT] * 8
+        day = [power_api.DAY] + [power_api.NIGHT] * 7
+        self.assertEqual(30 * 60 - 15, run_once(datetime(2013, 3, 4, 7, 30, 15)))  # Monday 07:30:15
+        self.assertEqual(1, power_communicator.do_command.call_count)
+        self.assertEqual(1, power_communicator.do_command.call_args[0][0])
+        self.assertEqual(night, list(power_communicator.do_command.call_args[0][2:]))
+        self.assertEqual(3600, run_once(datetime(2013, 3, 4, 8, 0, 0)))  # Next transition is further than the period
+        self.assertEqual(2, power_communicator.do_command.call_count)
+        self.assertEqual(day, list(power_communicator.do_command.call_args[0][2:]))
+        self.assertEqual(30 * 60, run_once(datetime(2013, 3, 4, 18, 0, 0)))
+        self.assertEqual(2, power_communicator.do_command.call_count)  # No changes, no commands
+        self.assertEqual(1, power_controller.get_power_modules.call_count)  # The times are compiled once
+        self.assertEqual(3600, run_once(datetime(2013, 3, 10, 23, 30, 0)))  # Sunday 23:30, wraps to Monday 08:00
+        self.assertEqual(night, list(power_communicator.do_command.call_args[0][2:]))
+
+        tkeep.refresh()
+        run_once(datetime(2013, 3, 11, 0, 0, 0))
+        self.assertEqual(2, power_controller.get_power_modules.call_count)
+
+
+    def test_failures(self):
+        """ Test that a failing module doesn't block the others and is retried soon. """
+        times = ','.join(['08:00,18:30'] * 7)
+        modules = {}
+        for address in [1, 2]:
+            modules[address] = {'version': power_api.POWER_MODULE, 'address': address}
+            modules[address].update({'times%d' % i: times if i == 0 else None for i in range(8)})
+        power_controller = Mock()
+        power_controller.get_power_modules.return_value = modules
+        power_communicator = Mock()
+        addresses = []
+
+        def do_command(address, *args):
+            addresses.append(address)
+            if address == 1 and len(addresses) < 3:
+                raise RuntimeError('timeout')
+
+        power_communicator.do_command.side_effect = do_command
+        tkeep = TimeKeeper(power_communicator, power_controller, 3600)
+
+        def run_once(date):
+            with patch('power.time_keeper.datetime') as datetime_mock:
+                datetime_mock.now.return_value = date
+                return tkeep._TimeKeeper__run_once()
+
+        self.assertEqual(TimeKeeper.RETRY_DELAY, run_once(datetime(2013, 3, 4, 7, 30, 0)))
+        self.assertEqual([1, 2], sorted(addresses))
+        self.assertEqual(30 * 60 - 10, run_once(datetime(2013, 3, 4, 7, 30, 10)))
+        self.assertEqual([1], addresses[2:])  # Only the failed module is retried
+
+    def test_refresh_during_load(self):
+        """ Test that times loaded before a refresh are not kept. """
+        power_controller = Mock()
+        tkeep = TimeKeeper(Mock(), power_controller, 3600)
+
+        def get_power_modules():
+            tkeep.refresh()  # e.g. a module is changed while the times are being compiled
+            return {}
+
+        power_controller.get_power_modules.side_effect = get_power_modules
+        tkeep._TimeKeeper__run_once()
+        power_controller.get_power_modules.side_effect = None
+        power_controller.get_power_modules.return_value = {}
+        tkeep._TimeKeeper__run_once()
+        tkeep._TimeKeeper__run_once()
+        self.assertEqual(2, power_controller.get_power_modules.call_count)
 
 if __name__ == "__main__":
     unittest.main(testRunner=xmlrunner.XMLTestRunner(output='../gw-unit-reports'))
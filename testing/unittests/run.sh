@@ -58,9 +58,21 @@ python2 gateway/hal/master_controller_core_test.py
 echo "Running observer tests"
 python2 gateway/observer_test.py
 
+echo "Running maintenance tests"
+python2 gateway_tests/maintenance_tests.py
+
+echo "Running startup tests"
+python2 gateway_tests/startup_tests.py
+
+echo "Running health monitor tests"
+python2 gateway_tests/health_monitor_tests.py
+
 echo "Running Core uCAN tests"
 python2 master_core_tests/ucan_communicator_tests.py
 
+echo "Running uCAN updater tests"
+python2 master_core_tests/ucan_updater_tests.py
+
 echo "Running Core memory file tests"
 python2 master_core_tests/memory_file_tests.py
 
@@ -70,5 +82,26 @@ python2 master_core_tests/api_field_tests.py
 echo "running Core communicator tests"
 python2 master_core_tests/core_communicator_tests.py
 
+echo "Running Core events tests"
+python2 master_core_tests/events_tests.py
+
 echo "Running metrics tests"
 python2 gateway_tests/metrics_tests.py
+
+echo "Running api statistics tests"
+python2 gateway_tests/api_statistics_tests.py
+echo "Running configuration versions tests"
+python2 gateway_tests/config_versions_tests.py
+
+echo "Running webservice tests"
+python2 gateway_tests/webservice_tests.py
+echo "Running vpn collector tests"
+python2 vpn_collector_tests.py
+echo "Running backup tests"
+python2 gateway_tests/backup_tests.py
+
+echo "Running message bus service tests"
+python2 bus_tests/om_bus_service_tests.py
+
+echo "Running modules bootloader tests"
+python2 modules_bootloader_tests.py
@@ -23,7 +23,7 @@ import threading
 import unittest
 import xmlrunner
 
-from serial_utils import printable
+from serial_utils import printable, CommunicationStatistics, DebugBuffer
 
 
 def sin(data):
@@ -157,5 +157,63 @@ class SerialMockTest(unittest.TestCase):
         self.assertEquals(1, phase['phase'])
 
 
+class DebugBufferTest(unittest.TestCase):
+    """ Tests for DebugBuffer class """
+
+    def test_ring_buffer(self):
+        """ Tests the size and duration limits of the DebugBuffer. """
+        current_time = {'time': 1000.0}
+        real_time = time.time
+        time.time = lambda: current_time['time']
+        try:
+            debug_buffer = DebugBuffer(size=3, duration=10)
+            self.assertEquals({'read': {}, 'write': {}}, debug_buffer.get())
+            for i in xrange(5):
+                current_time['time'] = 1000.0 + i
+                debug_buffer.capture('read', chr(65 + i))
+            debug_buffer.capture('write', [1, 2])
+            self.assertEquals({'read': {1002.0: printable('C'), 1003.0: printable('D'), 1004.0: printable('E')},
+                               'write': {1004.0: printable([1, 2])}},
+                              debug_buffer.get())
+            current_time['time'] = 1013.5
+            self.assertEquals({'read': {1004.0: printable('E')},
+                               'write': {1004.0: printable([1, 2])}},
+                              debug_buffer.get())
+        finally:
+            time.time = real_time
+
+
+class CommunicationStatisticsTest(unittest.TestCase):
+    """ Tests for CommunicationStatistics class """
+
+    def test_statistics(self):
+        """ Tests the call history and the per command counters and histograms. """
+        statistics = CommunicationStatistics(history=3)
+        for _ in xrange(4):
+            statistics.record_success('OL', 0.004)
+        statistics.record_timeout('OL')
+        statistics.record_retry('OL')
+        statistics.record_success('BA', 0.03)
+        statistics.bytes_written += 10
+        statistics.bytes_read += 20
+
+        legacy = statistics.get()
+        self.assertEquals(3, len(legacy['calls_succeeded']))
+        self.assertEquals(1, len(legacy['calls_timedout']))
+        self.assertEquals(10, legacy['bytes_written'])
+        self.assertEquals(20, legacy['bytes_read'])
+
+        commands = statistics.get_commands()
+        self.assertEquals(['BA', 'OL'], sorted(commands.keys()))
+        self.assertEquals(5, commands['OL']['calls'])
+        self.assertEquals(1, commands['OL']['timeouts'])
+        self.assertEquals(1, commands['OL']['retries'])
+        self.assertAlmostEquals(0.2, commands['OL']['timeout_rate'])
+        self.assertEquals(4, commands['OL']['latency']['count'])
+        self.assertAlmostEquals(4.0, commands['OL']['latency']['avg'])
+        self.assertEquals(0.0, commands['BA']['timeout_rate'])
+        self.assertAlmostEquals(30.0, commands['BA']['latency']['max'])
+
+
 if __name__ == "__main__":
     unittest.main(testRunner=xmlrunner.XMLTestRunner(output='gw-unit-reports'))
@@ -0,0 +1,124 @@
+# Copyright (C) 2020 OpenMotics BV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for the data collectors of the vpn service and the status snapshot they consume.
+"""
+
+import json
+import time
+import unittest
+import urllib
+import xmlrunner
+from mock import patch
+from vpn_service import DataCollector, Gateway, VPNService
+
+
+class DataCollectorTest(unittest.TestCase):
+    """ Tests for the DataCollector class """
+
+    def test_should_collect(self):
+        """ Test that a collector is only due once per period. """
+        calls = []
+        collector = DataCollector(lambda: calls.append(True) or len(calls), 60, dataset='thermostats')
+        self.assertEqual('thermostats', collector.dataset)
+        with patch.object(time, 'time', return_value=1000):
+            self.assertTrue(collector.should_collect())
+            self.assertEqual(1, collector.collect())
+            self.assertFalse(collector.should_collect())
+            self.assertIsNone(collector.collect())
+        with patch.object(time, 'time', return_value=1060):
+            self.assertTrue(collector.should_collect())
+            self.assertEqual(2, collector.collect())
+
+        collector = DataCollector(lambda: 'data')
+        self.assertIsNone(collector.dataset)
+        self.assertEqual('data', collector.collect())
+        self.assertTrue(collector.should_collect())  # Collected on each cycle without a period
+
+    def test_due_datasets(self):
+        """ Test that only the datasets of the due collectors are loaded. """
+        thermostats = DataCollector(lambda: None, 60, dataset='thermostats')
+        collectors = [thermostats,
+                      DataCollector(lambda: None, dataset='outputs'),
+                      DataCollector(lambda: None, 1800)]
+        with patch.object(time, 'time', return_value=1000):
+            self.assertEqual(['thermostats', 'outputs'], VPNService._get_due_datasets(collectors))
+            thermostats.collect()
+            self.assertEqual(['outputs'], VPNService._get_due_datasets(collectors))
+
+
+class GatewayTest(unittest.TestCase):
+    """ Tests for the status snapshot of the Gateway class """
+
+    OUTPUTS = {'status': [{'id': 1, 'status': 1, 'dimmer': 100, 'ctimer': 0},
+                          {'id': 2, 'status': 0, 'dimmer': 100, 'ctimer': 0}]}
+    INPUTS = {'status': [{'id': 3, 'status': 1}]}
+
+    def setUp(self):
+        self.calls = []
+        self.datasets = {'outputs': GatewayTest.OUTPUTS, 'inputs': GatewayTest.INPUTS}
+
+    def _do_call(self, uri):
+        self.calls.append(uri)
+        if uri.startswith('get_status_snapshot'):
+            datasets = GatewayTest._get_datasets(uri)
+            return {'success': True,
+                    'snapshot': dict((dataset, self.datasets[dataset]) for dataset in datasets if dataset in self.datasets)}
+        if uri.startswith('get_output_status'):
+            return dict(GatewayTest.OUTPUTS, success=True)
+        if uri.startswith('get_input_status'):
+            return dict(GatewayTest.INPUTS, success=True)
+        return {'success': False}
+
+    @staticmethod
+    def _get_datasets(uri):
+        return json.loads(urllib.unquote(uri.split('datasets=')[1]))
+
+    def test_snapshot(self):
+        """ Test that the getters consume the loaded snapshot. """
+        gateway = Gateway()
+        with patch.object(gateway, 'do_call', side_effect=self._do_call):
+            gateway.load_snapshot(['outputs', 'inputs'])
+            self.assertEqual([(1, 100)], gateway.get_enabled_outputs())
+            self.assertEqual([(3, 1)], gateway.get_inputs_status())
+            self.assertEqual(1, len(self.calls))
+            self.assertEqual(['outputs', 'inputs'], GatewayTest._get_datasets(self.calls[0]))
+
+            # The snapshot is consumed, so the next cycle uses the dedicated call if nothing is loaded
+            self.assertEqual([(1, 100)], gateway.get_enabled_outputs())
+            self.assertEqual('get_output_status?token=None', self.calls[-1])
+
+    def test_snapshot_fallback(self):
+        """ Test that datasets missing from the snapshot are loaded with their dedicated calls. """
+        del self.datasets['inputs']
+        gateway = Gateway()
+        with patch.object(gateway, 'do_call', side_effect=self._do_call):
+            gateway.load_snapshot(['outputs', 'inputs'])
+            self.assertEqual([(3, 1)], gateway.get_inputs_status())
+            self.assertEqual('get_input_status?token=None', self.calls[-1])
+
+            gateway.load_snapshot([])  # Nothing due, so no call and the previous snapshot is dropped
+            self.assertEqual(2, len(self.calls))
+            self.assertEqual([(1, 100)], gateway.get_enabled_outputs())
+            self.assertEqual('get_output_status?token=None', self.calls[-1])
+
+        gateway = Gateway()
+        with patch.object(gateway, 'do_call', return_value=None):
+            gateway.load_snapshot(['outputs'])  # The snapshot call failed
+            self.assertIsNone(gateway.get_enabled_outputs())
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output='../gw-unit-reports'))